@@ -4,27 +4,126 @@ import subprocess
 import sys
 import os
 import threading
+import multiprocessing
 import queue
 import shutil
 import time
+import heapq
+import random
 import re
 import json
+import argparse
+import signal
 import tkinter.font
+from collections import OrderedDict, deque
 import urllib.request
 import urllib.parse
 from urllib.error import URLError, HTTPError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 # --- Constants for consistent naming and values ---
 # These are now mostly internal or default values, can be overridden by settings
 DEFAULT_DOWNLOADS_DIR = "downloads"
 TEMP_SUBDIR = "temp"
+LOG_SUBDIR = "logs"  # Per-item process logs, inside the temp folder
+HEADLESS_TEMP_SUBDIR = "temp-headless"  # Temp folder of --headless runs, which the GUI's launch cleanup does not touch
 DEFAULT_SOURCE = "Default"  # Renamed from YOUTUBE_SOURCE
 XTREAM_SOURCE = "XtremeStream"
 TS_STREAM_SOURCE = "TS Stream"  # New source for .ts files and M3U8 playlists
 LOCAL_SOURCE = "Local"
 DEFAULT_MAX_CONCURRENT_DOWNLOADS = 2  # Default, overridden by settings
+DEFAULT_MAX_CPU_JOBS = os.cpu_count() or 2  # Concurrent FFmpeg encodes (local conversions, recodes, MP3 extraction)
+DEFAULT_MAX_MERGE_JOBS = 2  # Concurrent disk-heavy stream copies (merges, remuxes, TS concatenation)
+RESOURCE_POOLS = ('network', 'cpu', 'disk')  # Budgets a running item moves between as its phase changes
+DEFAULT_HOST_MAX_CONCURRENT = 2  # Downloads from one site at a time, unless overridden per site in settings
+DEFAULT_HOST_MIN_START_INTERVAL = 1.0  # Seconds between two download starts on one site, same
+SCHEDULING_POLICIES = ["First in, first out", "Shortest first", "Fair share by site"]  # Order within a priority
+SJF_DEFAULT_SIZE_MB = 200  # Assumed size of a job whose metadata gives no size hint
+SJF_AGING_SECONDS_PER_MB = 0.5  # Shortest first: each MB of a job counts like this much extra waiting time
+ASSUMED_VIDEO_MB_PER_SECOND = 0.5  # ~4 Mbit/s, to estimate a size from the duration alone
+ASSUMED_AUDIO_MB_PER_SECOND = 0.02  # ~160 kbit/s
+PRIORITY_LEVELS = OrderedDict([("High", 1), ("Normal", 0), ("Low", -1)])  # Queue priority names -> values
+DEFAULT_PLAYLIST_PAGE_SIZE = 50  # Entries fetched per flat-playlist page, overridden by settings
+DEFAULT_FRAGMENTS_PER_ITEM = 8  # Max yt-dlp fragment workers for a single download, overridden by settings
+DEFAULT_FRAGMENT_BUDGET = 16  # Fragment workers shared by all active yt-dlp downloads, overridden by settings
+MP3_BITRATE_OPTIONS = ["Best available", "320", "256", "192", "128"]  # kbps choices for MP3 jobs
+DUPLICATE_ACTIONS = ["Skip", "Relink existing file", "Download again"]  # What to do with already downloaded items
+RESUMABLE_STATUSES = ('failed', 'aborted', 'cancelled')  # Items whose temp dir is kept so a retry can resume
+DEFAULT_TEMP_MAX_AGE_DAYS = 7  # Partial downloads older than this are garbage collected, overridden by settings
+DEFAULT_TEMP_MAX_SIZE_MB = 10240  # Oldest partial downloads are removed beyond this total, overridden by settings
+SCHEDULER_SAFETY_NET_MS = 5000  # Fallback scheduling interval; passes normally run on queue events
+OUTPUT_TAIL_LINES = 40  # Last output lines kept per item to classify a failure
+ITEM_LOG_MAX_BYTES = 1024 * 1024  # A task's log file is rotated once it reaches this size
+ITEM_LOG_BACKUPS = 2  # Rotated log files kept per task, in addition to the current one
+LOG_VIEW_PAGE_BYTES = 64 * 1024  # The log viewer loads this much at a time, newest first
+
+# Failure classes, checked in order against the output tail of a failed run
+FAILURE_PATTERNS = [
+    ('disk_full', re.compile(r'No space left on device|Errno 28|disk (is )?full|not enough space', re.IGNORECASE)),
+    ('rate_limit', re.compile(r'HTTP Error 429|Too Many Requests', re.IGNORECASE)),
+    ('forbidden', re.compile(r'HTTP Error 403|Forbidden', re.IGNORECASE)),
+    ('permanent', re.compile(r'Unsupported URL|Video unavailable|Private video|has been removed|copyright|'
+                             r'HTTP Error 404|not found or not in PATH', re.IGNORECASE)),
+    ('ffmpeg', re.compile(r'Postprocessing:|ffmpeg exited|Conversion failed|Failed to merge|'
+                          r'Invalid data found when processing input', re.IGNORECASE)),
+    ('network', re.compile(r'timed out|timeout|Connection (reset|refused|aborted)|Network is unreachable|'
+                           r'name resolution|getaddrinfo failed|urlopen error|IncompleteRead|HTTP Error 5\d\d|'
+                           r'Unable to download|Failed to download|fragment not found', re.IGNORECASE)),
+    ('extractor', re.compile(r'ERROR: \[[\w:.-]+\]|Unable to extract|ExtractorError', re.IGNORECASE)),
+]
+# Per failure class: attempt cap, exponential backoff bounds (seconds) and whether the item keeps its slot
+# while waiting. Short network blips hold the slot; server-side pushback gives the slot to other items.
+RETRY_POLICIES = {
+    'network': {'max_attempts': 5, 'base_delay': 5, 'max_delay': 120, 'hold_slot': True},
+    'rate_limit': {'max_attempts': 4, 'base_delay': 60, 'max_delay': 900, 'hold_slot': False},
+    'forbidden': {'max_attempts': 2, 'base_delay': 15, 'max_delay': 60, 'hold_slot': False},  # Often an expired URL
+    'extractor': {'max_attempts': 2, 'base_delay': 30, 'max_delay': 300, 'hold_slot': False},
+    'ffmpeg': {'max_attempts': 1, 'base_delay': 2, 'max_delay': 2, 'hold_slot': True},  # Retried as a full recode
+    'unknown': {'max_attempts': 1, 'base_delay': 30, 'max_delay': 30, 'hold_slot': False},
+    'disk_full': {'max_attempts': 0, 'base_delay': 0, 'max_delay': 0, 'hold_slot': False},
+    'permanent': {'max_attempts': 0, 'base_delay': 0, 'max_delay': 0, 'hold_slot': False},
+}
+TRACKING_QUERY_PARAMS = {'si', 'feature', 'fbclid', 'gclid', 'pp', 'ab_channel'}  # Ignored in URL keys
+TRACKING_QUERY_PREFIXES = ('utm_',)  # Query parameters starting with these are ignored in URL keys too
+INFO_JSON_CACHE_SIZE = 64  # Number of probed URLs whose yt-dlp info JSON is kept in memory
+PROGRESS_UI_INTERVAL = 0.25  # Minimum seconds between progress/elapsed-time UI updates per item
+UI_TICK_MS = 66  # Worker thread updates are applied to the widgets at most ~15 times per second
+DEFAULT_LOG_MAX_LINES = 5000  # Lines kept by the log window; older ones are trimmed from the top
+LOG_FILTER_ALL = "All tasks"
+
+# Engine process: runs the downloads so their parsing and I/O do not share the GIL with the Tk main loop
+ENGINE_STATE_FIELDS = ('status', 'status_color', 'progress_value', 'progress_mode', 'progress_running',
+                       'elapsed_text', 'abort_enabled', 'is_merging')  # Sent to the GUI at the UI tick rate
+ENGINE_START_FIELDS = ('fragment_concurrency', 'force_recode', 'container_route', 'discard_temp_on_finish')
+ENGINE_RESULT_FIELDS = ('last_return_code', 'output_tail', 'last_error_message', 'container_route')
+ENGINE_STOP_TIMEOUT = 3.0  # Seconds the window waits on close for the engine to kill its yt-dlp/FFmpeg processes
+
+# yt-dlp prints one JSON object per progress tick with these templates (see _build_command)
+YT_DLP_PROGRESS_FIELDS = "status,downloaded_bytes,total_bytes,total_bytes_estimate,speed,eta,fragment_index,fragment_count"
+YT_DLP_DOWNLOAD_TEMPLATE = "download:[uvd-download] %(progress.{" + YT_DLP_PROGRESS_FIELDS + "})j"
+YT_DLP_POSTPROCESS_TEMPLATE = "postprocess:[uvd-postprocess] %(progress.{status,postprocessor})j"
+PROGRESS_LINE_PATTERN = re.compile(r'\[uvd-(download|postprocess)\] (\{.*\})')
+FFMPEG_TIME_PATTERN = re.compile(r'time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})')
+FFMPEG_SPEED_PATTERN = re.compile(r'speed=\s*([0-9\.]+)x')
+
+# Codecs (yt-dlp vcodec/acodec prefixes) that FFmpeg can stream-copy into an MP4 container
+MP4_VIDEO_CODECS = ('avc1', 'avc3', 'h264', 'hev1', 'hvc1', 'hevc', 'h265', 'av01', 'vp09', 'vp9')
+MP4_AUDIO_CODECS = ('mp4a', 'aac', 'mp3', 'opus', 'ac-3', 'ec-3', 'flac', 'alac')
+VIDEO_CODEC_PREFERENCE = ('avc1', 'h264', 'hev1', 'hvc1', 'vp9', 'vp09', 'av01')  # Rough yt-dlp ordering, worst first
 HISTORY_FILE = "download_history.json"  # History file is always fixed
+ARCHIVE_FILE = "download_archive.json"  # Index of completed outputs used to skip duplicate downloads
+QUEUE_JOURNAL_FILE = "queue_journal.jsonl"  # Queued/active items, replayed on startup
+QUEUE_JOURNAL_COMPACT_RECORDS = 500  # Rewrite the journal once it holds this many records more than live items
+QUEUE_STALE_COMPACT_MIN = 64  # Rebuild the ready heaps once they hold this many (and more than live) stale entries
 CONFIG_FILE = "config.json"  # Configuration file name
+HEADLESS_WATCH_INTERVAL = 2.0  # Seconds between scans of the folder watched by --watch
+HEADLESS_PROCESSED_SUBDIR = "processed"  # URL lists picked up from the watched folder are moved here
+API_HOST = "127.0.0.1"  # The control API only listens on the loopback interface
+DEFAULT_API_PORT = 8765
+API_CALL_TIMEOUT = 10.0  # Seconds a request waits for the Tk thread before it is answered with 503
+API_KEEPALIVE_SECONDS = 15.0  # An idle event stream gets a comment line this often, so dead clients are noticed
+API_EVENT_BACKLOG = 1000  # Updates buffered per event stream client; a client further behind misses updates
+API_MAX_BODY_BYTES = 1024 * 1024
 
 # Colors for buttons/status
 COLOR_ADD_BUTTON = "#28A745"  # Green
@@ -57,6 +156,13 @@ COLOR_QUEUED_ITEM = "#fff3cd"
 COLOR_COMPLETED_ITEM = "#d4edda"
 COLOR_FAILED_ITEM = "#f8d7da"
 
+# Virtualized download list
+ROW_HEIGHT = 46  # Pixels per row slot, including the gap between rows
+DOWNLOAD_LIST_TAG = "DownloadList"  # Bind tag of the list and its rows, for mouse wheel scrolling
+LIST_WHEEL_ROWS = 3  # Rows scrolled per mouse wheel notch
+TITLE_FIT_CACHE_SIZE = 4096  # Fitted titles remembered per (title, column width)
+RESIZE_DEBOUNCE_MS = 150  # The list is laid out again once the window has stopped resizing for this long
+
 
 class PlaceholderEntry(tk.Entry):
     """Entry widget with placeholder text support."""
@@ -162,21 +268,6 @@ class ToolTip:
 def create_tooltip(widget, text):
     """Helper function to create a tooltip for a widget."""
     return ToolTip(widget, text)
-        label = tk.Label(tw, text=self.text, justify=tk.LEFT,
-                        background="#ffffe0", relief=tk.SOLID, borderwidth=1,
-                        font=SMALL_FONT, wraplength=300)
-        label.pack(ipadx=1)
-
-    def hidetip(self):
-        tw = self.tipwindow
-        self.tipwindow = None
-        if tw:
-            tw.destroy()
-
-
-def create_tooltip(widget, text):
-    """Helper function to create tooltips easily."""
-    return ToolTip(widget, text)
 
 
 def is_ts_url(url):
@@ -185,63 +276,858 @@ def is_ts_url(url):
     return url_lower.endswith('.ts') or url_lower.endswith('.m3u8') or '.m3u8' in url_lower or '.ts' in url_lower
 
 
+PLAYLIST_URL_PATTERN = re.compile(
+    r'[?&]list=|/playlist(?:[/?]|$)|/channel/|/c/|/user/|/@[^/?]+/?(?:videos|streams|shorts)?/?$|/sets/|/showcase/',
+    re.IGNORECASE)
+
+
+SINGLE_VIDEO_QUERY_PATTERN = re.compile(r'[?&]v=', re.IGNORECASE)
+
+
+def is_playlist_url(url):
+    """
+    Detects if URL points to a playlist, channel or other multi-video page. A link to one video opened
+    from a playlist (watch?v=...&list=...) counts as that video, see is_video_in_playlist_url.
+    """
+    return PLAYLIST_URL_PATTERN.search(url) is not None and not SINGLE_VIDEO_QUERY_PATTERN.search(url)
+
+
+def is_video_in_playlist_url(url):
+    """Detects a link to one video that also names the playlist it was opened from."""
+    return SINGLE_VIDEO_QUERY_PATTERN.search(url) is not None and PLAYLIST_URL_PATTERN.search(url) is not None
+
+
+def sanitize_filename(name):
+    """Removes characters that are not allowed in Windows filenames."""
+    return re.sub(r'[\\/:*?"<>|]', '', name)
+
+
+def fetch_flat_playlist_page(yt_dlp_path, playlist_url, start, count, referer=None):
+    """
+    Fetches one page of playlist entries using yt-dlp flat extraction.
+    Returns a list of entry dicts (url, title, id, ...), one per video.
+    """
+    command = [yt_dlp_path, "--flat-playlist", "--yes-playlist", "--dump-json", "--ignore-errors",
+               "--playlist-items", f"{start}:{start + count - 1}", playlist_url]
+    if referer:
+        command += ["--add-header", f"referer: {referer}"]
+    result = subprocess.run(command, capture_output=True, text=True,
+                            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
+                            timeout=120)
+    entries = []
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    if not entries and result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"yt-dlp exited with code {result.returncode}")
+    return entries
+
+
+_info_json_cache = OrderedDict()  # (url, referer) -> yt-dlp info dict, least recently used first
+_info_json_cache_lock = threading.Lock()
+
+
+def get_cached_info_json(url, referer=None):
+    """Returns the cached yt-dlp info dict for a URL, or None if it has not been probed yet."""
+    with _info_json_cache_lock:
+        info = _info_json_cache.get((url, referer or ''))
+        if info is not None:
+            _info_json_cache.move_to_end((url, referer or ''))
+        return info
+
+
+def store_cached_info_json(url, referer, info):
+    with _info_json_cache_lock:
+        _info_json_cache[(url, referer or '')] = info
+        while len(_info_json_cache) > INFO_JSON_CACHE_SIZE:
+            _info_json_cache.popitem(last=False)
+
+
+def fetch_info_json(yt_dlp_path, url, referer=None, owner=None):
+    """
+    Probes a URL with yt-dlp (no download) and returns its info dict, including the format list.
+    Results are cached so the title fetch, the quality menu and the download share one probe.
+    With owner (a DownloadItem), the probe runs as owner.probe_process so aborting the item kills it.
+    Raises the subprocess/JSON errors of the probe to the caller.
+    """
+    info = get_cached_info_json(url, referer)
+    if info is not None:
+        return info
+    command = [yt_dlp_path, "--dump-json", "--skip-download", "--no-playlist", url]
+    if referer:
+        command += ["--add-header", f"referer: {referer}"]
+    if owner is not None and owner.is_aborted:
+        raise RuntimeError("Aborted before probing")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0)
+    if owner is not None:
+        owner.probe_process = process
+        if owner.is_aborted:
+            process.kill()  # Aborted while the probe was starting
+    try:
+        stdout, stderr = process.communicate(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    finally:
+        if owner is not None:
+            owner.probe_process = None
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+    first_line = stdout.strip().splitlines()[0] if stdout.strip() else ""
+    info = json.loads(first_line)
+    store_cached_info_json(url, referer, info)
+    return info
+
+
+def format_bytes(num_bytes):
+    """Formats a byte count as a short human readable string (e.g. '12.3 MiB')."""
+    size = float(num_bytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def build_format_choices(info):
+    """
+    Groups the formats of a yt-dlp info dict into combined, audio-only and video-only choices.
+    Each group is a list of (menu label, format selector) tuples, best quality first.
+    Video-only selectors get '+bestaudio' appended so the result still has sound.
+    """
+    combined, audio_only, video_only = [], [], []
+    duration = info.get('duration') or 0
+    for fmt in info.get('formats') or []:
+        format_id = fmt.get('format_id')
+        vcodec = fmt.get('vcodec') or 'none'
+        acodec = fmt.get('acodec') or 'none'
+        if not format_id or (vcodec == 'none' and acodec == 'none') or fmt.get('ext') == 'mhtml':
+            continue  # Storyboards and formats without any usable stream
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        if not size and duration and fmt.get('tbr'):
+            size = fmt['tbr'] * 1000 / 8 * duration  # tbr is in KBit/s
+        size_text = f" · ~{format_bytes(size)}" if size else ""
+        codec_text = vcodec.split('.')[0] if vcodec != 'none' else acodec.split('.')[0]
+        if vcodec != 'none':
+            height = fmt.get('height') or 0
+            fps = f"{fmt['fps']:.0f}" if fmt.get('fps') else ""
+            resolution = f"{height}p{fps}" if height else (fmt.get('resolution') or "video")
+            label = f"{resolution} · {codec_text} · {fmt.get('ext', '?')}{size_text} [{format_id}]"
+            if acodec != 'none':
+                combined.append((height, fmt.get('tbr') or 0, label, format_id))
+            else:
+                video_only.append((height, fmt.get('tbr') or 0, label, f"{format_id}+bestaudio"))
+        else:
+            abr = fmt.get('abr') or 0
+            label = f"{abr:.0f} kbps · {codec_text} · {fmt.get('ext', '?')}{size_text} [{format_id}]"
+            audio_only.append((abr, 0, label, format_id))
+
+    def _sorted(group):
+        return [(label, selector) for _, _, label, selector in sorted(group, key=lambda g: (g[0], g[1]),
+                                                                     reverse=True)]
+
+    return _sorted(combined), _sorted(audio_only), _sorted(video_only)
+
+
+def select_formats_from_info(info, format_selector):
+    """
+    Predicts which formats yt-dlp will download for a selector, using a probed info dict.
+    Handles the selectors this app generates (pinned IDs, 'id+bestaudio', height-capped and auto).
+    Returns a list of format dicts, or None if the selection cannot be predicted.
+    """
+    formats = info.get('formats') or []
+    by_id = {fmt.get('format_id'): fmt for fmt in formats}
+    # The probe ran with yt-dlp's default selector, so its choice is the best guess for "best"
+    requested = info.get('requested_formats') or ([info] if info.get('vcodec') or info.get('acodec') else [])
+
+    def _best_audio():
+        for fmt in requested:
+            if (fmt.get('vcodec') or 'none') == 'none' and (fmt.get('acodec') or 'none') != 'none':
+                return fmt
+        audio = [f for f in formats if (f.get('vcodec') or 'none') == 'none' and (f.get('acodec') or 'none') != 'none']
+        return max(audio, key=lambda f: f.get('abr') or f.get('tbr') or 0) if audio else None
+
+    def _video_rank(fmt):
+        codec = (fmt.get('vcodec') or '').split('.')[0]
+        codec_rank = VIDEO_CODEC_PREFERENCE.index(codec) if codec in VIDEO_CODEC_PREFERENCE else -1
+        return fmt.get('height') or 0, fmt.get('fps') or 0, codec_rank, fmt.get('tbr') or 0
+
+    if not format_selector or format_selector.startswith('bestvideo+bestaudio'):
+        return list(requested) or None
+
+    height_match = re.match(r'bestvideo\[height<=(\d+)\]', format_selector)
+    if height_match:
+        max_height = int(height_match.group(1))
+        videos = [f for f in formats if (f.get('vcodec') or 'none') != 'none' and (f.get('height') or 0) <= max_height]
+        video_only = [f for f in videos if (f.get('acodec') or 'none') == 'none']
+        combined = [f for f in videos if (f.get('acodec') or 'none') != 'none']
+        audio = _best_audio()
+        if video_only and audio:
+            return [max(video_only, key=_video_rank), audio]
+        return [max(combined, key=_video_rank)] if combined else None
+
+    selected = []
+    for part in format_selector.split('+'):
+        fmt = _best_audio() if part == 'bestaudio' else by_id.get(part)
+        if fmt is None:
+            return None
+        selected.append(fmt)
+    return selected
+
+
+def choose_mp4_route(formats):
+    """
+    Decides how yt-dlp should produce an MP4 from the selected formats.
+    Returns (route, reason) where route is 'merge' (stream copy of separate video/audio), 'remux'
+    (stream copy into a new container), 'direct' (already MP4) or 'recode' (full transcode).
+    """
+    if not formats:
+        return 'recode', "format metadata unavailable"
+    vcodecs = [(f.get('vcodec') or 'none').lower() for f in formats if (f.get('vcodec') or 'none') != 'none']
+    acodecs = [(f.get('acodec') or 'none').lower() for f in formats if (f.get('acodec') or 'none') != 'none']
+    codecs_text = " + ".join(c.split('.')[0] for c in vcodecs + acodecs) or "unknown codecs"
+    if not all(c.startswith(MP4_VIDEO_CODECS) for c in vcodecs) or \
+            not all(c.startswith(MP4_AUDIO_CODECS) for c in acodecs):
+        return 'recode', f"{codecs_text} need re-encoding for MP4"
+    if len(formats) > 1:
+        return 'merge', f"{codecs_text} fit MP4"
+    if formats[0].get('ext') == 'mp4':
+        return 'direct', f"{codecs_text} already in MP4"
+    return 'remux', f"{codecs_text} fit MP4"
+
+
+def estimate_job_size_mb(info, format_selector, mp3_conversion):
+    """
+    Rough download size in MB for shortest-first ordering, from the probed sizes of the formats
+    the selector will pick, their bitrates or the duration. Returns None if nothing hints at a size.
+    """
+    duration = info.get('duration')
+    formats = None if mp3_conversion else select_formats_from_info(info, format_selector)
+    if formats:
+        sizes = [fmt.get('filesize') or fmt.get('filesize_approx') for fmt in formats]
+        if all(sizes):
+            return sum(sizes) / (1024 * 1024)
+        total_kbps = sum(fmt.get('tbr') or 0 for fmt in formats)
+        if total_kbps and duration:
+            return total_kbps * 1000 / 8 * duration / (1024 * 1024)
+    if duration:
+        return duration * (ASSUMED_AUDIO_MB_PER_SECOND if mp3_conversion else ASSUMED_VIDEO_MB_PER_SECOND)
+    size = info.get('filesize') or info.get('filesize_approx')
+    return size / (1024 * 1024) if size else None
+
+
+def normalize_url(url):
+    """
+    Normalises a URL for duplicate detection: lower-case host without 'www.'/'m.', no fragment,
+    no tracking parameters, sorted query. YouTube short/watch links collapse to the video ID.
+    """
+    parsed = urllib.parse.urlparse(url.strip())
+    host = parsed.netloc.lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parsed.query)
+             if not (k in TRACKING_QUERY_PARAMS or k.startswith(TRACKING_QUERY_PREFIXES))]
+    path = parsed.path.rstrip('/') or '/'
+    if host == 'youtu.be':
+        host, query, path = 'youtube.com', [('v', path.lstrip('/'))], '/watch'
+    elif host.endswith('youtube.com') and path == '/watch':
+        query = [(k, v) for k, v in query if k == 'v']
+    return urllib.parse.urlunparse(('https', host, path, '', urllib.parse.urlencode(sorted(query)), ''))
+
+
+def get_host_key(url):
+    """Site a URL belongs to for politeness limits: lower-case host without 'www.'/'m.' and port."""
+    host = (urllib.parse.urlparse(url.strip()).hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def parse_host_limits(text):
+    """
+    Parses per-site limits written as 'example.com=2/1.5, other.org=1' (max downloads / seconds between
+    starts, the seconds being optional) into {'example.com': [2, 1.5], 'other.org': [1, None]}.
+    Raises ValueError on malformed entries.
+    """
+    limits = {}
+    for part in re.split(r'[,;\n]+', text):
+        part = part.strip()
+        if not part:
+            continue
+        domain, sep, value = part.partition('=')
+        domain = get_host_key('//' + domain.strip()) if sep else ''
+        if not domain:
+            raise ValueError(f"'{part}' is not in the form domain=max/seconds")
+        max_text, _, interval_text = value.partition('/')
+        limits[domain] = [max(1, int(max_text)), float(interval_text) if interval_text.strip() else None]
+    return limits
+
+
+def format_host_limits(limits):
+    """Inverse of parse_host_limits, for showing the limits in the settings window."""
+    return ", ".join(f"{domain}={max_concurrent}" + (f"/{interval:g}" if interval is not None else "")
+                     for domain, (max_concurrent, interval) in sorted(limits.items()))
+
+
+def get_default_settings():
+    """Settings used where config.json does not say otherwise."""
+    return {
+        "show_log_window": False,
+        "max_concurrent_downloads": DEFAULT_MAX_CONCURRENT_DOWNLOADS,  # Network slots
+        "max_cpu_jobs": DEFAULT_MAX_CPU_JOBS,
+        "max_merge_jobs": DEFAULT_MAX_MERGE_JOBS,
+        "output_directory": DEFAULT_DOWNLOADS_DIR,
+        "default_default_quality": "Auto (Best available)",
+        "default_local_quality": "Medium Quality MP4",
+        "remember_delete_choice": False,  # New setting: if True, skips confirmation dialog
+        "delete_file_on_remove": False,
+        # New setting: stores the remembered choice (if remember_delete_choice is True)
+        "delete_file_on_remove_default": False,  # New setting: default for 'also delete file' checkbox in dialog
+        "expand_playlists": True,  # Expand playlist/channel URLs into one queue entry per video
+        "playlist_page_size": DEFAULT_PLAYLIST_PAGE_SIZE,  # Entries loaded per page while expanding
+        "fragments_per_item": DEFAULT_FRAGMENTS_PER_ITEM,  # Upper limit of fragment workers for one download
+        "fragment_budget": DEFAULT_FRAGMENT_BUDGET,  # Fragment workers shared out across active downloads
+        "mp3_audio_bitrate": MP3_BITRATE_OPTIONS[0],  # Preferred source/target bitrate for MP3 jobs
+        "duplicate_action": DUPLICATE_ACTIONS[0],  # What adding an already downloaded item does
+        "temp_max_age_days": DEFAULT_TEMP_MAX_AGE_DAYS,  # Age limit for kept partial downloads
+        "temp_max_size_mb": DEFAULT_TEMP_MAX_SIZE_MB,  # Total size limit for kept partial downloads
+        "auto_retry": True,  # Retry transient failures automatically, see RETRY_POLICIES
+        "host_max_concurrent": DEFAULT_HOST_MAX_CONCURRENT,
+        "host_min_start_interval": DEFAULT_HOST_MIN_START_INTERVAL,
+        "scheduling_policy": SCHEDULING_POLICIES[0],
+        "log_max_lines": DEFAULT_LOG_MAX_LINES,
+        "engine_process": True,  # Run downloads in a separate process; takes effect on restart
+        "api_enabled": False,  # Local HTTP/JSON control API, see ControlAPIServer
+        "api_port": DEFAULT_API_PORT,
+        "host_limits": {}  # domain -> [max downloads, seconds between starts or None], see parse_host_limits
+    }
+
+
+def read_settings_file(path=CONFIG_FILE):
+    """
+    Returns (settings, error): the defaults updated with the keys of the JSON file at path that are known,
+    and the load error, if any. A missing file is not an error.
+    """
+    settings = get_default_settings()
+    if not os.path.exists(path):
+        return settings, None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            loaded_settings = json.load(f)
+    except (IOError, json.JSONDecodeError) as e:
+        return settings, e
+    # Update defaults with loaded settings, ensuring new keys are added
+    for key, value in loaded_settings.items():
+        if key in settings:  # Only update if key exists in default settings
+            settings[key] = value
+
+    # Handle renaming of default_youtube_quality to default_default_quality
+    if 'default_youtube_quality' in loaded_settings and 'default_default_quality' not in loaded_settings:
+        settings['default_default_quality'] = loaded_settings['default_youtube_quality']
+    return settings, None
+
+
+def get_yt_dlp_path():
+    """yt-dlp bundled with a PyInstaller build, else the one on PATH."""
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, 'yt-dlp.exe')
+    return 'yt-dlp.exe'
+
+
+def lookup_host_limits(settings, host):
+    """(max concurrent downloads, min seconds between starts) for a host; 'a.example.com' uses 'example.com' limits."""
+    max_concurrent = int(settings['host_max_concurrent'])
+    min_interval = float(settings['host_min_start_interval'])
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        override = settings['host_limits'].get('.'.join(labels[i:]))
+        if override:
+            max_concurrent = override[0]
+            if override[1] is not None:
+                min_interval = override[1]
+            break
+    return max(1, max_concurrent), max(0.0, min_interval)
+
+
+def build_content_id(info):
+    """
+    "<extractor>:<video id>" of a yt-dlp info dict, or '' if unknown. Flat playlist entries name the
+    extractor in 'ie_key', probed videos in 'extractor_key'; both map to the same ID.
+    """
+    extractor = info.get('extractor_key') or info.get('ie_key')
+    if not extractor or not info.get('id'):
+        return ''
+    return normalize_content_id(f"{extractor}:{info['id']}")
+
+
+def normalize_content_id(content_id):
+    """Lower-cases the extractor part; video IDs are case-sensitive and kept as they are."""
+    extractor, sep, video_id = content_id.partition(':')
+    return f"{extractor.lower()}{sep}{video_id}"
+
+
+def build_archive_keys(source_path, content_id, mp3_conversion, format_id, quality):
+    """
+    Returns the archive keys of a job: its extractor ID (if known) and its normalised URL,
+    each combined with the output settings that change the produced file.
+    """
+    output_key = "mp3" if mp3_conversion else f"mp4|{format_id or quality}"
+    keys = [f"url:{normalize_url(source_path)}|{output_key}"]
+    if content_id:
+        keys.insert(0, f"id:{normalize_content_id(content_id)}|{output_key}")
+    return keys
+
+
+class DownloadArchive:
+    """
+    Persistent index of completed outputs. Each finished job is stored under all of its
+    archive keys so a lookup is a dictionary hit, whether the job is known by ID or by URL.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Error loading download archive: {e}")
+
+    def lookup(self, keys):
+        """Returns the archive entry for the first matching key whose file still exists, else None."""
+        with self._lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry and os.path.exists(entry['file']):
+                    return entry
+        return None
+
+    def record(self, keys, entry):
+        """Stores a completed output under all of its keys and saves the archive."""
+        with self._lock:
+            for key in keys:
+                self.entries[key] = entry
+            self._save()
+
+    def forget(self, keys):
+        """Drops the entries for a job (e.g. when its file was deleted)."""
+        with self._lock:
+            if any(self.entries.pop(key, None) for key in keys):
+                self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except IOError as e:
+            print(f"Error saving download archive: {e}")
+
+
+class QueueJournal:
+    """
+    Append-only journal of queued and active items, so the queue survives closing the app or a crash.
+    Each line is a 'put' (full item data) or 'del' record. Records are buffered and written by flush(),
+    which the UI tick calls, so one tick's changes share a single fsync. Replaying the file gives the live
+    items; a torn last line from a crash is ignored. The file is compacted by rewriting only the live items
+    once it has grown well past them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.items = OrderedDict()  # item id -> latest item data
+        self.record_count = 0
+        self._pending = []  # Records not yet written, see flush
+        self._lock = threading.Lock()
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        torn = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        torn = True  # Torn write from a crash
+                        continue
+                    self.record_count += 1
+                    if record.get('op') == 'put':
+                        self.items[record['item']['id']] = record['item']
+                    elif record.get('op') == 'del':
+                        self.items.pop(record['id'], None)
+        except IOError as e:
+            print(f"Error reading queue journal: {e}")
+        if torn:
+            self._rewrite()  # Later appends must not continue the torn line
+
+    def put(self, item_data):
+        """Records the current state of a queued or active item."""
+        with self._lock:
+            self.items[item_data['id']] = item_data
+            self._pending.append({'op': 'put', 'item': item_data})
+
+    def delete(self, item_id):
+        """Records that an item left the queue (finished, removed or cleared)."""
+        with self._lock:
+            if self.items.pop(item_id, None) is not None:
+                self._pending.append({'op': 'del', 'id': item_id})
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
+            self._rewrite()
+
+    def compact(self):
+        with self._lock:
+            self._rewrite()
+
+    def replace_all(self, items_data):
+        """Rewrites the journal with exactly these items, in this order."""
+        with self._lock:
+            self.items = OrderedDict((item_data['id'], item_data) for item_data in items_data)
+            self._rewrite()
+
+    def flush(self):
+        """Writes the buffered records with one fsync. Cheap when nothing changed."""
+        with self._lock:
+            if not self._pending:
+                return
+            records, self._pending = self._pending, []
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(record) + "\n" for record in records))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.record_count += len(records)
+            except IOError as e:
+                print(f"Error writing queue journal: {e}")
+            if self.record_count - len(self.items) > QUEUE_JOURNAL_COMPACT_RECORDS:
+                self._rewrite()
+
+    def _rewrite(self):
+        self._pending = []  # The rewrite holds the latest state of every item
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for item_data in self.items.values():
+                    f.write(json.dumps({'op': 'put', 'item': item_data}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.record_count = len(self.items)
+        except IOError as e:
+            print(f"Error compacting queue journal: {e}")
+
+
+class ReadyQueue:
+    """
+    Download queue ordered by priority, FIFO within a priority. Items still fetching their title wait
+    apart from the ready items, so the scheduler never scans past them. Ready items are kept in one heap
+    per start pool and host, so a full pool or a host at its politeness limit is skipped as a whole
+    instead of item by item. Heap entries are removed lazily: an entry is stale once its key no longer
+    matches the item's. Stale entries are dropped when they reach the top of a heap, and all heaps are
+    rebuilt once stale entries outnumber live ones.
+    """
+
+    def __init__(self, policy=SCHEDULING_POLICIES[0], pool_of=None):
+        self.policy = policy  # One of SCHEDULING_POLICIES; decides the order within a priority
+        self.pool_of = pool_of or (lambda item: None)  # Resource pool an item needs to start in
+        # (pool, host) -> heap of (-priority, seq, push counter, item); the counter avoids comparing items
+        self._heaps = {}
+        self._stale = 0  # Stale entries still in the heaps
+        self._keys = {}  # ready item -> its live (-priority, seq) key
+        self._waiting = OrderedDict()  # items not ready yet, in arrival order
+        self._next_seq = 0
+        self._front_seq = 0  # Decreasing, for items put in front of everything of their priority
+        self._push_counter = 0
+        self._order = None  # Cached ordered() list, dropped whenever the queue or an item's key changes
+        self._positions = None  # item -> 1-based place in _order
+
+    def __len__(self):
+        return len(self._keys) + len(self._waiting)
+
+    def __contains__(self, item):
+        return item in self._keys or item in self._waiting
+
+    def __iter__(self):
+        return iter(self.ordered())
+
+    def ordered(self):
+        """All queued items in the order they would start, ready or not. Cached until the queue changes."""
+        if self._order is None:
+            self._order = sorted(list(self._keys) + list(self._waiting),
+                                 key=lambda item: (-item.priority, item.queue_seq))
+        return self._order
+
+    def position(self, item):
+        """1-based place of an item in ordered(), or None if it is not queued."""
+        if self._positions is None:
+            self._positions = {queued: place for place, queued in enumerate(self.ordered(), start=1)}
+        return self._positions.get(item)
+
+    def _order_changed(self):
+        self._order = None
+        self._positions = None
+
+    def ready_count(self):
+        return len(self._keys)
+
+    def _order_value(self, item):
+        if self.policy == "Shortest first":
+            # Virtual deadline: time spent waiting counts against size, so large jobs cannot starve
+            return item.queue_enqueue_time + item.estimated_size_mb * SJF_AGING_SECONDS_PER_MB
+        return item.queue_arrival  # FIFO; fair share is FIFO per site, the sites take turns in pop_next
+
+    def append(self, item, front=False, enqueue_time=None):
+        """Queues an item; enqueue_time restores the aging anchor of an item queued in an earlier session."""
+        item.queue_arrival = self._next_seq
+        self._next_seq += 1
+        item.queue_enqueue_time = enqueue_time or time.time()
+        item.queue_pinned = front  # Pinned items keep a manually chosen place when the policy re-sorts
+        if front:
+            self._front_seq -= 1
+            item.queue_seq = self._front_seq
+        else:
+            item.queue_seq = self._order_value(item)
+        if item.ready_for_download:
+            self._push(item)
+        else:
+            self._waiting[item] = None
+            self._order_changed()
+
+    def _push(self, item):
+        if item in self._keys:
+            self._stale += 1  # Its previous entry
+        key = (-item.priority, item.queue_seq)
+        self._keys[item] = key
+        self._order_changed()
+        self._push_counter += 1
+        heapq.heappush(self._heaps.setdefault((self.pool_of(item), item.host), []),
+                       (key[0], key[1], self._push_counter, item))
+        self._compact_if_stale()
+
+    def _compact_if_stale(self):
+        if self._stale <= max(QUEUE_STALE_COMPACT_MIN, len(self._keys)):
+            return
+        self._heaps = {}
+        for item, key in self._keys.items():
+            self._push_counter += 1
+            self._heaps.setdefault((self.pool_of(item), item.host), []).append(
+                (key[0], key[1], self._push_counter, item))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+        self._stale = 0
+
+    def _live_top(self, heap):
+        """First live entry of a heap, after dropping the stale entries above it; None if there is none."""
+        while heap and self._keys.get(heap[0][3]) != heap[0][:2]:
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0] if heap else None
+
+    def remove(self, item):
+        if self._keys.pop(item, None) is not None:
+            self._stale += 1
+            self._compact_if_stale()
+        self._waiting.pop(item, None)
+        self._order_changed()
+
+    def clear(self):
+        self._heaps.clear()
+        self._keys.clear()
+        self._waiting.clear()
+        self._stale = 0
+        self._order_changed()
+
+    def promote_ready(self):
+        """Moves items whose title has arrived onto the ready heap."""
+        for item in [item for item in self._waiting if item.ready_for_download]:
+            del self._waiting[item]
+            if not item.queue_pinned:
+                item.queue_seq = self._order_value(item)  # The size estimate arrives with the title
+            self._push(item)
+
+    def set_policy(self, policy):
+        """Switches the scheduling policy and re-sorts every queued item, dropping manual moves."""
+        self.policy = policy
+        ready = list(self._keys)
+        self._heaps.clear()
+        self._keys.clear()
+        self._stale = 0
+        for item in ready + list(self._waiting):
+            item.queue_pinned = False
+            item.queue_seq = self._order_value(item)
+        for item in ready:
+            self._push(item)
+        self._order_changed()
+
+    def pop_next(self, pool_allowed=None, host_allowed=None, host_load=None):
+        """
+        Pops the first ready item in order whose start pool has room (pool_allowed(pool)) and whose host
+        is allowed (host_allowed(host)); heaps of a refused pool or host are skipped without looking at
+        their items. With host_load (fair share), the least loaded host goes first within a priority.
+        Returns None if there is no such item.
+        """
+
+        def rank(entry, host):
+            return (entry[0], host_load(host), entry[1]) if host_load else entry[:2]
+
+        best_heap = None
+        best_rank = None
+        for heap_key in list(self._heaps):
+            pool, host = heap_key
+            if pool_allowed is not None and not pool_allowed(pool):
+                continue
+            if host_allowed is not None and not host_allowed(host):
+                continue
+            heap = self._heaps[heap_key]
+            entry = self._live_top(heap)
+            if entry is None:
+                del self._heaps[heap_key]  # Only stale entries were left
+            elif best_heap is None or rank(entry, host) < best_rank:
+                best_heap, best_rank = heap, rank(entry, host)
+        if best_heap is None:
+            return None
+        item = heapq.heappop(best_heap)[3]
+        del self._keys[item]
+        self._order_changed()
+        return item
+
+    def _rekey(self, item):
+        self._order_changed()
+        if item in self._keys:
+            self._push(item)  # The old entry goes stale
+
+    def set_priority(self, item, priority):
+        item.priority = priority
+        self._rekey(item)
+
+    def move_to_top(self, item):
+        """Puts the item in front of every queued item. Only the heap tops are looked at, not the whole queue."""
+        if item not in self:
+            return
+        tops = [self._live_top(heap) for heap in self._heaps.values()]
+        top_priority = max([-entry[0] for entry in tops if entry] + [waiting.priority for waiting in self._waiting])
+        item.priority = max(item.priority, top_priority)
+        self._front_seq -= 1
+        item.queue_seq = self._front_seq
+        item.queue_pinned = True
+        self._rekey(item)
+
+    def move(self, item, offset):
+        """
+        Swaps the item with its neighbour (offset -1 = up, 1 = down), taking over its priority and place.
+        Returns the neighbour, or None if the item did not move.
+        """
+        if item not in self:
+            return None
+        ordered = self.ordered()
+        index = ordered.index(item) + offset
+        if not 0 <= index < len(ordered):
+            return None
+        other = ordered[index]
+        item.priority, other.priority = other.priority, item.priority
+        item.queue_seq, other.queue_seq = other.queue_seq, item.queue_seq
+        item.queue_pinned = other.queue_pinned = True
+        self._rekey(item)
+        self._rekey(other)
+        return other
+
+
+def classify_failure(return_code, output_lines):
+    """
+    Maps a failed run to a failure class from RETRY_POLICIES using its exit code and last output lines.
+    The newest matching line wins, since earlier lines are often warnings that did not cause the failure.
+    """
+    for line in reversed(list(output_lines)):
+        for failure_class, pattern in FAILURE_PATTERNS:
+            if pattern.search(line):
+                return failure_class
+    if return_code is not None and return_code < 0:
+        return 'network'  # Killed by a signal without output, e.g. a dropped connection stalling the tool
+    return 'unknown'
+
+
+def compute_retry_delay(failure_class, attempt):
+    """Exponential backoff for the given attempt (0-based) with jitter, so failed items don't retry in lockstep."""
+    policy = RETRY_POLICIES[failure_class]
+    delay = min(policy['max_delay'], policy['base_delay'] * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
 def parse_m3u8_playlist(m3u8_url, referer=None):
     """
     Parses an M3U8 playlist and returns a list of TS segment URLs.
-    Handles both absolute and relative URLs.
+    Handles both absolute and relative URLs. Network errors are raised so the caller can record them.
     """
-    try:
-        req = urllib.request.Request(m3u8_url)
-        if referer:
-            req.add_header('Referer', referer)
-        req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        
-        with urllib.request.urlopen(req, timeout=30) as response:
-            content = response.read().decode('utf-8', errors='ignore')
-        
-        base_url = '/'.join(m3u8_url.split('/')[:-1]) + '/'
-        segments = []
-        
-        for line in content.splitlines():
-            line = line.strip()
-            if line and not line.startswith('#'):
-                if line.startswith('http://') or line.startswith('https://'):
-                    segments.append(line)
+    req = urllib.request.Request(m3u8_url)
+    if referer:
+        req.add_header('Referer', referer)
+    req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    
+    with urllib.request.urlopen(req, timeout=30) as response:
+        content = response.read().decode('utf-8', errors='ignore')
+    
+    base_url = '/'.join(m3u8_url.split('/')[:-1]) + '/'
+    segments = []
+    
+    for line in content.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            if line.startswith('http://') or line.startswith('https://'):
+                segments.append(line)
+            else:
+                # Relative URL - construct absolute URL
+                if line.startswith('/'):
+                    parsed_base = urllib.parse.urlparse(m3u8_url)
+                    segments.append(f"{parsed_base.scheme}://{parsed_base.netloc}{line}")
                 else:
-                    # Relative URL - construct absolute URL
-                    if line.startswith('/'):
-                        parsed_base = urllib.parse.urlparse(m3u8_url)
-                        segments.append(f"{parsed_base.scheme}://{parsed_base.netloc}{line}")
-                    else:
-                        segments.append(base_url + line)
-        
-        return segments
-    except Exception as e:
-        print(f"Error parsing M3U8 playlist: {e}")
-        return []
+                    segments.append(base_url + line)
+    
+    return segments
 
 
 def download_ts_segment(segment_url, output_path, referer=None):
-    """Downloads a single TS segment to the specified path."""
+    """
+    Downloads a single TS segment to the specified path.
+    Returns (success, error); error carries the exception type and, for HTTP errors, the status.
+    """
     try:
         req = urllib.request.Request(segment_url)
         if referer:
             req.add_header('Referer', referer)
         req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
         
+        # Write to a .part file first so an interrupted segment is never mistaken for a finished one
+        part_path = output_path + '.part'
         with urllib.request.urlopen(req, timeout=60) as response:
-            with open(output_path, 'wb') as f:
+            with open(part_path, 'wb') as f:
                 shutil.copyfileobj(response, f)
-        return True
+        os.replace(part_path, output_path)
+        return True, None
     except Exception as e:
         print(f"Error downloading TS segment {segment_url}: {e}")
-        return False
+        return False, f"{type(e).__name__}: {e}"  # HTTPError reads "HTTP Error 403: Forbidden"
 
 
 def merge_ts_segments(ts_files_list, output_file, ffmpeg_path='ffmpeg'):
     """
     Merges multiple TS segments into a single MP4 file using FFmpeg.
-    Uses concat demuxer for efficient merging.
+    Uses concat demuxer for efficient merging. Returns (success, error).
     """
     try:
         # Create a temporary file list for FFmpeg concat demuxer
@@ -273,10 +1159,143 @@ def merge_ts_segments(ts_files_list, output_file, ffmpeg_path='ffmpeg'):
         except:
             pass
         
-        return result.returncode == 0
+        if result.returncode == 0:
+            return True, None
+        stderr_lines = [line for line in result.stderr.splitlines() if line.strip()]
+        return False, f"ffmpeg exited with code {result.returncode}" + (f": {stderr_lines[-1]}" if stderr_lines else "")
     except Exception as e:
         print(f"Error merging TS segments: {e}")
-        return False
+        return False, f"{type(e).__name__}: {e}"
+
+
+def get_item_log_dir(output_directory, temp_subdir=TEMP_SUBDIR):
+    """Folder holding the per-item log files."""
+    return os.path.join(os.getcwd(), output_directory, temp_subdir, LOG_SUBDIR)
+
+
+class ItemLogFile:
+    """
+    Size-capped log of one item's process output. When the file would grow past ITEM_LOG_MAX_BYTES
+    it is renamed to <name>.1 (older backups shift up) and a new file is started.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.handle = None
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode('utf-8', errors='replace')
+        with self.lock:
+            try:
+                if self.handle is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    self.handle = open(self.path, 'ab')
+                    self.size = os.path.getsize(self.path)
+                if self.size and self.size + len(data) > ITEM_LOG_MAX_BYTES:
+                    self._rotate()
+                self.handle.write(data)
+                self.handle.flush()  # So the log viewer sees output of a running task
+                self.size += len(data)
+            except OSError as e:
+                print(f"Error writing log file {self.path}: {e}")
+
+    def _rotate(self):
+        self.handle.close()
+        for index in range(ITEM_LOG_BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if ITEM_LOG_BACKUPS > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self.handle = open(self.path, 'wb')
+        self.size = 0
+
+    def close(self):
+        with self.lock:
+            if self.handle:
+                self.handle.close()
+                self.handle = None
+
+    @staticmethod
+    def get_files(path):
+        """Existing files of a log as [(path, size)], oldest first, so together they read as one stream."""
+        files = []
+        for candidate in [f"{path}.{index}" for index in range(ITEM_LOG_BACKUPS, 0, -1)] + [path]:
+            try:
+                files.append((candidate, os.path.getsize(candidate)))
+            except OSError:
+                continue
+        return files
+
+    @staticmethod
+    def delete(path):
+        for candidate, _ in ItemLogFile.get_files(path):
+            try:
+                os.remove(candidate)
+            except OSError as e:
+                print(f"Error deleting log file {candidate}: {e}")
+
+
+def read_log_page(files, end_offset, page_bytes=LOG_VIEW_PAGE_BYTES):
+    """
+    Reads up to page_bytes that end at end_offset of the stream formed by files (see ItemLogFile.get_files).
+    Returns (text, start_offset). Unless it reaches the start of the stream, the page begins at a line start.
+    """
+    start_offset = max(0, end_offset - page_bytes)
+    chunks = []
+    file_start = 0
+    for path, size in files:
+        file_end = file_start + size
+        if file_end > start_offset and file_start < end_offset:
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(max(0, start_offset - file_start))
+                    chunks.append(f.read(min(end_offset, file_end) - max(start_offset, file_start)))
+            except OSError as e:
+                print(f"Error reading log file {path}: {e}")
+        file_start = file_end
+    data = b"".join(chunks)
+    if start_offset > 0:
+        newline = data.find(b"\n")
+        if 0 <= newline < len(data) - 1:
+            data = data[newline + 1:]
+            start_offset += newline + 1
+    return data.decode('utf-8', errors='replace'), start_offset
+
+
+class UIUpdateBus:
+    """
+    Hand-off point between worker threads and the Tk thread. Workers only change an item's plain
+    attributes and mark it dirty, queue log text or post a callback; the Tk thread drains the bus once
+    per tick, so a chatty process costs at most one redraw per item per tick, showing its latest state.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dirty_items = set()
+        self.log_chunks = []
+        self.callbacks = []
+
+    def mark_dirty(self, item):
+        with self.lock:
+            self.dirty_items.add(item)
+
+    def post_log(self, item_id, text):
+        with self.lock:
+            self.log_chunks.append((item_id, text))
+
+    def post_call(self, callback):
+        """Runs callback on the Tk thread at the next tick; callbacks run in the order they were posted."""
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def drain(self):
+        with self.lock:
+            dirty_items, self.dirty_items = self.dirty_items, set()
+            log_chunks, self.log_chunks = self.log_chunks, []
+            callbacks, self.callbacks = self.callbacks, []
+        return dirty_items, log_chunks, callbacks
 
 
 class DownloadItem:
@@ -286,12 +1305,15 @@ class DownloadItem:
     """
 
     def __init__(self, app_instance, item_data, is_active_item=True):
-        self.parent_frame = None
         self.app_instance = app_instance
 
         self.item_id = item_data.get('id')
         self.source_path = item_data.get('source_path', item_data.get('url'))
         self.quality = item_data.get('quality', 'N/A')
+        self.format_id = item_data.get('format_id', '')  # Exact yt-dlp format selector picked from probed formats
+        self.container_route = item_data.get('container_route', '')  # How the MP4 was produced (merge/remux/recode)
+        self.content_id = item_data.get('content_id', '')  # "<extractor>:<video id>" once known
+        self.output_file = item_data.get('output_file', '')  # Absolute path of the finished file, see get_output_path
         self.filename = str(item_data.get('filename', ''))
         self.mp3_conversion = item_data.get('mp3_conversion', False)
         self.source = item_data.get('source', 'N/A')
@@ -333,147 +1355,86 @@ class DownloadItem:
             self.expected_final_ext = ".mp3" if self.mp3_conversion else ".mp4"
 
         self.process = None
-        self.output_queue = queue.Queue()
+        self.probe_process = None  # Metadata probe the worker runs before the download, see fetch_info_json
+        self.fragment_concurrency = 1  # Fragment workers allotted by the scheduler when the item starts
+        self.log_file = None  # ItemLogFile of the current run, opened by run_download
+        self.is_running = False  # Worker thread of this process is running the item
+        self.running_in_engine = False  # The engine process is running the item; see EngineClient
         self.start_time = None
         self.last_update_time = None
+        self.last_progress_report_time = 0  # When the progress bar/status were last updated from a progress tick
         self.is_aborted = False
         self.is_merging = False
+        self.discard_temp_on_finish = False  # Set when the item is removed, so partial files are not kept
+        self.output_tail = deque(maxlen=OUTPUT_TAIL_LINES)  # Last output lines, used to classify failures
+        self.last_return_code = None
+        self.last_error_message = ''
+        self.failure_class = ''
+        self.retry_attempts = {}  # Automatic retries made so far, per failure class
+        self.retry_timer_id = None  # Pending automatic retry, if any
+        self.force_recode = False  # Set after a failed stream-copy post-processing step
+        self.resource_pool = None  # Pool in RESOURCE_POOLS this item currently counts against while running
+        self.priority = item_data.get('priority', PRIORITY_LEVELS["Normal"])
+        self.host = '' if self.is_local_conversion else get_host_key(self.source_path)  # Politeness limits key
+        self.queue_seq = 0  # Order within its priority, assigned by ReadyQueue
+        self.queue_arrival = 0
+        self.queue_enqueue_time = 0
+        self.queue_pinned = False
+        # Refined from metadata for shortest-first ordering; journaled so a restart keeps it
+        self.estimated_size_mb = item_data.get('estimated_size_mb', SJF_DEFAULT_SIZE_MB)
+        if self.is_local_conversion and os.path.isfile(self.source_path):
+            self.estimated_size_mb = os.path.getsize(self.source_path) / (1024 * 1024)
         self.is_active_item = is_active_item
 
-        self.frame = None
-        self.retry_button = None
+        self.row = None  # DownloadRow currently showing this item, while it is scrolled into view
+        self.status_color = self._get_status_color(self.status)
+        self.progress_value = 0
+        self.progress_mode = "determinate"
+        self.progress_running = False  # Indeterminate bar animating (merges/conversions)
+        self.elapsed_text = self._format_seconds_to_dd_hh_mm_ss(self.elapsed_time_seconds)
+        self.abort_enabled = True
+        self.display_key = None  # Sort key the item is filed under in the download list; None while not listed
 
         if self.is_active_item and not self.filename_provided_by_user and not self.is_title_fetched and not self.is_local_conversion and not self.is_ts_stream:
             self.fetch_title_async()
 
-    def _build_frame_widgets(self):
-        """Builds or rebuilds the UI elements for this individual download item."""
-        if self.frame and self.frame.winfo_exists():
-            self.frame.destroy()
-
-        # Enhanced visual styling based on status
-        bg_color = COLOR_BG_LIGHT
-        if self.is_active_item:
-            if self.status == "queued":
-                bg_color = COLOR_QUEUED_ITEM
-            elif self.status in ["active", "Downloading", "Converting"]:
-                bg_color = COLOR_ACTIVE_ITEM
-        elif self.status == "completed":
-            bg_color = COLOR_COMPLETED_ITEM
-        elif self.status == "failed":
-            bg_color = COLOR_FAILED_ITEM
-        
-        self.frame = tk.Frame(self.parent_frame, bd=2, relief=tk.RAISED, padx=4, pady=4, 
-                             bg=bg_color, highlightbackground=COLOR_BORDER, highlightthickness=1)
-        self.frame.columnconfigure(0, weight=4)
-        self.frame.columnconfigure(1, weight=2)
-        self.frame.columnconfigure(2, weight=1)
-        self.frame.columnconfigure(3, weight=1)
-        self.frame.columnconfigure(4, weight=1)
-        self.frame.columnconfigure(5, weight=1)
-        self.frame.columnconfigure(6, weight=1)  # Added for new 'Remove' button
-
-        self.title_label = tk.Label(self.frame, text="", font=MAIN_FONT, anchor="w", bg=bg_color, 
-                                    justify="left", cursor="hand2")
-        self.title_label.grid(row=0, column=0, sticky="nw", padx=4, pady=2)
-        # Add tooltip for title
-        if hasattr(self, 'video_title') and self.video_title:
-            create_tooltip(self.title_label, f"Source: {self.source}\nURL: {self.source_path[:100] if len(self.source_path) > 100 else self.source_path}")
-
-        self.status_progress_frame = tk.Frame(self.frame, bg=bg_color)
-        self.status_progress_frame.grid(row=0, column=1, sticky="nsew", padx=4, pady=2)
-        self.status_progress_frame.columnconfigure(0, weight=1)
-
-        # Enhanced progress bar with better styling
-        style = ttk.Style()
-        style.theme_use('default')
-        style.configure("Custom.Horizontal.TProgressbar", 
-                       background=COLOR_STATUS_PROGRESS,
-                       troughcolor=COLOR_BG_LIGHT,
-                       borderwidth=0,
-                       lightcolor=COLOR_STATUS_PROGRESS,
-                       darkcolor=COLOR_STATUS_PROGRESS)
-        
-        self.progress_bar = ttk.Progressbar(self.status_progress_frame, orient="horizontal", 
-                                           mode="determinate", length=150, style="Custom.Horizontal.TProgressbar")
-        self.status_label = tk.Label(self.status_progress_frame, text="", font=SMALL_FONT, anchor="center",
-                                     fg=self._get_status_color(self.status), bg=bg_color, width=16)
-
-        if self.is_active_item:
-            self.progress_bar.grid(row=0, column=0, sticky="ew")
-            self.status_label.place(relx=0.5, rely=0.5, anchor="center")
-        else:
-            self.progress_bar.grid_forget()
-            self.status_label.grid(row=0, column=0, sticky="ew")
-
-        self.date_added_label = tk.Label(self.frame, text=self.date_added, font=SMALL_FONT, anchor="w", bg=bg_color,
-                                         width=12, fg="#6c757d")
-        self.date_added_label.grid(row=0, column=2, sticky="w", padx=4, pady=2)
-        create_tooltip(self.date_added_label, "Date added to queue")
-
-        self.date_completed_label = tk.Label(self.frame, text=self.date_completed, font=SMALL_FONT, anchor="w",
-                                             bg=bg_color, width=12, fg="#6c757d")
-        self.date_completed_label.grid(row=0, column=3, sticky="w", padx=4, pady=2)
-        create_tooltip(self.date_completed_label, "Date completed")
-
-        self.elapsed_time_label = tk.Label(self.frame, text="", font=SMALL_FONT, anchor="w", bg=bg_color, width=10,
-                                          fg="#495057")
-        self.elapsed_time_label.grid(row=0, column=4, sticky="w", padx=4, pady=2)
-        create_tooltip(self.elapsed_time_label, "Elapsed time / ETA")
-
-        # Enhanced buttons with hover effects and tooltips
-        self.abort_button = tk.Button(self.frame, text="⏹ Abort", command=self.abort_download, bg=COLOR_ABORT_BUTTON,
-                                      fg="white", font=SMALL_FONT, width=10, relief=tk.RAISED, bd=2,
-                                      activebackground="#c82333", cursor="hand2")
-        create_tooltip(self.abort_button, "Stop this download")
-        
-        self.open_file_button = tk.Button(self.frame, text="📁 Open", command=self._open_file_location,
-                                          bg=COLOR_OPEN_FILE_BUTTON, fg="white", font=SMALL_FONT, width=10,
-                                          relief=tk.RAISED, bd=2, activebackground="#138496", cursor="hand2")
-        create_tooltip(self.open_file_button, "Open file location in explorer")
-        
-        self.retry_button = tk.Button(self.frame, text="🔄 Retry", command=self.retry_download, bg=COLOR_ADD_BUTTON,
-                                      fg="white", font=SMALL_FONT, width=10, relief=tk.RAISED, bd=2,
-                                      activebackground="#218838", cursor="hand2")
-        create_tooltip(self.retry_button, "Retry this download")
-        
-        self.remove_button = tk.Button(self.frame, text="🗑 Remove", command=self._confirm_and_remove,
-                                       bg=COLOR_REMOVE_BUTTON, fg="white", font=SMALL_FONT, width=10,
-                                       relief=tk.RAISED, bd=2, activebackground="#5a6268", cursor="hand2")
-        create_tooltip(self.remove_button, "Remove from list (optionally delete file)")
-
-        if self.is_active_item:
-            self.abort_button.grid(row=0, column=5, sticky="e", padx=2, pady=0)
-            self.remove_button.grid(row=0, column=6, sticky="e", padx=2, pady=0)  # Placed next to abort
-        else:
-            if self.status in ['failed', 'aborted', 'cancelled']:
-                self.retry_button.grid(row=0, column=5, sticky="e", padx=2, pady=0)
-                self.remove_button.grid(row=0, column=6, sticky="e", padx=2, pady=0)  # Placed next to retry
-            elif self.status == 'completed':
-                self.open_file_button.grid(row=0, column=5, sticky="e", padx=2, pady=0)
-                self.remove_button.grid(row=0, column=6, sticky="e", padx=2, pady=0)  # Placed next to open file
-
-        self._update_progress_visibility()
-
-    def _update_progress_visibility(self):
-        """Manages the visibility of the progress bar and status label based on item state."""
-        if self.is_active_item:
-            if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-                self.progress_bar.lift()
-            if hasattr(self, 'status_label') and self.status_label.winfo_exists():
-                self.status_label.place(relx=0.5, rely=0.5, anchor="center")
-                # Get current bg color from frame
-                bg_color = self.frame.cget('bg')
-                self.status_label.config(bg=bg_color)
+    def refresh_row(self):
+        """Redraws this item's row, if the item is currently scrolled into view."""
+        if self.row is not None:
+            self.row.render()
+
+    def set_progress(self, value=None, mode=None, running=None):
+        """Updates the progress bar state. Safe from worker threads; the row is redrawn at the next UI tick."""
+        if value is not None: self.progress_value = value
+        if mode is not None: self.progress_mode = mode
+        if running is not None: self.progress_running = running
+        self.app_instance.ui_bus.mark_dirty(self)
+
+    def set_elapsed_text(self, text):
+        self.elapsed_text = text
+        self.app_instance.ui_bus.mark_dirty(self)
+
+    def set_abort_enabled(self, enabled):
+        self.abort_enabled = enabled
+        self.app_instance.ui_bus.mark_dirty(self)
+
+    def get_tooltip_text(self):
+        """Tooltip for the title column."""
+        tooltip_text = f"Source: {self.source}\nURL: {self.source_path[:100] if len(self.source_path) > 100 else self.source_path}"
+        if self.container_route:
+            tooltip_text += f"\nMP4 route: {self.container_route}"
+        return tooltip_text
+
+    def get_display_name(self):
+        """Full title text for the name column, before it is truncated to the column width."""
+        if "Error" in self.video_title or self.status in ['failed', 'aborted', 'cancelled']:
+            display_name_raw = f"{self.status.capitalize()}: {self.video_title}"
+        elif self.is_local_conversion:
+            display_name_raw = self.video_title
         else:
-            if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-                self.progress_bar.grid_forget()
-            if hasattr(self, 'status_label') and self.status_label.winfo_exists():
-                self.status_label.place_forget()
-                self.status_label.grid(row=0, column=0, sticky="ew")
-                # Get current bg color from frame
-                bg_color = self.frame.cget('bg')
-                self.status_label.config(bg=bg_color)
+            display_name_raw = self.video_title if self.video_title and self.video_title != 'Fetching Title...' else (
+                os.path.basename(self.filename) if self.filename else f"VideoPlayback_{self.item_id}")
+        return f"{display_name_raw} ({self.source})"
 
     def _get_status_color(self, status_text):
         """Returns the color based on status text."""
@@ -487,6 +1448,8 @@ class DownloadItem:
             return COLOR_STATUS_FAILED
         elif status_text == "aborted" or status_text == "cancelled":
             return COLOR_STATUS_ABORTED
+        elif status_text.startswith("retry"):
+            return COLOR_STATUS_READY
         return "black"
 
     def _format_seconds_to_dd_hh_mm_ss(self, total_seconds):
@@ -504,137 +1467,165 @@ class DownloadItem:
         if self.is_local_conversion:
             self.is_title_fetched = True
             self.ready_for_download = True
-            self.app_instance.master.after(0, self.app_instance._refresh_display_order)
+            self.app_instance.ui_bus.post_call(lambda: self.app_instance.update_display_item(self))
+            self.app_instance.request_scheduling_pass()
             return
 
         def _fetch():
             try:
-                command = [self.app_instance.yt_dlp_path, "--print-json", "--skip-download", self.source_path]
-                if self.source == XTREAM_SOURCE and self.referer:
-                    command += ["--add-header", f"referer: {self.referer}"]
-
-                result = subprocess.run(command, capture_output=True, text=True, check=True,
-                                        creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
-                                        timeout=30)
-                metadata = json.loads(result.stdout)
+                referer = self.referer if self.source == XTREAM_SOURCE else None
+                metadata = fetch_info_json(self.app_instance.yt_dlp_path, self.source_path, referer)
                 self.video_title = metadata.get('title', 'Unknown Title')
+                self.content_id = build_content_id(metadata) or self.content_id
+                estimated_size = estimate_job_size_mb(metadata, self._get_format_selector(), self.mp3_conversion)
+                if estimated_size:
+                    self.estimated_size_mb = estimated_size
 
                 if not self.filename_provided_by_user:
-                    sanitized_title = re.sub(r'[\\/:*?"<>|]', '', self.video_title)
+                    sanitized_title = sanitize_filename(self.video_title)
                     self.filename = sanitized_title if sanitized_title else f"VideoPlayback_{self.item_id}"
 
                 self.is_title_fetched = True
                 self.ready_for_download = True
-                self.app_instance.master.after(0, self.app_instance._refresh_display_order)
+                # Adds the ID archive key, and a restart then won't fetch the title again
+                self.app_instance.ui_bus.post_call(lambda: self.app_instance.reregister_queued_item(self))
+                self.app_instance.ui_bus.post_call(lambda: self.app_instance.update_display_item(self))
 
             except FileNotFoundError:
                 self.video_title = "Error: yt-dlp.exe not found."
                 if not self.filename_provided_by_user: self.filename = f"VideoPlayback_{self.item_id}"
                 self.is_title_fetched = False
                 self.ready_for_download = True
-                self.app_instance.master.after(0, self.app_instance._refresh_display_order)
-                self.app_instance.master.after(0, lambda: self.update_status("Error", COLOR_STATUS_FAILED))
+                self.app_instance.ui_bus.post_call(lambda: self.app_instance.update_display_item(self))
+                self.update_status("Error", COLOR_STATUS_FAILED)
                 print(f"FileNotFoundError: yt-dlp.exe not found or not in PATH for URL: {self.source_path}")
             except subprocess.CalledProcessError as e:
                 self.video_title = f"Error fetching title: Command failed. {e.stderr.strip()}"
                 if not self.filename_provided_by_user: self.filename = f"VideoPlayback_{self.item_id}"
                 self.is_title_fetched = False
                 self.ready_for_download = True
-                self.app_instance.master.after(0, self.app_instance._refresh_display_order)
-                self.app_instance.master.after(0, lambda: self.update_status("Error", COLOR_STATUS_FAILED))
+                self.app_instance.ui_bus.post_call(lambda: self.app_instance.update_display_item(self))
+                self.update_status("Error", COLOR_STATUS_FAILED)
                 print(f"subprocess.CalledProcessError for URL {self.source_path}: {e.stderr.strip()}")
             except (json.JSONDecodeError, subprocess.TimeoutExpired) as e:
                 self.video_title = f"Error fetching title: {e}"
                 if not self.filename_provided_by_user: self.filename = f"VideoPlayback_{self.item_id}"
                 self.is_title_fetched = False
                 self.ready_for_download = True
-                self.app_instance.master.after(0, self.app_instance._refresh_display_order)
-                self.app_instance.master.after(0, lambda: self.update_status("Error", COLOR_STATUS_FAILED))
+                self.app_instance.ui_bus.post_call(lambda: self.app_instance.update_display_item(self))
+                self.update_status("Error", COLOR_STATUS_FAILED)
                 print(f"Decoding/Timeout Error for URL {self.source_path}: {e}")
             except Exception as e:
                 self.video_title = f"Unexpected error fetching title: {e}"
                 if not self.filename_provided_by_user: self.filename = f"VideoPlayback_{self.item_id}"
                 self.is_title_fetched = False
                 self.ready_for_download = True
-                self.app_instance.master.after(0, self.app_instance._refresh_display_order)
-                self.app_instance.master.after(0, lambda: self.update_status("Error", COLOR_STATUS_FAILED))
+                self.app_instance.ui_bus.post_call(lambda: self.app_instance.update_display_item(self))
+                self.update_status("Error", COLOR_STATUS_FAILED)
                 print(f"General Error fetching title for URL {self.source_path}: {e}")
+            finally:
+                self.app_instance.request_scheduling_pass()  # The item may start now
 
         threading.Thread(target=_fetch, daemon=True).start()
 
-    def _update_title_label(self):
-        """Updates the title label on the UI with fetched info, and sets wraplength dynamically."""
-        self.frame.update_idletasks()
-        total_frame_width = self.app_instance.downloads_canvas.winfo_width() if self.app_instance.downloads_canvas.winfo_width() > 0 else 900
-        name_column_pixel_width = int(total_frame_width * 4 / 10) - 30
-        name_column_pixel_width = max(10, name_column_pixel_width)
-        self.title_label.config(wraplength=name_column_pixel_width)
-
-        display_name_raw = ""
-        if "Error" in self.video_title or self.status in ['failed', 'aborted', 'cancelled']:
-            display_name_raw = f"{self.status.capitalize()}: {self.video_title}"
-        elif self.is_local_conversion:
-            display_name_raw = self.video_title
-        else:
-            display_name_raw = self.video_title if self.video_title and self.video_title != 'Fetching Title...' else (
-                os.path.basename(self.filename) if self.filename else f"VideoPlayback_{self.item_id}")
-
-        display_name_full = f"{display_name_raw} ({self.source})"
-        font_obj = tkinter.font.Font(family=MAIN_FONT[0], size=MAIN_FONT[1])
-        text_width_px = font_obj.measure(display_name_full)
-
-        display_name_final = display_name_full
-        if text_width_px > name_column_pixel_width:
-            truncated_text = ""
-            for i in range(len(display_name_full)):
-                test_text = display_name_full[:i + 1] + "..."
-                if font_obj.measure(test_text) > name_column_pixel_width:
-                    truncated_text = display_name_full[:i] + "..."
-                    break
-            if truncated_text:
-                display_name_final = truncated_text
-
-        if self.title_label.winfo_exists():
-            self.title_label.config(text=display_name_final)
-        if self.date_added_label.winfo_exists():
-            self.date_added_label.config(text=self.date_added)
-        if self.date_completed_label.winfo_exists():
-            self.date_completed_label.config(text=self.date_completed)
-        if self.elapsed_time_label.winfo_exists():
-            self.elapsed_time_label.config(text=self._format_seconds_to_dd_hh_mm_ss(self.elapsed_time_seconds))
-
     def start_download(self):
         """Starts the yt-dlp or ffmpeg process for this item in a new thread."""
         self.is_aborted = False
         self.is_merging = False
         self.start_time = time.time()
         self.last_update_time = time.time()
+        self.last_progress_report_time = 0
+        self.output_tail.clear()
+        self.last_return_code = None
+        self.progress_value, self.progress_mode, self.progress_running = 0, "determinate", False
+        self.abort_enabled = True
+        self.elapsed_text = self._format_seconds_to_dd_hh_mm_ss(0)
         self.update_status("active", COLOR_STATUS_PROGRESS)
         self.is_active_item = True
-        self.app_instance._refresh_display_order()
-
-        if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-            self.progress_bar.config(value=0, mode="determinate")
-        if hasattr(self, 'status_label') and self.status_label.winfo_exists():
-            self.status_label.config(bg="#f0f0f0")
+        self.app_instance.update_display_item(self)
 
-        if self.abort_button.winfo_exists():
-            self.abort_button.config(state="normal")
-        if self.elapsed_time_label.winfo_exists():
-            self.elapsed_time_label.config(text=self._format_seconds_to_dd_hh_mm_ss(0))
+        if self.app_instance.engine is not None:
+            self.running_in_engine = True
+            self.app_instance.engine.start_item(self)
+        else:
+            self.run_download()
 
+    def run_download(self):
+        """Starts the worker thread for this item. Runs in the engine process, if there is one."""
+        self.is_running = True
+        self.log_file = ItemLogFile(self.get_log_path())
+        self.log_file.write(f"=== {time.strftime('%Y-%m-%d %H:%M:%S')} Started {self.source}: {self.source_path}\n")
         if self.is_ts_stream:
             # Handle TS stream download and merging
             threading.Thread(target=self._download_and_merge_ts_stream, daemon=True).start()
-        else:
+        elif self.is_local_conversion:
             command = self._build_command()
-            is_ffmpeg_process = (self.source == LOCAL_SOURCE)
-            threading.Thread(target=self._run_conversion_process, args=(command, is_ffmpeg_process,), daemon=True).start()
+            threading.Thread(target=self._run_conversion_process, args=(command, True,), daemon=True).start()
+        else:
+            threading.Thread(target=self._prepare_and_run_yt_dlp, daemon=True).start()
+
+    def _prepare_and_run_yt_dlp(self):
+        """Decides the MP4 route from the item's metadata, then runs yt-dlp. Runs in the worker thread."""
+        if self.force_recode:
+            self.container_route = 'recode'
+        elif not self.mp3_conversion:
+            self._decide_container_route()
+        self._run_conversion_process(self._build_command(), False)
+
+    def _decide_container_route(self):
+        """Picks merge/remux over a full recode whenever the selected streams' codecs fit MP4."""
+        referer = self.referer if self.source == XTREAM_SOURCE else None
+        try:
+            # Usually cached from the title fetch or the quality menu probe
+            info = fetch_info_json(self.app_instance.yt_dlp_path, self.source_path, referer, owner=self)
+            formats = select_formats_from_info(info, self._get_format_selector())
+        except Exception as e:
+            print(f"Could not read format metadata for {self.source_path}: {e}")
+            formats = None
+        self.container_route, reason = choose_mp4_route(formats)
+        message = f"MP4 route: {self.container_route} ({reason})"
+        print(f"{message} for {self.source_path}")
+        self._append_to_log(message + "\n")
+
+    def can_retry_with_recode(self):
+        """True if force_recode would change the next attempt's command (only yt-dlp MP4 downloads honour it)."""
+        return not (self.is_local_conversion or self.is_ts_stream or self.mp3_conversion or self.force_recode)
+
+    def _get_format_selector(self):
+        """Returns the yt-dlp -f selector for this item, or None to let yt-dlp decide."""
+        if self.mp3_conversion:
+            return self._get_audio_format_selector()
+        if self.format_id:
+            # Exact format picked from the probed format list
+            return self.format_id
+        if self.source == DEFAULT_SOURCE:  # Changed from YOUTUBE_SOURCE
+            if "Auto (Best available)" in self.quality:
+                return 'bestvideo+bestaudio/best'
+            elif self.quality == "High Quality - 1080p":
+                return 'bestvideo[height<=1080]+bestaudio/best[height<=1080]'
+            elif self.quality == "Medium Quality - 720p":
+                return 'bestvideo[height<=720]+bestaudio/best[height<=720]'
+            elif self.quality == "Low Quality - 480p":
+                return 'bestvideo[height<=480]+bestaudio/best[height<=480]'
+        return None
+
+    def _get_audio_format_selector(self):
+        """Audio-only selector for MP3 jobs so no video stream is downloaded just to be discarded."""
+        if self.format_id and '+' not in self.format_id:
+            # Honour a pinned format if the probe showed it is audio-only
+            info = get_cached_info_json(self.source_path, self.referer if self.source == XTREAM_SOURCE else None)
+            for fmt in (info or {}).get('formats') or []:
+                if fmt.get('format_id') == self.format_id and (fmt.get('vcodec') or 'none') == 'none':
+                    return self.format_id
+        bitrate = str(self.app_instance.settings['mp3_audio_bitrate'])
+        if bitrate.isdigit():
+            # Prefer the best source at or below the target bitrate, then any audio, then a combined format
+            return f'bestaudio[abr<={bitrate}]/bestaudio/best'
+        return 'bestaudio/best'
 
     def _build_command(self):
         """Builds the yt-dlp or ffmpeg command for this specific item."""
-        downloads_dir = os.path.join(os.getcwd(), self.app_instance.settings['output_directory'])  # Use settings
-        temp_dir = os.path.join(downloads_dir, TEMP_SUBDIR, str(self.item_id))
+        temp_dir = self.get_temp_dir()
         os.makedirs(temp_dir, exist_ok=True)
         out_name = self.filename
 
@@ -654,38 +1645,41 @@ class DownloadItem:
             self.expected_final_ext = ".mp4"
             print(f"FFmpeg Command: {' '.join(command)}")
         else:
-            command = [self.app_instance.yt_dlp_path, self.source_path]
+            # A watch?v=...&list=... link downloads its video only; playlists are expanded into items when queued
+            command = [self.app_instance.yt_dlp_path, self.source_path, "--no-playlist"]
             if self.source == XTREAM_SOURCE and self.referer:
                 command += ["--add-header", f"referer: {self.referer}"]
             if self.mp3_conversion:
-                command += ["--extract-audio", "--audio-format", "mp3", "--output",
-                            os.path.join(temp_dir, out_name + ".mp3")]
+                bitrate = str(self.app_instance.settings['mp3_audio_bitrate'])
+                command += ["--extract-audio", "--audio-format", "mp3",
+                            "--audio-quality", f"{bitrate}K" if bitrate.isdigit() else "0",
+                            "--output", os.path.join(temp_dir, out_name.replace('%', '%%') + ".%(ext)s")]
                 self.expected_final_ext = ".mp3"
             else:
-                command += ["--recode-video", "mp4", "--output", os.path.join(temp_dir, out_name + ".mp4")]
+                if self.container_route in ('merge', 'remux', 'direct'):
+                    # Stream copy only; --remux-video also covers a fallback to a single format
+                    command += ["--merge-output-format", "mp4", "--remux-video", "mp4"]
+                else:
+                    command += ["--recode-video", "mp4"]
+                # Let yt-dlp name intermediate files by their real extension; the final file is always .mp4
+                command += ["--output", os.path.join(temp_dir, out_name.replace('%', '%%') + ".%(ext)s")]
                 self.expected_final_ext = ".mp4"
-            if self.source == DEFAULT_SOURCE:  # Changed from YOUTUBE_SOURCE
-                if "Auto (Best available)" in self.quality:
-                    command += ['-f', 'bestvideo+bestaudio/best']
-                elif self.quality == "High Quality - 1080p":
-                    command += ['-f', 'bestvideo[height<=1080]+bestaudio/best[height<=1080]']
-                elif self.quality == "Medium Quality - 720p":
-                    command += ['-f', 'bestvideo[height<=720]+bestaudio/best[height<=720]']
-                elif "Combined" in self.quality:
-                    res = re.search(r'(\d+)p', self.quality).group(1)
-                    command += ['-f', f'bestvideo[height<={res}]+bestaudio/best[height<={res}]']
-                elif "Video Only" in self.quality:
-                    res = re.search(r'(\d+)p', self.quality).group(1)
-                    command += ['-f', f'bestvideo[height<={res}]']
-
-            command += ["--paths", f"temp:{temp_dir}", "--newline"]
+            format_selector = self._get_format_selector()
+            if format_selector:
+                command += ['-f', format_selector]
+
+            command += ["--concurrent-fragments", str(self.fragment_concurrency)]
+            command += ["--progress-template", YT_DLP_DOWNLOAD_TEMPLATE,
+                        "--progress-template", YT_DLP_POSTPROCESS_TEMPLATE]
+            # Same temp path on every attempt, so --continue picks up .part files and finished fragments
+            command += ["--paths", f"temp:{temp_dir}", "--continue", "--newline"]
             print(f"Yt-dlp Command: {' '.join(command)}")
         return command
 
     def _download_and_merge_ts_stream(self):
         """Downloads TS segments (from M3U8 or single .ts) and merges them into MP4."""
         downloads_dir = os.path.join(os.getcwd(), self.app_instance.settings['output_directory'])
-        temp_dir = os.path.join(downloads_dir, TEMP_SUBDIR, str(self.item_id))
+        temp_dir = self.get_temp_dir()
         os.makedirs(temp_dir, exist_ok=True)
         
         final_output = os.path.join(temp_dir, self.filename + ".mp4")
@@ -700,9 +1694,8 @@ class DownloadItem:
             
             if is_m3u8:
                 # Parse M3U8 playlist to get all TS segment URLs
-                self.app_instance.master.after(0, lambda: self.update_status("Parsing M3U8 playlist...", COLOR_STATUS_PROGRESS))
-                if self.app_instance.log_window_visible and self.app_instance.log_text:
-                    self.app_instance.master.after(0, lambda: self._append_to_log(f"Parsing M3U8 playlist: {self.source_path}\n"))
+                self.update_status("Parsing M3U8 playlist...", COLOR_STATUS_PROGRESS)
+                self._append_to_log(f"Parsing M3U8 playlist: {self.source_path}\n")
                 
                 segment_urls = parse_m3u8_playlist(self.source_path, self.referer if self.referer else None)
                 
@@ -710,7 +1703,7 @@ class DownloadItem:
                     raise Exception("No TS segments found in M3U8 playlist")
                 
                 total_segments = len(segment_urls)
-                self.app_instance.master.after(0, lambda: self.update_status(f"Found {total_segments} segments. Downloading...", COLOR_STATUS_PROGRESS))
+                self.update_status(f"Found {total_segments} segments. Downloading...", COLOR_STATUS_PROGRESS)
                 
                 # Download each segment
                 for idx, segment_url in enumerate(segment_urls):
@@ -719,22 +1712,26 @@ class DownloadItem:
                     
                     segment_filename = f"segment_{idx:05d}.ts"
                     segment_path = os.path.join(temp_dir, segment_filename)
+                    if os.path.isfile(segment_path) and os.path.getsize(segment_path) > 0:
+                        ts_segments.append(segment_path)  # Finished in an earlier attempt
+                        continue
                     
                     # Update progress
                     progress = int((idx / total_segments) * 90)  # Reserve 10% for merging
-                    if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-                        self.app_instance.master.after(0, lambda p=progress: self.progress_bar.config(value=p))
-                    self.app_instance.master.after(0, lambda idx=idx, total=total_segments: self.update_status(
-                        f"Downloading segment {idx+1}/{total}...", COLOR_STATUS_PROGRESS))
+                    self.set_progress(value=progress)
+                    self.update_status(f"Downloading segment {idx+1}/{total_segments}...", COLOR_STATUS_PROGRESS)
                     
-                    if self.app_instance.log_window_visible and self.app_instance.log_text:
-                        self.app_instance.master.after(0, lambda url=segment_url: self._append_to_log(f"Downloading: {url}\n"))
+                    self._append_to_log(f"Downloading: {segment_url}\n")
                     
                     # Download segment
-                    if download_ts_segment(segment_url, segment_path, self.referer if self.referer else None):
+                    downloaded, segment_error = download_ts_segment(segment_url, segment_path,
+                                                                    self.referer if self.referer else None)
+                    if downloaded:
                         ts_segments.append(segment_path)
                     else:
                         print(f"Warning: Failed to download segment {idx+1}: {segment_url}")
+                        # Keep the status text so classify_failure can tell 403/429/5xx apart
+                        self.output_tail.append(f"Failed to download segment {idx+1}: {segment_error}")
                         # Continue with other segments instead of failing completely
                 
                 if not ts_segments:
@@ -742,13 +1739,17 @@ class DownloadItem:
                     
             elif is_single_ts:
                 # Single .ts file - download directly
-                self.app_instance.master.after(0, lambda: self.update_status("Downloading TS file...", COLOR_STATUS_PROGRESS))
+                self.update_status("Downloading TS file...", COLOR_STATUS_PROGRESS)
                 segment_path = os.path.join(temp_dir, "segment_00000.ts")
                 
-                if download_ts_segment(self.source_path, segment_path, self.referer if self.referer else None):
+                if os.path.isfile(segment_path) and os.path.getsize(segment_path) > 0:
                     ts_segments.append(segment_path)
                 else:
-                    raise Exception("Failed to download TS file")
+                    downloaded, segment_error = download_ts_segment(self.source_path, segment_path,
+                                                                    self.referer if self.referer else None)
+                    if not downloaded:
+                        raise Exception(f"Failed to download TS file: {segment_error}")
+                    ts_segments.append(segment_path)
             else:
                 raise Exception("URL does not appear to be a valid .ts file or M3U8 playlist")
             
@@ -756,29 +1757,26 @@ class DownloadItem:
             if self.is_aborted:
                 raise Exception("Download aborted by user")
             
-            self.app_instance.master.after(0, lambda: self.update_status("Merging segments...", COLOR_STATUS_PROGRESS))
-            if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-                self.app_instance.master.after(0, lambda: self.progress_bar.config(value=90, mode="indeterminate"))
-                self.app_instance.master.after(0, lambda: self.progress_bar.start())
+            self.app_instance.move_item_to_pool(self, 'disk')  # Frees the network slot for another download
+            self.update_status("Merging segments...", COLOR_STATUS_PROGRESS)
+            self.set_progress(value=90, mode="indeterminate", running=True)
             
-            if self.app_instance.log_window_visible and self.app_instance.log_text:
-                self.app_instance.master.after(0, lambda: self._append_to_log(f"Merging {len(ts_segments)} segments into MP4...\n"))
+            self._append_to_log(f"Merging {len(ts_segments)} segments into MP4...\n")
             
             # Merge segments
-            if merge_ts_segments(ts_segments, final_output):
+            merged, merge_error = merge_ts_segments(ts_segments, final_output)
+            if merged:
                 # Move final file to downloads directory
                 final_destination = os.path.join(downloads_dir, self.filename + ".mp4")
                 os.makedirs(downloads_dir, exist_ok=True)
                 shutil.move(final_output, final_destination)
                 
-                if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists():
-                    self.app_instance.master.after(0, lambda: self.progress_bar.stop())
-                    self.app_instance.master.after(0, lambda: self.progress_bar.config(value=100, mode="determinate"))
+                self.set_progress(value=100, mode="determinate", running=False)
                 
                 final_status = "completed"
                 self.update_status("completed", COLOR_STATUS_COMPLETE)
             else:
-                raise Exception("Failed to merge TS segments")
+                raise Exception(f"Failed to merge TS segments: {merge_error}")
                 
         except Exception as e:
             if "aborted" in str(e).lower() or self.is_aborted:
@@ -787,56 +1785,62 @@ class DownloadItem:
             else:
                 final_status = "failed"
                 self.update_status("failed", COLOR_STATUS_FAILED)
-                error_msg = f"TS stream download error: {str(e)}"
+                detail = str(e) if type(e) is Exception else f"{type(e).__name__}: {e}"  # e.g. HTTPError from the M3U8
+                error_msg = f"TS stream download error: {detail}"
                 print(error_msg)
-                if self.app_instance.log_window_visible and self.app_instance.log_text:
-                    self.app_instance.master.after(0, lambda msg=error_msg: self._append_to_log(f"ERROR: {msg}\n"))
-                messagebox.showerror("TS Download Error", error_msg)
+                self.output_tail.append(error_msg)
+                # Shown by download_finished only if no automatic retry follows
+                self.last_error_message = error_msg
+                self._append_to_log(f"ERROR: {error_msg}\n")
         finally:
-            # Cleanup: remove temporary TS segments
-            for segment_path in ts_segments:
+            # Keep downloaded segments of failed/aborted items so a retry only fetches the missing ones
+            if final_status == "completed" or self.discard_temp_on_finish:
                 try:
-                    if os.path.exists(segment_path):
-                        os.remove(segment_path)
+                    if os.path.exists(temp_dir):
+                        shutil.rmtree(temp_dir, ignore_errors=True)
                 except:
                     pass
             
-            # Cleanup temp directory
-            try:
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-            except:
-                pass
-            
-            if self.abort_button.winfo_exists():
-                self.abort_button.config(state="disabled")
+            self.set_abort_enabled(False)
+            self._append_to_log(f"=== Finished: {final_status}\n")
+            self.log_file.close()
+            self.is_running = False
             
-            self.app_instance.download_finished(self, final_status)
+            self.app_instance.ui_bus.post_call(lambda: self.app_instance.download_finished(self, final_status))
 
     def _run_conversion_process(self, command, is_ffmpeg_process):
         """Runs the subprocess (yt-dlp or ffmpeg) and captures its output."""
         rc = -1
+        final_status = "failed"
         try:
+            if self.is_aborted:
+                # Aborted while the worker was preparing, e.g. during the metadata probe
+                final_status = "aborted"
+                self.update_status("aborted", COLOR_STATUS_ABORTED)
+                return
             creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
             self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
                                             bufsize=1, universal_newlines=True, creationflags=creationflags)
             for line in self.process.stdout:
                 if self.is_aborted: break
-                self.output_queue.put(line)
-                if self.app_instance.log_window_visible and self.app_instance.log_text:
-                    self.app_instance.master.after(0, lambda l=line: self._append_to_log(l))
+                self.output_tail.append(line)
                 if is_ffmpeg_process:
                     self._parse_ffmpeg_output_for_progress(line)
+                    is_progress_line = False
                 else:
-                    self._parse_output_for_progress(line)
-                if self.start_time:
-                    elapsed = time.time() - self.start_time
-                    if self.elapsed_time_label.winfo_exists() and self.elapsed_time_label.winfo_ismapped():
-                        self.app_instance.master.after(0, lambda e=elapsed: self.elapsed_time_label.config(
-                            text=self._format_seconds_to_dd_hh_mm_ss(e)))
+                    is_progress_line = self._parse_output_for_progress(line)
+                # Structured progress ticks are shown in the status column, not in the log
+                if not is_progress_line:
+                    self._append_to_log(line)
+                now = time.time()
+                if self.start_time and now - self.last_update_time >= PROGRESS_UI_INTERVAL:
+                    self.last_update_time = now
+                    elapsed = now - self.start_time
+                    self.set_elapsed_text(self._format_seconds_to_dd_hh_mm_ss(elapsed))
             rc = self.process.wait()
+            self.last_return_code = rc
             if self.is_merging:
-                if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists(): self.progress_bar.stop()
+                self.set_progress(running=False)
 
             if self.is_aborted:
                 final_status = "aborted";
@@ -844,12 +1848,10 @@ class DownloadItem:
             elif rc == 0:
                 final_status = "completed";
                 self.update_status("completed", COLOR_STATUS_COMPLETE)
-                if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists(): self.progress_bar.config(
-                    value=100, mode="determinate")
+                self.set_progress(value=100, mode="determinate")
                 downloads_dir = os.path.join(os.getcwd(),
                                              self.app_instance.settings['output_directory'])  # Use settings
-                final_file_in_temp = os.path.join(downloads_dir, TEMP_SUBDIR, str(self.item_id),
-                                                  self.filename + self.expected_final_ext)
+                final_file_in_temp = os.path.join(self.get_temp_dir(), self.filename + self.expected_final_ext)
                 final_destination = os.path.join(downloads_dir, self.filename + self.expected_final_ext)
                 if os.path.exists(final_file_in_temp):
                     try:
@@ -858,12 +1860,12 @@ class DownloadItem:
                         print(f"Moved final file from '{final_file_in_temp}' to '{final_destination}'")
                     except Exception as move_error:
                         print(f"Error moving final file: {move_error}")
-                        self.app_instance.master.after(0, lambda: messagebox.showwarning("File Move Warning",
-                                                                                         f"Conversion completed but could not move final file to downloads folder:\n{move_error}\nFile might be in temporary folder: {final_file_in_temp}"))
+                        self.app_instance.show_warning("File Move Warning",
+                                                       f"Conversion completed but could not move final file to downloads folder:\n{move_error}\nFile might be in temporary folder: {final_file_in_temp}")
                 else:
                     print(f"Final file not found in temp directory: {final_file_in_temp}")
-                    self.app_instance.master.after(0, lambda: messagebox.showwarning("File Not Found",
-                                                                                     f"Final converted file was not found where expected in temp folder: {final_file_in_temp}"))
+                    self.app_instance.show_warning("File Not Found",
+                                                   f"Final converted file was not found where expected in temp folder: {final_file_in_temp}")
             else:
                 final_status = "failed";
                 self.update_status("failed", COLOR_STATUS_FAILED)
@@ -871,68 +1873,128 @@ class DownloadItem:
             final_status = "failed";
             self.update_status("failed", COLOR_STATUS_FAILED)
             tool_name = "ffmpeg.exe" if is_ffmpeg_process else "yt-dlp.exe"
-            if self.app_instance.log_window_visible and self.app_instance.log_text: self.app_instance.master.after(0,
-                                                                                                                   lambda: self._append_to_log(
-                                                                                                                       f"ERROR: {tool_name} not found or not in PATH.\n"))
+            self.output_tail.append(f"{tool_name} not found or not in PATH")
+            self._append_to_log(f"ERROR: {tool_name} not found or not in PATH.\n")
             print(f"FileNotFoundError: {tool_name} not found or not in PATH for {self.source_path}")
         except Exception as e:
             final_status = "failed";
             self.update_status("failed", COLOR_STATUS_FAILED)
-            if self.app_instance.log_window_visible and self.app_instance.log_text: self.app_instance.master.after(0,
-                                                                                                                   lambda: self._append_to_log(
-                                                                                                                       f"ERROR during execution: {e}\n"))
+            self.output_tail.append(str(e))
+            self._append_to_log(f"ERROR during execution: {e}\n")
             print(f"Error during execution for {self.source_path}: {e}")
         finally:
             self.process = None
-            if self.abort_button.winfo_exists(): self.abort_button.config(state="disabled")
-            downloads_dir = os.path.join(os.getcwd(), self.app_instance.settings['output_directory'])  # Use settings
-            temp_path = os.path.join(downloads_dir, TEMP_SUBDIR, str(self.item_id))
-            if os.path.exists(temp_path): shutil.rmtree(temp_path, ignore_errors=True)
-            self.app_instance.download_finished(self, final_status)
+            self.set_abort_enabled(False)
+            # yt-dlp can resume from its temp dir; FFmpeg conversions cannot, so theirs always goes
+            if final_status == "completed" or is_ffmpeg_process or self.discard_temp_on_finish:
+                self.discard_temp_dir()
+            self._append_to_log(f"=== Finished: {final_status} (exit code {rc})\n")
+            self.log_file.close()
+            self.is_running = False
+            self.app_instance.ui_bus.post_call(lambda: self.app_instance.download_finished(self, final_status))
+
+    def discard_temp_dir(self):
+        """Deletes this item's temp dir, including any partial download that could have been resumed."""
+        temp_path = self.get_temp_dir()
+        if os.path.exists(temp_path): shutil.rmtree(temp_path, ignore_errors=True)
 
     def _append_to_log(self, text):
-        """Appends text to the log window's ScrolledText widget."""
-        if self.app_instance.log_text and self.app_instance.log_window.winfo_exists():
-            self.app_instance.log_text.config(state=tk.NORMAL)
-            self.app_instance.log_text.insert(END, text)
-            self.app_instance.log_text.see(END)
-            self.app_instance.log_text.config(state=tk.DISABLED)
+        """
+        Writes text to this item's log file and, if the log window is open, queues it for the window.
+        Only the last OUTPUT_TAIL_LINES lines stay in memory. Safe from worker threads.
+        """
+        if self.log_file:
+            self.log_file.write(text)
+        if self.app_instance.is_log_window_open():
+            self.app_instance.ui_bus.post_log(self.item_id, text)
+
+    def get_display_state(self):
+        """Display fields the engine process sends to the GUI, see ENGINE_STATE_FIELDS."""
+        return {name: getattr(self, name) for name in ENGINE_STATE_FIELDS}
+
+    def get_output_path(self):
+        """
+        Where the finished file is. Items relinked from the download archive keep the archived path,
+        which may be outside the current output folder or have a different filename.
+        """
+        if self.output_file:
+            return self.output_file
+        return os.path.join(os.getcwd(), self.app_instance.settings['output_directory'],
+                            self.filename + self.expected_final_ext)
+
+    def get_temp_dir(self):
+        """Where this item's partial downloads and intermediate files live."""
+        return os.path.join(os.getcwd(), self.app_instance.settings['output_directory'],
+                            self.app_instance.temp_subdir, str(self.item_id))
+
+    def get_log_path(self):
+        return os.path.join(get_item_log_dir(self.app_instance.settings['output_directory'],
+                                             self.app_instance.temp_subdir), f"{self.item_id}.log")
+
+    def delete_log_files(self):
+        if self.log_file:
+            self.log_file.close()
+        ItemLogFile.delete(self.get_log_path())
 
     def _parse_output_for_progress(self, line):
-        """Parses a line of yt-dlp output for progress, speed, and ETA."""
-        match_percent = re.search(
-            r'\[download\]\s+(\d+\.\d+)%|^[A-Za-z]+\s+.*?(\d+\.\d+)%\s+at\s+.*?(?:ETA\s+(\d{2}:\d{2}))?', line)
-        if match_percent:
-            percent_str = match_percent.group(1) if match_percent.group(1) else match_percent.group(2)
-            if percent_str:
-                percent = float(percent_str)
-                if self.is_merging:
-                    if hasattr(self,
-                               'progress_bar') and self.progress_bar.winfo_exists(): self.progress_bar.stop(); self.progress_bar.config(
-                        mode="determinate")
-                    self.is_merging = False
-                if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists(): self.progress_bar.config(
-                    value=percent)
-                speed_match = re.search(r'at\s+([0-9\.]+[KMG]?iB/s|\S+)(?:\s+ETA\s+(\d{2}:\d{2}))?', line)
-                speed = speed_match.group(1) if speed_match and speed_match.group(1) else 'N/A'
-                eta = speed_match.group(2) if speed_match and speed_match.group(2) else 'N/A'
-                self.update_status(f"{percent:.1f}% ({speed}, ETA {eta})", COLOR_STATUS_PROGRESS)
-            return
-        if "merging formats" in line.lower() or "ffmpeg" in line.lower() or "postprocessing" in line.lower() or "extractaudio" in line.lower():
-            if not self.is_merging:
-                self.update_status("Converting/Merging...", COLOR_STATUS_PROGRESS)
-                if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists(): self.progress_bar.config(
-                    mode="indeterminate"); self.progress_bar.start()
+        """
+        Parses a line of yt-dlp output. Only the JSON lines printed by our progress templates carry
+        progress; anything else is a log-only line. Returns True if the line was a progress tick.
+        """
+        match = PROGRESS_LINE_PATTERN.match(line)
+        if not match:
+            return False
+        try:
+            progress = json.loads(match.group(2))
+        except ValueError:
+            return True
+
+        if match.group(1) == 'postprocess':
+            # MoveFiles only moves the finished file out of the temp path; it is not a conversion step
+            if progress.get('status') == 'started' and progress.get('postprocessor') != 'MoveFiles':
+                # The download is done; the item now loads the CPU (encodes) or the disk (stream copies)
+                postprocessor = progress.get('postprocessor') or ''
+                is_encode = 'Convertor' in postprocessor or 'ExtractAudio' in postprocessor
+                self.app_instance.move_item_to_pool(self, 'cpu' if is_encode else 'disk')
+            if progress.get('status') == 'started' and progress.get('postprocessor') != 'MoveFiles' \
+                    and not self.is_merging:
+                self.update_status(f"Converting/Merging ({progress.get('postprocessor', 'FFmpeg')})...",
+                                   COLOR_STATUS_PROGRESS)
+                self.set_progress(mode="indeterminate", running=True)
                 self.is_merging = True
-            return
-        if "downloading" in line.lower() and not self.is_merging:
+            return True
+
+        # Throttle UI updates; the final 'finished' tick always goes through
+        now = time.time()
+        if progress.get('status') == 'downloading' and now - self.last_progress_report_time < PROGRESS_UI_INTERVAL:
+            return True
+        self.last_progress_report_time = now
+
+        total = progress.get('total_bytes') or progress.get('total_bytes_estimate')
+        if total and progress.get('downloaded_bytes') is not None:
+            percent = min(100.0, progress['downloaded_bytes'] * 100.0 / total)
+        elif progress.get('fragment_count') and progress.get('fragment_index') is not None:
+            percent = min(100.0, progress['fragment_index'] * 100.0 / progress['fragment_count'])
+        elif progress.get('status') == 'finished':
+            percent = 100.0
+        else:
             self.update_status("Downloading...", COLOR_STATUS_PROGRESS)
-            return
+            return True
+
+        if self.is_merging:
+            self.set_progress(mode="determinate", running=False)
+            self.is_merging = False
+            self.app_instance.move_item_to_pool(self, 'network')  # Next format of the same item started downloading
+        self.set_progress(value=percent)
+        speed = f"{format_bytes(progress['speed'])}/s" if progress.get('speed') else 'N/A'
+        eta = self._format_seconds_to_dd_hh_mm_ss(progress['eta']) if progress.get('eta') is not None else 'N/A'
+        self.update_status(f"{percent:.1f}% ({speed}, ETA {eta})", COLOR_STATUS_PROGRESS)
+        return True
 
     def _parse_ffmpeg_output_for_progress(self, line):
         """Parses a line of FFmpeg output for progress."""
-        time_match = re.search(r'time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})', line)
-        speed_match = re.search(r'speed=\s*([0-9\.]+)x', line)
+        time_match = FFMPEG_TIME_PATTERN.search(line)
+        speed_match = FFMPEG_SPEED_PATTERN.search(line)
         if time_match:
             hours = int(time_match.group(1));
             minutes = int(time_match.group(2));
@@ -942,37 +2004,45 @@ class DownloadItem:
             self.update_status(
                 f"Converting... ({self._format_seconds_to_dd_hh_mm_ss(current_time_seconds)}, Speed: {speed_str})",
                 COLOR_STATUS_PROGRESS)
-            if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists() and self.progress_bar[
-                'mode'] != "indeterminate":
-                self.progress_bar.config(mode="indeterminate");
-                self.progress_bar.start()
+            if self.progress_mode != "indeterminate":
+                self.set_progress(mode="indeterminate", running=True)
             self.is_merging = True
         elif "video:" in line or "audio:" in line and "global headers" in line:
             self.update_status("Converting...", COLOR_STATUS_PROGRESS)
-            if hasattr(self, 'progress_bar') and self.progress_bar.winfo_exists() and self.progress_bar[
-                'mode'] != "indeterminate":
-                self.progress_bar.config(mode="indeterminate");
-                self.progress_bar.start()
+            if self.progress_mode != "indeterminate":
+                self.set_progress(mode="indeterminate", running=True)
             self.is_merging = True
 
     def update_status(self, text, color):
-        """Updates the status label for this download item."""
-        if self.status_label.winfo_exists(): self.status_label.config(text=text.capitalize(), fg=color)
+        """Updates the status shown for this download item. Safe from worker threads."""
         self.status = text
+        self.status_color = color
+        self.app_instance.ui_bus.mark_dirty(self)
 
     def abort_download(self):
         """Aborts the currently running download process."""
         self.is_aborted = True
-        if self.process:
+        if self.retry_timer_id:
+            self.app_instance.cancel_automatic_retry(self)
+        elif self.running_in_engine:
+            self.app_instance.engine.abort_item(self)
+            self.update_status("aborted", COLOR_STATUS_ABORTED)
+        elif self.process:
             try:
                 self.process.kill()
                 self.update_status("aborted", COLOR_STATUS_ABORTED)
                 if self.is_merging:
-                    if hasattr(self,
-                               'progress_bar') and self.progress_bar.winfo_exists(): self.progress_bar.stop(); self.progress_bar.config(
-                        mode="determinate")
+                    self.set_progress(mode="determinate", running=False)
             except Exception:
                 self.update_status("failed", COLOR_STATUS_FAILED)
+        elif self.is_running:
+            probe_process = self.probe_process
+            if probe_process:
+                try:
+                    probe_process.kill()  # The worker then sees is_aborted and does not start the download
+                except Exception as e:
+                    print(f"Error stopping the metadata probe of {self.source_path}: {e}")
+            self.update_status("aborted", COLOR_STATUS_ABORTED)  # TS segment loop stops at its next check
         else:
             self.update_status("aborted", COLOR_STATUS_ABORTED)
             self.app_instance.remove_from_queue(self)
@@ -987,21 +2057,52 @@ class DownloadItem:
         self.is_merging = False
         self.is_active_item = True;
         self.ready_for_download = True
-        self.app_instance.queued_downloads.insert(0, self)
+        self.retry_attempts = {}  # A manual retry starts a fresh automatic retry budget
+        self.force_recode = False
+        self.app_instance._register_queued_item(self)
+        self.app_instance.queued_downloads.append(self, front=True)
         self.app_instance._set_status(f"Retrying download for '{self.video_title}'.", COLOR_STATUS_READY)
-        self.app_instance._refresh_display_order()  # Refresh display after adding to queue
+        self.app_instance.update_display_item(self)
+        self.app_instance.update_queue_positions()
+        self.app_instance.request_scheduling_pass()
+
+    def get_archive_keys(self):
+        """Keys under which this item's output is stored in the download archive."""
+        return build_archive_keys(self.source_path, self.content_id, self.mp3_conversion, self.format_id,
+                                  self.quality)
+
+    def _show_queue_menu(self, event):
+        """Right-click menu to move a queued item or change its priority."""
+        if self not in self.app_instance.queued_downloads:
+            return
+        menu = tk.Menu(self.app_instance.master, tearoff=0)
+        menu.add_command(label="Move to Top", command=lambda: self.app_instance.reorder_queued_item(self, 'top'))
+        menu.add_command(label="Move Up", command=lambda: self.app_instance.reorder_queued_item(self, 'up'))
+        menu.add_command(label="Move Down", command=lambda: self.app_instance.reorder_queued_item(self, 'down'))
+        menu.add_separator()
+        self.priority_menu_var = tk.IntVar(value=self.priority)
+        for name, value in PRIORITY_LEVELS.items():
+            menu.add_radiobutton(label=f"Priority: {name}", variable=self.priority_menu_var, value=value,
+                                 command=lambda v=value: self.app_instance.set_item_priority(self, v))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def _show_history_menu(self, event):
+        """Right-click menu of finished items."""
+        menu = tk.Menu(self.app_instance.master, tearoff=0)
+        menu.add_command(label="View Log", command=lambda: self.app_instance.show_item_log(self),
+                         state="normal" if ItemLogFile.get_files(self.get_log_path()) else "disabled")
+        menu.tk_popup(event.x_root, event.y_root)
 
     def _open_file_location(self):
         """Opens the folder containing the downloaded file and highlights the file."""
-        expected_ext = ".mp4" if self.is_local_conversion else (".mp3" if self.mp3_conversion else ".mp4")
-        downloads_dir = os.path.join(os.getcwd(), self.app_instance.settings['output_directory'])  # Use settings
-        full_filepath = os.path.join(downloads_dir, self.filename + expected_ext)
+        full_filepath = self.get_output_path()
         if not os.path.exists(full_filepath):
             messagebox.showerror("File Not Found", f"The file could not be found:\n{full_filepath}")
             return
         try:
             if sys.platform == "win32":
-                subprocess.Popen(f'explorer /select,"{full_filepath.replace("/", "\\")}"')
+                windows_path = full_filepath.replace("/", "\\")
+                subprocess.Popen(f'explorer /select,"{windows_path}"')
             elif sys.platform == "darwin":
                 subprocess.Popen(["open", "-R", full_filepath])
             else:
@@ -1065,6 +2166,545 @@ class DownloadItem:
         confirm_win.wait_window()
 
 
+class EngineHost:
+    """
+    Stands in for the app inside the engine process. DownloadItem runs exactly as it does in the GUI,
+    and the changes it posts to the update bus go back to the GUI as state snapshots once per tick.
+    """
+
+    def __init__(self, events, settings, yt_dlp_path):
+        self.events = events
+        self.settings = settings
+        self.yt_dlp_path = yt_dlp_path
+        self.log_window_open = False
+        self.engine = None
+        self.temp_subdir = TEMP_SUBDIR
+        self.ui_bus = UIUpdateBus()
+        self.items = {}
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def start_item(self, item_data, start_fields, info):
+        item = DownloadItem(self, item_data, is_active_item=False)  # Title is known; don't fetch it again
+        item.is_active_item = True
+        for name, value in start_fields.items():
+            setattr(item, name, value)
+        if info is not None:
+            store_cached_info_json(item.source_path, item.referer if item.source == XTREAM_SOURCE else None, info)
+        self.items[item.item_id] = item
+        item.start_time = time.time()
+        item.last_update_time = item.start_time
+        item.run_download()
+
+    def abort_item(self, item_id, discard_temp):
+        item = self.items.get(item_id)
+        if item is not None:
+            item.discard_temp_on_finish = discard_temp
+            item.abort_download()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(UI_TICK_MS / 1000)
+            dirty_items, log_chunks, callbacks = self.ui_bus.drain()
+            if dirty_items:
+                self.events.put(('state', {item.item_id: item.get_display_state() for item in dirty_items}))
+            if log_chunks:
+                self.events.put(('log', log_chunks))
+            for callback in callbacks:  # After the snapshots, so the GUI sees the final state before the finish
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Engine error: {e}")
+
+    # The parts of the app interface that DownloadItem uses while running
+    def is_log_window_open(self):
+        return self.log_window_open
+
+    def update_display_item(self, item):
+        pass
+
+    def request_scheduling_pass(self):
+        pass
+
+    def remove_from_queue(self, item):
+        pass
+
+    def move_item_to_pool(self, item, pool):
+        self.events.put(('pool', item.item_id, pool))
+
+    def show_warning(self, title, message):
+        self.events.put(('warning', title, message))
+
+    def download_finished(self, item, final_status):
+        self.items.pop(item.item_id, None)
+        result = {name: getattr(item, name) for name in ENGINE_RESULT_FIELDS}
+        result['output_tail'] = list(item.output_tail)
+        self.events.put(('finished', item.item_id, final_status, result))
+
+
+def run_engine_process(commands, events, settings, yt_dlp_path):
+    """Entry point of the engine process. Runs until told to stop or until the GUI process is gone."""
+    host = EngineHost(events, settings, yt_dlp_path)
+    parent = multiprocessing.parent_process()
+    while True:
+        try:
+            command = commands.get(timeout=1.0)
+        except queue.Empty:
+            if parent is not None and not parent.is_alive():
+                break
+            continue
+        kind = command[0]
+        try:
+            if kind == 'start':
+                host.start_item(*command[1:])
+            elif kind == 'abort':
+                host.abort_item(*command[1:])
+            elif kind == 'settings':
+                host.settings, host.log_window_open = command[1], command[2]
+            elif kind == 'stop':
+                break
+        except Exception as e:
+            print(f"Engine error handling '{kind}': {e}")
+    for item in list(host.items.values()):
+        item.abort_download()
+
+
+class EngineClient:
+    """
+    GUI side of the engine process. Sends start/abort/settings commands and applies the state snapshots,
+    log output and results that come back. Items finish through download_finished as usual.
+    """
+
+    def __init__(self, app_instance):
+        self.app_instance = app_instance
+        context = multiprocessing.get_context('spawn')  # The child must not inherit Tk state from a fork
+        self.commands = context.Queue()
+        self.events = context.Queue()
+        self.running = {}  # item id -> item running in the engine
+        self.process = context.Process(target=run_engine_process, name="DownloadEngine", daemon=True,
+                                       args=(self.commands, self.events, dict(app_instance.settings),
+                                             app_instance.yt_dlp_path))
+        self.process.start()
+        self.update_settings()
+        threading.Thread(target=self._pump_events, daemon=True).start()
+
+    def start_item(self, item):
+        self.running[item.item_id] = item
+        referer = item.referer if item.source == XTREAM_SOURCE else None
+        self.commands.put(('start', self.app_instance._get_item_data_for_history(item),
+                           {name: getattr(item, name) for name in ENGINE_START_FIELDS},
+                           get_cached_info_json(item.source_path, referer)))
+
+    def abort_item(self, item):
+        self.commands.put(('abort', item.item_id, item.discard_temp_on_finish))
+
+    def update_settings(self):
+        self.commands.put(('settings', dict(self.app_instance.settings), self.app_instance.is_log_window_open()))
+
+    def _pump_events(self):
+        """Applies engine events; display changes go through the update bus like those of local threads."""
+        bus = self.app_instance.ui_bus
+        while True:
+            try:
+                event = self.events.get(timeout=1.0)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    break
+                continue
+            kind = event[0]
+            if kind == 'state':
+                for item_id, state in event[1].items():
+                    item = self.running.get(item_id)
+                    if item is not None:
+                        item.__dict__.update(state)
+                        bus.mark_dirty(item)
+            elif kind == 'log':
+                for item_id, text in event[1]:
+                    bus.post_log(item_id, text)
+            elif kind == 'pool':
+                item = self.running.get(event[1])
+                if item is not None:
+                    self.app_instance.move_item_to_pool(item, event[2])
+            elif kind == 'warning':
+                self.app_instance.show_warning(event[1], event[2])
+            elif kind == 'finished':
+                self._finish_item(event[1], event[2], event[3])
+        # The engine died; fail what it was running and run new downloads in this process
+        print("Engine process stopped; running downloads in the UI process from now on.")
+        bus.post_call(self._on_engine_stopped)
+
+    def _finish_item(self, item_id, final_status, result):
+        item = self.running.pop(item_id, None)
+        if item is None:
+            return
+        result['output_tail'] = deque(result['output_tail'], maxlen=OUTPUT_TAIL_LINES)
+        item.__dict__.update(result)
+        item.running_in_engine = False
+        self.app_instance.ui_bus.post_call(lambda: self.app_instance.download_finished(item, final_status))
+
+    def stop(self):
+        """
+        Asks the engine to abort its downloads, killing their yt-dlp/FFmpeg processes, and waits for it to exit.
+        The items stay in the queue journal, so they resume on the next start.
+        """
+        self.commands.put(('stop',))
+        self.process.join(ENGINE_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+
+    def _on_engine_stopped(self):
+        if self.app_instance.engine is self:
+            self.app_instance.engine = None
+        for item_id in list(self.running):
+            self._finish_item(item_id, "failed", {'output_tail': ["Engine process stopped"]})
+
+
+class ControlAPIServer:
+    """
+    Optional HTTP/JSON API on the loopback interface, so other tools on this machine can submit and watch
+    jobs. Request threads never touch app state: each request runs as a callback on the Tk thread through
+    the update bus and waits for its result. Job changes are pushed to /api/events clients.
+
+        GET  /api/jobs[?active=1]    all jobs, or only queued/running ones
+        GET  /api/jobs/<id>          one job, with its progress
+        POST /api/jobs               queue {"url": ...} or {"urls": [...]}, see YTDLPGUIApp.submit_api_jobs
+        POST /api/jobs/<id>/cancel   abort a queued or running job
+        POST /api/jobs/<id>/retry    queue a failed or aborted job again
+        GET  /api/events             server-sent "job" events: the active jobs, then every change
+    """
+
+    def __init__(self, app_instance, port):
+        self.app_instance = app_instance
+        self.port = port
+        self.subscribers = []  # One queue of job state lists per open event stream
+        self.subscribers_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((API_HOST, port), ControlAPIRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+        threading.Thread(target=self.httpd.serve_forever, name="ControlAPI", daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        with self.subscribers_lock:
+            for subscription in self.subscribers:
+                subscription.put(None)  # Ends the event streams
+
+    def call(self, callback):
+        """Runs callback on the Tk thread and returns its result. Raises TimeoutError if the UI does not get to it."""
+        done = threading.Event()
+        result = {}
+
+        def run():
+            try:
+                result['value'] = callback()
+            except Exception as e:
+                result['error'] = e
+            finally:
+                done.set()
+
+        self.app_instance.ui_bus.post_call(run)
+        if not done.wait(API_CALL_TIMEOUT):
+            raise TimeoutError("The application did not respond in time")
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    def subscribe(self):
+        subscription = queue.Queue(maxsize=API_EVENT_BACKLOG)
+        with self.subscribers_lock:
+            self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.subscribers_lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def publish(self, job_states):
+        """Sends job states to every event stream; a stream whose client has fallen behind skips them."""
+        with self.subscribers_lock:
+            for subscription in self.subscribers:
+                try:
+                    subscription.put_nowait(job_states)
+                except queue.Full:
+                    pass
+
+
+class ControlAPIRequestHandler(BaseHTTPRequestHandler):
+    """Routes the requests of the control API; see ControlAPIServer."""
+    server_version = "UniversalVideoDownloader"
+
+    def log_message(self, format, *args):
+        pass  # Dashboards poll often; an access line per request would drown the console
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method):
+        # Web pages must not drive the API: they send an Origin header, or reach it through a DNS name
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        if self.headers.get('Origin') or host not in (API_HOST, 'localhost'):
+            self._send_json(403, {'error': 'Forbidden'})
+            return
+        api = self.server.api
+        app = api.app_instance
+        url = urllib.parse.urlparse(self.path)
+        route = [part for part in url.path.split('/') if part]
+        item_id = int(route[2]) if len(route) > 2 and route[2].isdecimal() else None  # isdigit() also passes '²'
+        try:
+            if method == 'GET' and route == ['api', 'events']:
+                self._stream_events(api)
+                return
+            if method == 'GET' and route == ['api', 'jobs']:
+                active_only = urllib.parse.parse_qs(url.query).get('active', ['0'])[0] not in ('', '0', 'false')
+                status, body = api.call(lambda: app.get_api_jobs(active_only))
+            elif method == 'GET' and len(route) == 3 and route[1] == 'jobs' and item_id is not None:
+                status, body = api.call(lambda: app.get_api_job(item_id))
+            elif method == 'POST' and route == ['api', 'jobs']:
+                request = self._read_json()
+                if request is None:
+                    return
+                status, body = api.call(lambda: app.submit_api_jobs(request))
+            elif method == 'POST' and len(route) == 4 and route[1] == 'jobs' and item_id is not None \
+                    and route[3] in ('cancel', 'retry'):
+                action = app.cancel_api_job if route[3] == 'cancel' else app.retry_api_job
+                status, body = api.call(lambda: action(item_id))
+            else:
+                status, body = 404, {'error': 'Not found'}
+        except TimeoutError as e:
+            status, body = 503, {'error': str(e)}
+        except Exception as e:
+            print(f"Error handling control API request {method} {self.path}: {e}")
+            status, body = 500, {'error': str(e)}
+        self._send_json(status, body)
+
+    def _read_json(self):
+        """The request's JSON body ({} if empty), or None after answering 400."""
+        length = self.headers.get('Content-Length') or '0'
+        if not length.isdecimal() or int(length) > API_MAX_BODY_BYTES:
+            self._send_json(400, {'error': f'The body must be JSON of at most {API_MAX_BODY_BYTES} bytes'})
+            return None
+        raw = self.rfile.read(int(length))
+        try:
+            return json.loads(raw.decode('utf-8')) if raw.strip() else {}
+        except ValueError as e:
+            self._send_json(400, {'error': f'Invalid JSON: {e}'})
+            return None
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, api):
+        """Sends the active jobs, then every job change, as server-sent events until the client goes away."""
+        subscription = api.subscribe()  # Before the snapshot, so no change falls in between
+        try:
+            _, body = api.call(lambda: api.app_instance.get_api_jobs(True))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            job_states = body['jobs']
+            while job_states is not None:
+                for state in job_states:
+                    self.wfile.write(f"event: job\ndata: {json.dumps(state)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                try:
+                    job_states = subscription.get(timeout=API_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    job_states = []
+        except TimeoutError:
+            raise  # Nothing sent yet; _handle answers 503
+        except OSError:
+            pass  # Client disconnected
+        finally:
+            api.unsubscribe(subscription)
+
+
+class DownloadRow:
+    """
+    One row of the virtualized download list. The list only keeps enough rows to fill the viewport and
+    binds them to whichever items are scrolled into view, so the widget count does not grow with history.
+    """
+
+    def __init__(self, app_instance, parent):
+        self.app_instance = app_instance
+        self.item = None
+        self.bar_running = False
+
+        self.frame = tk.Frame(parent, bd=2, relief=tk.RAISED, padx=4, pady=4, bg=COLOR_BG_LIGHT,
+                              highlightbackground=COLOR_BORDER, highlightthickness=1)
+        for column, weight in enumerate((4, 2, 1, 1, 1, 1, 1)):
+            self.frame.columnconfigure(column, weight=weight)
+
+        self.title_label = tk.Label(self.frame, text="", font=MAIN_FONT, anchor="w", justify="left", cursor="hand2")
+        self.title_label.grid(row=0, column=0, sticky="nw", padx=4, pady=2)
+        self.title_tooltip = create_tooltip(self.title_label, "")
+
+        self.status_progress_frame = tk.Frame(self.frame)
+        self.status_progress_frame.grid(row=0, column=1, sticky="nsew", padx=4, pady=2)
+        self.status_progress_frame.columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(self.status_progress_frame, orient="horizontal",
+                                            mode="determinate", length=150, style="Custom.Horizontal.TProgressbar")
+        self.status_label = tk.Label(self.status_progress_frame, text="", font=SMALL_FONT, anchor="center", width=16)
+
+        self.date_added_label = tk.Label(self.frame, text="", font=SMALL_FONT, anchor="w", width=12, fg="#6c757d")
+        self.date_added_label.grid(row=0, column=2, sticky="w", padx=4, pady=2)
+        create_tooltip(self.date_added_label, "Date added to queue")
+
+        self.date_completed_label = tk.Label(self.frame, text="", font=SMALL_FONT, anchor="w", width=12,
+                                             fg="#6c757d")
+        self.date_completed_label.grid(row=0, column=3, sticky="w", padx=4, pady=2)
+        create_tooltip(self.date_completed_label, "Date completed")
+
+        self.elapsed_time_label = tk.Label(self.frame, text="", font=SMALL_FONT, anchor="w", width=10, fg="#495057")
+        self.elapsed_time_label.grid(row=0, column=4, sticky="w", padx=4, pady=2)
+        create_tooltip(self.elapsed_time_label, "Elapsed time / ETA")
+
+        # Abort, Retry or Open depending on the item's state
+        self.action_button = tk.Button(self.frame, text="", command=self._on_action, fg="white", font=SMALL_FONT,
+                                       width=10, relief=tk.RAISED, bd=2, cursor="hand2")
+        self.action_tooltip = create_tooltip(self.action_button, "")
+
+        self.remove_button = tk.Button(self.frame, text="🗑 Remove", command=self._on_remove,
+                                       bg=COLOR_REMOVE_BUTTON, fg="white", font=SMALL_FONT, width=10,
+                                       relief=tk.RAISED, bd=2, activebackground="#5a6268", cursor="hand2")
+        create_tooltip(self.remove_button, "Remove from list (optionally delete file)")
+
+        for widget in (self.frame, self.title_label, self.status_progress_frame, self.status_label,
+                       self.date_added_label, self.date_completed_label, self.elapsed_time_label,
+                       self.progress_bar, self.action_button, self.remove_button):
+            widget.bindtags((DOWNLOAD_LIST_TAG,) + widget.bindtags())
+        # Queued items can be reordered from a right-click menu
+        for widget in (self.frame, self.title_label, self.status_progress_frame, self.status_label):
+            widget.bind("<Button-3>", self._on_right_click)
+
+    def show(self, item, slot):
+        """Binds the row to an item and puts it in the given slot of the viewport, or hides it for None."""
+        if self.item is not item:
+            if self.item is not None and self.item.row is self:
+                self.item.row = None
+            if item is not None:
+                if item.row is not None and item.row is not self:
+                    item.row.item = None  # That row gets a new item later in the same pass
+                item.row = self
+            self.item = item
+        if item is None:
+            self.frame.place_forget()
+            return
+        self.frame.place(x=5, y=slot * ROW_HEIGHT + 3, relwidth=1, width=-10, height=ROW_HEIGHT - 6)
+        self.render()
+
+    def destroy(self):
+        self.show(None, 0)
+        self.frame.destroy()
+
+    def render(self):
+        """Copies the bound item's state into the widgets."""
+        item = self.item
+        if item is None:
+            return
+        bg_color = COLOR_BG_LIGHT
+        if item.is_active_item:
+            if item.status == "queued":
+                bg_color = COLOR_QUEUED_ITEM
+            elif item.status in ["active", "Downloading", "Converting"]:
+                bg_color = COLOR_ACTIVE_ITEM
+        elif item.status == "completed":
+            bg_color = COLOR_COMPLETED_ITEM
+        elif item.status == "failed":
+            bg_color = COLOR_FAILED_ITEM
+        for widget in (self.frame, self.title_label, self.status_progress_frame, self.status_label,
+                       self.date_added_label, self.date_completed_label, self.elapsed_time_label):
+            widget.config(bg=bg_color)
+
+        self.render_title()
+        self.title_tooltip.text = item.get_tooltip_text()
+        # Queued rows show their start order; the status itself stays "queued"
+        queue_position_text = self.app_instance.get_queue_position_text(item) if item.status == "queued" else ''
+        status_text = queue_position_text or item.status.capitalize()
+        self.status_label.config(text=status_text, fg=item.status_color)
+
+        if item.is_active_item:
+            self.progress_bar.grid(row=0, column=0, sticky="ew")
+            self.progress_bar.config(mode=item.progress_mode, value=item.progress_value)
+            self.status_label.grid_forget()
+            self.status_label.place(relx=0.5, rely=0.5, anchor="center")
+            self.status_label.lift()
+        else:
+            self.progress_bar.grid_remove()
+            self.status_label.place_forget()
+            self.status_label.grid(row=0, column=0, sticky="ew")
+        if item.is_active_item and item.progress_running != self.bar_running:
+            self.progress_bar.start() if item.progress_running else self.progress_bar.stop()
+            self.bar_running = item.progress_running
+        elif not item.is_active_item and self.bar_running:
+            self.progress_bar.stop()
+            self.bar_running = False
+
+        self.date_added_label.config(text=item.date_added)
+        self.date_completed_label.config(text=item.date_completed)
+        self.elapsed_time_label.config(text=item.elapsed_text if item.is_active_item else
+                                       item._format_seconds_to_dd_hh_mm_ss(item.elapsed_time_seconds))
+
+        if item.is_active_item:
+            self.action_button.config(text="⏹ Abort", bg=COLOR_ABORT_BUTTON, activebackground="#c82333",
+                                      state="normal" if item.abort_enabled else "disabled")
+            self.action_tooltip.text = "Stop this download"
+        elif item.status in ['failed', 'aborted', 'cancelled']:
+            self.action_button.config(text="🔄 Retry", bg=COLOR_ADD_BUTTON, activebackground="#218838", state="normal")
+            self.action_tooltip.text = "Retry this download"
+        elif item.status == 'completed':
+            self.action_button.config(text="📁 Open", bg=COLOR_OPEN_FILE_BUTTON, activebackground="#138496",
+                                      state="normal")
+            self.action_tooltip.text = "Open file location in explorer"
+        else:
+            self.action_button.grid_remove()
+            self.remove_button.grid_remove()
+            return
+        self.action_button.grid(row=0, column=5, sticky="e", padx=2, pady=0)
+        self.remove_button.grid(row=0, column=6, sticky="e", padx=2, pady=0)
+
+    def render_title(self):
+        """Fits the title into the name column; the only part of a row that depends on the list width."""
+        if self.item is not None:
+            self.title_label.config(text=self.app_instance.fit_title(self.item.get_display_name()))
+
+    def _on_action(self):
+        item = self.item
+        if item is None:
+            return
+        if item.is_active_item:
+            item.abort_download()
+        elif item.status in ['failed', 'aborted', 'cancelled']:
+            item.retry_download()
+        elif item.status == 'completed':
+            item._open_file_location()
+
+    def _on_remove(self):
+        if self.item is not None:
+            self.item._confirm_and_remove()
+
+    def _on_right_click(self, event):
+        if self.item is None:
+            return
+        if self.item.is_active_item:
+            self.item._show_queue_menu(event)
+        else:
+            self.item._show_history_menu(event)
+
+
 class YTDLPGUIApp:
     def __init__(self, master):
         self.master = master
@@ -1072,9 +2712,18 @@ class YTDLPGUIApp:
         # Initialize log_window and log_text early to ensure they always exist as attributes
         self.log_window = None
         self.log_text = None
+        self.log_filter_var = None
+        self.log_filter_item_id = None  # Only this item's output is shown; None shows all
+        # Worker threads never touch widgets; they post to this bus and _drain_ui_updates applies it
+        self.ui_bus = UIUpdateBus()
+        self.engine = None  # EngineClient, once the engine process is started
+        self.api_server = None  # ControlAPIServer, while the control API is enabled
+        self.temp_subdir = TEMP_SUBDIR  # Folder under the output directory for partial downloads and task logs
 
         # Load settings first
         self.settings = self._load_settings()
+        # (item id, text) of recent output; the log window shows a filtered view of it
+        self.log_buffer = deque(maxlen=max(1, int(self.settings['log_max_lines'])))
 
         # Initialize log_toggle_var and log_window_visible based on settings
         self.log_toggle_var = tk.BooleanVar(value=self.settings['show_log_window'])
@@ -1085,10 +2734,16 @@ class YTDLPGUIApp:
         self._create_menus()  # Now self.log_toggle_var and self.log_window exist when this is called
         self._create_widgets()
         self._initialize_download_management()
-        self._cleanup_temp_directories_on_launch()
+        self.engine = self._start_engine()
         self._load_downloads_from_local_history()
-
-        self.master.after(100, self._process_queue_loop)
+        self._restore_queue_from_journal()
+        self._cleanup_temp_directories_on_launch()  # After history and queue, so resumable items keep their partial files
+        self._cleanup_item_logs_on_launch()
+        self._update_api_server()
+
+        self.master.after(100, self._scheduler_safety_net)
+        self.master.after(UI_TICK_MS, self._drain_ui_updates)
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close)
         # Initialize UI state based on default source (Default) and settings
         self.on_source_change(DEFAULT_SOURCE)
         self.master.after_idle(self._refresh_display_order)
@@ -1096,40 +2751,17 @@ class YTDLPGUIApp:
         self.selected_local_filepath = None
 
     def _get_default_settings(self):
-        return {
-            "show_log_window": False,
-            "max_concurrent_downloads": DEFAULT_MAX_CONCURRENT_DOWNLOADS,
-            "output_directory": DEFAULT_DOWNLOADS_DIR,
-            "default_default_quality": "Auto (Best available)",
-            "default_local_quality": "Medium Quality MP4",
-            "remember_delete_choice": False,  # New setting: if True, skips confirmation dialog
-            "delete_file_on_remove": False,
-            # New setting: stores the remembered choice (if remember_delete_choice is True)
-            "delete_file_on_remove_default": False  # New setting: default for 'also delete file' checkbox in dialog
-        }
+        return get_default_settings()
 
     def _load_settings(self):
-        settings = self._get_default_settings()
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    # Update defaults with loaded settings, ensuring new keys are added
-                    for key, value in loaded_settings.items():
-                        if key in settings:  # Only update if key exists in default settings
-                            settings[key] = value
-
-                    # Handle renaming of default_youtube_quality to default_default_quality
-                    if 'default_youtube_quality' in loaded_settings and 'default_default_quality' not in loaded_settings:
-                        settings['default_default_quality'] = loaded_settings['default_youtube_quality']
-                        # No need to del, as we only copy existing keys into settings
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Error loading settings from {CONFIG_FILE}: {e}")
-                messagebox.showwarning("Settings Load Error",
-                                       f"Could not load settings. Resetting to default. Error: {e}")
-                # Optionally, delete corrupted config file
-                if os.path.exists(CONFIG_FILE):
-                    os.remove(CONFIG_FILE)
+        settings, e = read_settings_file(CONFIG_FILE)
+        if e is not None:
+            print(f"Error loading settings from {CONFIG_FILE}: {e}")
+            messagebox.showwarning("Settings Load Error",
+                                   f"Could not load settings. Resetting to default. Error: {e}")
+            # Optionally, delete corrupted config file
+            if os.path.exists(CONFIG_FILE):
+                os.remove(CONFIG_FILE)
 
         # Ensure output directory exists based on loaded/default setting
         full_output_path = os.path.join(os.getcwd(), settings['output_directory'])
@@ -1192,7 +2824,7 @@ class YTDLPGUIApp:
     def _create_settings_window(self):
         settings_win = tk.Toplevel(self.master)
         settings_win.title("Settings")
-        settings_win.geometry("500x400")  # Increased height for new options
+        settings_win.geometry("500x1040")  # Increased height for new options
         settings_win.transient(self.master)  # Make it appear on top of the main window
         settings_win.grab_set()  # Make it modal
         settings_win.resizable(False, False)
@@ -1208,10 +2840,49 @@ class YTDLPGUIApp:
         default_default_quality_var = tk.StringVar(value=self.settings['default_default_quality'])
         default_local_quality_var = tk.StringVar(value=self.settings['default_local_quality'])
 
-        # New variables for removal settings
-        remember_delete_choice_var = tk.BooleanVar(value=self.settings['remember_delete_choice'])
-        delete_file_on_remove_var = tk.BooleanVar(value=self.settings['delete_file_on_remove'])
-        delete_file_on_remove_default_var = tk.BooleanVar(value=self.settings['delete_file_on_remove_default'])
+        # New variables for removal settings
+        remember_delete_choice_var = tk.BooleanVar(value=self.settings['remember_delete_choice'])
+        delete_file_on_remove_var = tk.BooleanVar(value=self.settings['delete_file_on_remove'])
+        delete_file_on_remove_default_var = tk.BooleanVar(value=self.settings['delete_file_on_remove_default'])
+
+        # Playlist expansion settings
+        expand_playlists_var = tk.BooleanVar(value=self.settings['expand_playlists'])
+        playlist_page_size_var = tk.IntVar(value=self.settings['playlist_page_size'])
+
+        # Fragment concurrency settings
+        fragments_per_item_var = tk.IntVar(value=self.settings['fragments_per_item'])
+        fragment_budget_var = tk.IntVar(value=self.settings['fragment_budget'])
+
+        # MP3 settings
+        mp3_audio_bitrate_var = tk.StringVar(value=self.settings['mp3_audio_bitrate'])
+
+        # Duplicate handling
+        duplicate_action_var = tk.StringVar(value=self.settings['duplicate_action'])
+
+        # Automatic retries
+        auto_retry_var = tk.BooleanVar(value=self.settings['auto_retry'])
+
+        # Resource limits for the phases after downloading
+        max_cpu_jobs_var = tk.IntVar(value=self.settings['max_cpu_jobs'])
+        max_merge_jobs_var = tk.IntVar(value=self.settings['max_merge_jobs'])
+
+        # Per-site politeness limits
+        host_max_concurrent_var = tk.IntVar(value=self.settings['host_max_concurrent'])
+        host_min_start_interval_var = tk.DoubleVar(value=self.settings['host_min_start_interval'])
+        host_limits_var = tk.StringVar(value=format_host_limits(self.settings['host_limits']))
+
+        # Queue order
+        scheduling_policy_var = tk.StringVar(value=self.settings['scheduling_policy'])
+
+        # Log window size
+        log_max_lines_var = tk.IntVar(value=self.settings['log_max_lines'])
+
+        # Engine process
+        engine_process_var = tk.BooleanVar(value=self.settings['engine_process'])
+
+        # Control API
+        api_enabled_var = tk.BooleanVar(value=self.settings['api_enabled'])
+        api_port_var = tk.IntVar(value=self.settings['api_port'])
 
         # Max Concurrent Downloads
         ttk.Label(settings_frame, text="Max Concurrent Downloads:").grid(row=0, column=0, sticky="w", pady=5)
@@ -1284,6 +2955,94 @@ class YTDLPGUIApp:
         # Initial call to set state correctly on window open
         toggle_delete_file_checkbox_state()
 
+        # Playlist / Channel Settings
+        ttk.Label(settings_frame, text="Playlists & Channels:", font=BOLD_FONT).grid(row=9, column=0, columnspan=3,
+                                                                                    sticky="w", pady=(15, 5))
+        ttk.Checkbutton(settings_frame, text="Expand playlists/channels into separate queue items",
+                        variable=expand_playlists_var).grid(row=10, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+        ttk.Label(settings_frame, text="Playlist Page Size:").grid(row=11, column=0, sticky="w", padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=10, to=500, increment=10, textvariable=playlist_page_size_var,
+                    width=5).grid(row=11, column=1, sticky="w", pady=2)
+
+        # Fragment Concurrency Settings (DASH/HLS downloads through yt-dlp)
+        ttk.Label(settings_frame, text="Fragment Downloads:", font=BOLD_FONT).grid(row=12, column=0, columnspan=3,
+                                                                                  sticky="w", pady=(15, 5))
+        ttk.Label(settings_frame, text="Max Fragments per Download:").grid(row=13, column=0, sticky="w", padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=1, to=32, textvariable=fragments_per_item_var,
+                    width=5).grid(row=13, column=1, sticky="w", pady=2)
+        ttk.Label(settings_frame, text="Global Fragment Budget:").grid(row=14, column=0, sticky="w", padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=1, to=128, textvariable=fragment_budget_var,
+                    width=5).grid(row=14, column=1, sticky="w", pady=2)
+
+        # MP3 Settings
+        ttk.Label(settings_frame, text="MP3 Audio Bitrate (kbps):").grid(row=15, column=0, sticky="w", pady=(15, 5))
+        ttk.OptionMenu(settings_frame, mp3_audio_bitrate_var, mp3_audio_bitrate_var.get(),
+                       *MP3_BITRATE_OPTIONS).grid(row=15, column=1, sticky="ew", pady=(15, 5))
+
+        # Already Downloaded Items
+        ttk.Label(settings_frame, text="If Already Downloaded:").grid(row=16, column=0, sticky="w", pady=5)
+        ttk.OptionMenu(settings_frame, duplicate_action_var, duplicate_action_var.get(),
+                       *DUPLICATE_ACTIONS).grid(row=16, column=1, sticky="ew", pady=5)
+
+        # Automatic Retries
+        ttk.Checkbutton(settings_frame, text="Retry network and server errors automatically",
+                        variable=auto_retry_var).grid(row=17, column=0, columnspan=2, sticky="w", pady=5)
+
+        # Conversion / Merge Slots (separate from the download slots above)
+        ttk.Label(settings_frame, text="Max Concurrent Conversions:").grid(row=18, column=0, sticky="w", pady=2)
+        ttk.Spinbox(settings_frame, from_=1, to=max(4, 2 * DEFAULT_MAX_CPU_JOBS), textvariable=max_cpu_jobs_var,
+                    width=5).grid(row=18, column=1, sticky="w", pady=2)
+        ttk.Label(settings_frame, text="Max Concurrent Merges:").grid(row=19, column=0, sticky="w", pady=2)
+        ttk.Spinbox(settings_frame, from_=1, to=8, textvariable=max_merge_jobs_var,
+                    width=5).grid(row=19, column=1, sticky="w", pady=2)
+
+        # Per-Site Limits (avoid being throttled or banned by one site)
+        ttk.Label(settings_frame, text="Per-Site Limits:", font=BOLD_FONT).grid(row=20, column=0, columnspan=3,
+                                                                               sticky="w", pady=(15, 5))
+        ttk.Label(settings_frame, text="Max Downloads per Site:").grid(row=21, column=0, sticky="w", padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=1, to=16, textvariable=host_max_concurrent_var,
+                    width=5).grid(row=21, column=1, sticky="w", pady=2)
+        ttk.Label(settings_frame, text="Seconds Between Starts:").grid(row=22, column=0, sticky="w", padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=0, to=60, increment=0.5, textvariable=host_min_start_interval_var,
+                    width=5).grid(row=22, column=1, sticky="w", pady=2)
+        ttk.Label(settings_frame, text="Site Overrides:").grid(row=23, column=0, sticky="w", padx=5, pady=2)
+        host_limits_entry = ttk.Entry(settings_frame, textvariable=host_limits_var)
+        host_limits_entry.grid(row=23, column=1, columnspan=2, sticky="ew", pady=2)
+        create_tooltip(host_limits_entry, "domain=max downloads/seconds between starts, comma separated\n"
+                                          "e.g. youtube.com=3/1, example.org=1/10")
+
+        # Queue Order (within a priority)
+        ttk.Label(settings_frame, text="Queue Order:").grid(row=24, column=0, sticky="w", pady=(15, 5))
+        scheduling_policy_menu = ttk.OptionMenu(settings_frame, scheduling_policy_var, scheduling_policy_var.get(),
+                                                *SCHEDULING_POLICIES)
+        scheduling_policy_menu.grid(row=24, column=1, columnspan=2, sticky="ew", pady=(15, 5))
+        create_tooltip(scheduling_policy_menu, "Shortest first lets small items through ahead of long videos;\n"
+                                               "long ones still start once they have waited long enough.")
+
+        # Log Window Lines
+        ttk.Label(settings_frame, text="Log Window Lines:").grid(row=25, column=0, sticky="w", pady=5)
+        log_max_lines_spinbox = ttk.Spinbox(settings_frame, from_=100, to=100000, increment=100,
+                                            textvariable=log_max_lines_var, width=8)
+        log_max_lines_spinbox.grid(row=25, column=1, sticky="w", pady=5)
+        create_tooltip(log_max_lines_spinbox, "Older lines are dropped from the top of the log window.")
+
+        # Engine Process
+        engine_process_checkbox = ttk.Checkbutton(settings_frame, text="Run downloads in a separate process",
+                                                  variable=engine_process_var)
+        engine_process_checkbox.grid(row=26, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+        create_tooltip(engine_process_checkbox, "Keeps the window responsive under heavy download load.\n"
+                                                "Takes effect after a restart.")
+
+        # Local Control API
+        api_enabled_checkbox = ttk.Checkbutton(settings_frame, text="Enable local control API (HTTP/JSON)",
+                                               variable=api_enabled_var)
+        api_enabled_checkbox.grid(row=27, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+        create_tooltip(api_enabled_checkbox, f"Lets tools on this computer queue and watch tasks through\n"
+                                             f"http://{API_HOST}:<port>/api/jobs. Not reachable from other computers.")
+        ttk.Label(settings_frame, text="Control API Port:").grid(row=28, column=0, sticky="w", padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=1024, to=65535, textvariable=api_port_var,
+                    width=8).grid(row=28, column=1, sticky="w", pady=2)
+
         def apply_settings():
             try:
                 self.settings['max_concurrent_downloads'] = max_downloads_var.get()
@@ -1322,6 +3081,38 @@ class YTDLPGUIApp:
                 self.settings['delete_file_on_remove'] = delete_file_on_remove_var.get()
                 self.settings['delete_file_on_remove_default'] = delete_file_on_remove_default_var.get()
 
+                # Save playlist settings
+                self.settings['expand_playlists'] = expand_playlists_var.get()
+                self.settings['playlist_page_size'] = max(1, playlist_page_size_var.get())
+
+                # Save fragment concurrency settings
+                self.settings['fragments_per_item'] = max(1, fragments_per_item_var.get())
+                self.settings['fragment_budget'] = max(1, fragment_budget_var.get())
+                self.settings['mp3_audio_bitrate'] = mp3_audio_bitrate_var.get()
+                self.settings['duplicate_action'] = duplicate_action_var.get()
+                self.settings['auto_retry'] = auto_retry_var.get()
+                self.settings['engine_process'] = engine_process_var.get()
+                self.settings['api_enabled'] = api_enabled_var.get()
+                self.settings['api_port'] = min(65535, max(1024, api_port_var.get()))
+                self._update_api_server()
+                self.settings['max_cpu_jobs'] = max(1, max_cpu_jobs_var.get())
+                self.settings['max_merge_jobs'] = max(1, max_merge_jobs_var.get())
+                self.settings['host_max_concurrent'] = max(1, host_max_concurrent_var.get())
+                self.settings['host_min_start_interval'] = max(0.0, host_min_start_interval_var.get())
+                if scheduling_policy_var.get() != self.settings['scheduling_policy']:
+                    self.settings['scheduling_policy'] = scheduling_policy_var.get()
+                    self.queued_downloads.set_policy(self.settings['scheduling_policy'])
+                    self.update_queue_positions()
+                if max(100, log_max_lines_var.get()) != self.settings['log_max_lines']:
+                    self.settings['log_max_lines'] = max(100, log_max_lines_var.get())
+                    self.log_buffer = deque(self.log_buffer, maxlen=self.settings['log_max_lines'])
+                    self._render_log_view()
+                try:
+                    self.settings['host_limits'] = parse_host_limits(host_limits_var.get())
+                except ValueError as e:
+                    messagebox.showwarning("Invalid Site Overrides", f"Site overrides were not changed: {e}")
+                self.request_scheduling_pass()  # A higher concurrency limit takes effect immediately
+
                 # Apply log window setting immediately
                 self.log_toggle_var.set(self.settings['show_log_window'])
                 self.log_window_visible = self.settings['show_log_window']
@@ -1331,6 +3122,8 @@ class YTDLPGUIApp:
                     self._toggle_log_window()
                 else:
                     self._on_log_window_close()
+                if self.engine is not None:
+                    self.engine.update_settings()
 
                 messagebox.showinfo("Settings Applied",
                                     "Settings applied successfully. Remember to click 'Save' to make them permanent.")
@@ -1550,19 +3343,206 @@ For more information, visit the project repository or check the README file.
                 self.log_window.title("Process Log")
                 self.log_window.geometry("600x400")
                 self.log_window.protocol("WM_DELETE_WINDOW", self._on_log_window_close)
+                filter_frame = tk.Frame(self.log_window)
+                filter_frame.pack(fill="x", padx=5, pady=(5, 0))
+                tk.Label(filter_frame, text="Show:", font=SMALL_FONT).pack(side="left")
+                self.log_filter_var = tk.StringVar(value=LOG_FILTER_ALL)
+                log_filter_combo = ttk.Combobox(filter_frame, textvariable=self.log_filter_var, state="readonly",
+                                                postcommand=lambda: log_filter_combo.config(
+                                                    values=self._get_log_filter_choices()))
+                log_filter_combo.pack(side="left", fill="x", expand=True, padx=5)
+                log_filter_combo.bind("<<ComboboxSelected>>", self._on_log_filter_change)
                 self.log_text = scrolledtext.ScrolledText(self.log_window, wrap=tk.WORD, font=MONO_FONT, bg="black",
                                                           fg="lightgreen", insertbackground="white")
                 self.log_text.pack(fill="both", expand=True, padx=5, pady=5)
                 self.log_text.config(state=tk.DISABLED)
+                self._render_log_view()
             self.log_window.deiconify()
         else:
             if self.log_window and self.log_window.winfo_exists(): self.log_window.withdraw()
+        if self.engine is not None:
+            self.engine.update_settings()  # Live output is only sent while the log window is open
+
+    def is_log_window_open(self):
+        return bool(self.log_window_visible and self.log_text)
+
+    def show_warning(self, title, message):
+        """Shows a warning dialog on the Tk thread. Safe from worker threads."""
+        self.ui_bus.post_call(lambda: messagebox.showwarning(title, message))
+
+    def _start_engine(self):
+        """Starts the engine process that runs the downloads, or returns None to run them in this process."""
+        if not self.settings['engine_process']:
+            return None
+        try:
+            return EngineClient(self)
+        except Exception as e:
+            print(f"Could not start the engine process, running downloads in the UI process: {e}")
+            return None
+
+    def _write_log_chunks(self, log_chunks):
+        """
+        Adds one tick's worth of (item id, text) output to the ring buffer and, in a single insert,
+        to the log window. The window is then trimmed from the top back to the line limit.
+        """
+        self.log_buffer.extend(log_chunks)
+        if not self.log_text or not self.log_window.winfo_exists():
+            return
+        text = "".join(chunk for item_id, chunk in log_chunks
+                       if self.log_filter_item_id is None or item_id == self.log_filter_item_id)
+        if not text:
+            return
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.insert(END, text)
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        excess = line_count - self.log_buffer.maxlen
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+        self.log_text.see(END)
+        self.log_text.config(state=tk.DISABLED)
+
+    def _render_log_view(self):
+        """Refills the log window from the ring buffer, e.g. after the filter changed."""
+        if not self.log_text or not self.log_window.winfo_exists():
+            return
+        text = "".join(chunk for item_id, chunk in self.log_buffer
+                       if self.log_filter_item_id is None or item_id == self.log_filter_item_id)
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete("1.0", END)
+        self.log_text.insert(END, text)
+        self.log_text.see(END)
+        self.log_text.config(state=tk.DISABLED)
+
+    def _get_log_filter_choices(self):
+        """'All tasks' plus one entry per item that has output in the buffer, newest first."""
+        choices = [LOG_FILTER_ALL]
+        seen = set()
+        for item_id, chunk in reversed(self.log_buffer):
+            if item_id in seen:
+                continue
+            seen.add(item_id)
+            item = self.download_items_map.get(item_id)
+            title = item.get_display_name() if item else "(removed)"
+            choices.append(f"#{item_id} {title[:60]}")
+        return choices
+
+    def show_item_log(self, item):
+        """Opens a viewer for one item's log files. The newest page is shown first; earlier pages load on demand."""
+        files = ItemLogFile.get_files(item.get_log_path())
+        total_bytes = sum(size for _, size in files)
+        viewer = tk.Toplevel(self.master)
+        viewer.title(f"Log: {item.get_display_name()}")
+        viewer.geometry("700x450")
+
+        top_frame = tk.Frame(viewer)
+        top_frame.pack(fill="x", padx=5, pady=(5, 0))
+        info_label = tk.Label(top_frame, text="", font=SMALL_FONT, anchor="w")
+        info_label.pack(side="left", fill="x", expand=True)
+        load_button = tk.Button(top_frame, text="Load Earlier", font=SMALL_FONT, cursor="hand2")
+        load_button.pack(side="right")
+        log_view = scrolledtext.ScrolledText(viewer, wrap=tk.WORD, font=MONO_FONT, bg="black", fg="lightgreen")
+        log_view.pack(fill="both", expand=True, padx=5, pady=5)
+
+        loaded_from = [total_bytes]  # Start offset of the text shown so far
+
+        def load_earlier_page():
+            text, loaded_from[0] = read_log_page(files, loaded_from[0])
+            log_view.config(state=tk.NORMAL)
+            log_view.insert("1.0", text)
+            log_view.config(state=tk.DISABLED)
+            info_label.config(text=f"Showing {format_bytes(total_bytes - loaded_from[0])} of "
+                                   f"{format_bytes(total_bytes)}")
+            if loaded_from[0] <= 0:
+                load_button.config(state="disabled")
+
+        load_button.config(command=load_earlier_page)
+        load_earlier_page()
+        log_view.see(END)
+
+    def _on_log_filter_change(self, event=None):
+        choice = self.log_filter_var.get()
+        if choice == LOG_FILTER_ALL:
+            self.log_filter_item_id = None
+        else:
+            try:
+                self.log_filter_item_id = int(choice[1:].split(" ", 1)[0])
+            except ValueError:
+                self.log_filter_item_id = None
+        self._render_log_view()
+
+    def _on_close(self):
+        """
+        Stops the engine and the control API before the window closes, so no yt-dlp or FFmpeg process
+        outlives the app. Unfinished items stay in the queue journal and resume on the next start.
+        """
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
+        for item in self.active_downloads:
+            if item.process:
+                try:
+                    item.process.kill()
+                except Exception as e:
+                    print(f"Error stopping the process of '{item.video_title}': {e}")
+        if self.api_server is not None:
+            self.api_server.stop()
+            self.api_server = None
+        self.queue_journal.flush()
+        self.master.destroy()
+
+    def _update_api_server(self):
+        """Starts, stops or moves the control API to match the settings."""
+        port = int(self.settings['api_port']) if self.settings['api_enabled'] else None
+        if self.api_server is not None and self.api_server.port != port:
+            self.api_server.stop()
+            self.api_server = None
+        if port is not None and self.api_server is None:
+            try:
+                self.api_server = ControlAPIServer(self, port)
+                print(f"Control API listening on http://{API_HOST}:{port}/api/")
+            except OSError as e:
+                print(f"Could not start the control API on port {port}: {e}")
+                self.show_warning("Control API", f"Could not start the control API on port {port}: {e}")
+
+    def _publish_job_updates(self, items):
+        """Pushes the new state of changed items to the control API's event streams."""
+        if self.api_server is not None and items and self.api_server.has_subscribers():
+            self.api_server.publish([self.get_job_state(item) for item in items])
+
+    def _drain_ui_updates(self):
+        """
+        UI tick: applies what worker threads posted since the last tick, then redraws each changed row once.
+        The next tick is always scheduled, so one failing update cannot stop all later ones.
+        """
+        try:
+            dirty_items, log_chunks, callbacks = self.ui_bus.drain()
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error applying UI update: {e}")
+            if log_chunks:
+                try:
+                    self._write_log_chunks(log_chunks)
+                except Exception as e:
+                    print(f"Error writing to the log window: {e}")
+            for item in dirty_items:
+                try:
+                    item.refresh_row()
+                except Exception as e:
+                    print(f"Error redrawing the row of '{item.video_title}': {e}")
+            self._publish_job_updates(dirty_items)
+            self.queue_journal.flush()  # One fsync for all queue changes of this tick
+        finally:
+            self.master.after(UI_TICK_MS, self._drain_ui_updates)
 
     def _on_log_window_close(self):
         """Handles the log window close button, updating the toggle variable."""
         self.log_toggle_var.set(False)
         self.log_window_visible = False
         if self.log_window: self.log_window.withdraw()
+        if self.engine is not None:
+            self.engine.update_settings()
 
     def _open_downloads_folder(self):
         """Opens the main downloads directory."""
@@ -1684,30 +3664,40 @@ For more information, visit the project repository or check the README file.
 
         self.display_area_frame = tk.Frame(self.main_frame)
         self.display_area_frame.pack(fill="both", expand=True, pady=5)
-        self.display_area_frame.grid_rowconfigure(0, weight=1)
+        self.display_area_frame.grid_rowconfigure(1, weight=1)
         self.display_area_frame.grid_columnconfigure(0, weight=1)
         self.display_area_frame.grid_columnconfigure(1, weight=0)
+        self._build_list_header()
 
-        self.downloads_canvas = tk.Canvas(self.display_area_frame, bg="white", highlightthickness=0)
-        self.downloads_canvas.grid(row=0, column=0, sticky="nsew")
+        # Only the rows in view exist as widgets; see DownloadRow and _render_visible_rows
+        style = ttk.Style()
+        style.theme_use('default')
+        style.configure("Custom.Horizontal.TProgressbar",
+                        background=COLOR_STATUS_PROGRESS,
+                        troughcolor=COLOR_BG_LIGHT,
+                        borderwidth=0,
+                        lightcolor=COLOR_STATUS_PROGRESS,
+                        darkcolor=COLOR_STATUS_PROGRESS)
+        self.row_pool = []
+        self.display_items = []  # All listed items, kept in display order
+        self.list_offset = 0  # Index of the first item in view
+        self.list_size = (0, 0)  # Width and height the rows were last laid out for
+        self.resize_timer_id = None
+        self.title_font = tkinter.font.Font(family=MAIN_FONT[0], size=MAIN_FONT[1])  # Shared by all rows
+        self.title_fit_cache = OrderedDict()  # LRU of (title, width) -> fitted title
+
+        self.downloads_list_frame = tk.Frame(self.display_area_frame, bg="white")
+        self.downloads_list_frame.grid(row=1, column=0, sticky="nsew")
+        self.downloads_list_frame.bindtags((DOWNLOAD_LIST_TAG,) + self.downloads_list_frame.bindtags())
 
         self.downloads_scroll_y = tk.Scrollbar(self.display_area_frame, orient="vertical",
-                                               command=self.downloads_canvas.yview)
-        self.downloads_scroll_y.grid(row=0, column=1, sticky="ns")
-
-        self.downloads_canvas.config(yscrollcommand=self.downloads_scroll_y.set)
+                                               command=self._on_list_scroll)
+        self.downloads_scroll_y.grid(row=1, column=1, sticky="ns")
 
-        self.downloads_frame_inner = tk.Frame(self.downloads_canvas, bg="white")
-        self.downloads_canvas_window_id = self.downloads_canvas.create_window((0, 0), window=self.downloads_frame_inner,
-                                                                              anchor="nw", width=0)
-
-        self.downloads_frame_inner.bind("<Configure>", lambda e: self.downloads_canvas.configure(
-            scrollregion=self.downloads_canvas.bbox("all")))
-        self.downloads_canvas.bind('<Configure>', self._on_downloads_canvas_resize)
-
-        self.downloads_canvas.bind('<MouseWheel>', self._on_mousewheel)
-        self.downloads_canvas.bind('<Button-4>', self._on_mousewheel)
-        self.downloads_canvas.bind('<Button-5>', self._on_mousewheel)
+        self.downloads_list_frame.bind('<Configure>', self._on_downloads_list_resize)
+        self.master.bind_class(DOWNLOAD_LIST_TAG, '<MouseWheel>', self._on_mousewheel)
+        self.master.bind_class(DOWNLOAD_LIST_TAG, '<Button-4>', self._on_mousewheel)
+        self.master.bind_class(DOWNLOAD_LIST_TAG, '<Button-5>', self._on_mousewheel)
 
         # Enhanced status bar with better visual feedback
         status_frame = tk.Frame(self.master, bg=COLOR_BG_LIGHT, bd=1, relief=tk.SUNKEN)
@@ -1723,19 +3713,125 @@ For more information, visit the project repository or check the README file.
                                           bg=COLOR_BG_LIGHT, padx=10, pady=5)
         self.queue_status_label.pack(side="right")
 
+    def _build_list_header(self):
+        """Column headers above the download list; clicking one sorts by that column."""
+        header_frame = tk.Frame(self.display_area_frame, bg="#e0e0e0")
+        header_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=(0, 2))
+        columns = [("Name", 0), ("Status", 1), ("Date Added", 2), ("Date Completed", 3), ("Time / ETA", 4),
+                   ("Action", 5)]
+        header_frame.columnconfigure(0, weight=4);
+        header_frame.columnconfigure(1, weight=2);
+        header_frame.columnconfigure(2, weight=1)
+        header_frame.columnconfigure(3, weight=1);
+        header_frame.columnconfigure(4, weight=1);
+        header_frame.columnconfigure(5, weight=1)
+        header_frame.columnconfigure(6, weight=1)  # Added for new 'Remove' column
+
+        for col_name, col_idx in columns:
+            lbl = tk.Label(header_frame, text=col_name, font=BOLD_FONT, bg="#e0e0e0", borderwidth=1, relief="ridge")
+            lbl.grid(row=0, column=col_idx, sticky="ew", padx=1, pady=0);
+            lbl.bind("<Button-1>", lambda e, idx=col_idx: self._on_header_click(idx))
+
     def _on_mousewheel(self, event):
-        """Handles mouse wheel scrolling for the combined downloads canvas."""
-        self.downloads_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        """Scrolls the download list a few rows per wheel notch."""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self._set_list_offset(self.list_offset - LIST_WHEEL_ROWS)
+        elif event.num == 5 or getattr(event, 'delta', 0) < 0:
+            self._set_list_offset(self.list_offset + LIST_WHEEL_ROWS)
         return "break"
 
-    def _on_downloads_canvas_resize(self, event):
-        """Adjusts the width of the inner frame when the canvas resizes."""
-        self.downloads_canvas.itemconfig(self.downloads_canvas_window_id, width=event.width)
-        self.downloads_canvas.configure(scrollregion=self.downloads_canvas.bbox("all"))
-        self._refresh_display_order()
+    def _on_list_scroll(self, *args):
+        """Scrollbar command ('moveto', fraction) or ('scroll', n, 'units'/'pages')."""
+        rows_in_view = max(1, self.downloads_list_frame.winfo_height() // ROW_HEIGHT)
+        if args[0] == 'moveto':
+            self._set_list_offset(int(round(float(args[1]) * len(self.display_items))))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (rows_in_view if args[2] == 'pages' else 1)
+            self._set_list_offset(self.list_offset + step)
+
+    def _set_list_offset(self, offset):
+        if offset != self.list_offset:
+            self.list_offset = offset
+            self._render_visible_rows()
+
+    def _on_downloads_list_resize(self, event):
+        """<Configure> fires many times per second while the window is dragged; lay out once it settles."""
+        if self.resize_timer_id:
+            self.master.after_cancel(self.resize_timer_id)
+        self.resize_timer_id = self.master.after(RESIZE_DEBOUNCE_MS, self._relayout_downloads_list)
+
+    def _relayout_downloads_list(self):
+        """
+        Adapts the list to its new size. Rows stretch with the list by themselves, so a width change only
+        re-fits the titles; only a height change adds or drops pooled rows.
+        """
+        self.resize_timer_id = None
+        width = self.downloads_list_frame.winfo_width()
+        height = self.downloads_list_frame.winfo_height()
+        old_width, old_height = self.list_size
+        self.list_size = (width, height)
+        if height != old_height:
+            self._render_visible_rows()
+        elif width != old_width:
+            for row in self.row_pool:
+                row.render_title()
+
+    def _render_visible_rows(self):
+        """Binds the pooled rows to the items currently in view, adding or dropping rows to fit the height."""
+        height = self.downloads_list_frame.winfo_height()
+        slots = max(1, height // ROW_HEIGHT + 1)  # One extra for a partly visible row at the bottom
+        while len(self.row_pool) < slots:
+            self.row_pool.append(DownloadRow(self, self.downloads_list_frame))
+        while len(self.row_pool) > slots:
+            self.row_pool.pop().destroy()
+
+        rows_in_view = max(1, height // ROW_HEIGHT)
+        max_offset = max(0, len(self.display_items) - rows_in_view)
+        self.list_offset = max(0, min(self.list_offset, max_offset))
+        for slot, row in enumerate(self.row_pool):
+            index = self.list_offset + slot
+            row.show(self.display_items[index] if index < len(self.display_items) else None, slot)
+        if self.display_items:
+            total = len(self.display_items)
+            self.downloads_scroll_y.set(self.list_offset / total, min(1.0, (self.list_offset + rows_in_view) / total))
+        else:
+            self.downloads_scroll_y.set(0, 1)
+
+    def get_name_column_width(self):
+        """Pixel width available for a title in the name column."""
+        total_frame_width = self.downloads_list_frame.winfo_width()
+        if total_frame_width <= 1:
+            total_frame_width = 900
+        return max(10, int(total_frame_width * 4 / 10) - 30)
+
+    def fit_title(self, display_name_full):
+        """Truncates a title with '...' so it fits the name column. Results are cached per title and width."""
+        name_column_pixel_width = self.get_name_column_width()
+        cache_key = (display_name_full, name_column_pixel_width)
+        display_name_final = self.title_fit_cache.get(cache_key)
+        if display_name_final is not None:
+            self.title_fit_cache.move_to_end(cache_key)
+            return display_name_final
+
+        display_name_final = display_name_full
+        if self.title_font.measure(display_name_full) > name_column_pixel_width:
+            # Binary search for the longest prefix that still fits with the ellipsis
+            low, high = 0, len(display_name_full) - 1
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self.title_font.measure(display_name_full[:mid] + "...") <= name_column_pixel_width:
+                    low = mid
+                else:
+                    high = mid - 1
+            display_name_final = display_name_full[:low] + "..."
+
+        self.title_fit_cache[cache_key] = display_name_final
+        if len(self.title_fit_cache) > TITLE_FIT_CACHE_SIZE:
+            self.title_fit_cache.popitem(last=False)
+        return display_name_final
 
     def _initialize_download_management(self):
-        self.queued_downloads = []
+        self.queued_downloads = ReadyQueue(self.settings['scheduling_policy'], self._get_start_pool)
         self.active_downloads = []
         self.download_items_map = {}
         self.download_item_counter = 0
@@ -1744,12 +3840,22 @@ For more information, visit the project repository or check the README file.
         self.is_queue_processing_active = False
         self.all_downloads_completed = threading.Event()
         self.alert_on_completion_for_session = False
+        self.playlist_expansions = {}  # expansion_id -> state of a playlist being loaded page by page
+        self.probed_url = None  # URL whose real formats are currently listed in the quality menu
+        self.probed_format_selectors = {}  # quality menu label -> exact yt-dlp format selector
+        self.download_archive = DownloadArchive(ARCHIVE_FILE)
+        self.queued_archive_keys = {}  # archive key -> queued/active item, to catch duplicates within the queue
+        self.pending_retries = set()  # Failed items waiting out their backoff outside the queue
+        self.queue_journal = QueueJournal(QUEUE_JOURNAL_FILE)
+        self.scheduling_lock = threading.Lock()
+        self.scheduling_pass_pending = False  # Coalesces scheduling requests until the next pass runs
+        self.pool_members = {pool: set() for pool in RESOURCE_POOLS}  # Running items by resource pool
+        self.host_last_start = {}  # host -> time the last download from it started
+        self.host_wait_timer_id = None  # Pass scheduled for when a host's start spacing has passed
+        self.playlist_expansion_counter = 0
 
     def _configure_yt_dlp_path(self):
-        if hasattr(sys, '_MEIPASS'):
-            self.yt_dlp_path = os.path.join(sys._MEIPASS, 'yt-dlp.exe')
-        else:
-            self.yt_dlp_path = 'yt-dlp.exe'
+        self.yt_dlp_path = get_yt_dlp_path()
 
     def on_source_change(self, value):
         """Adjusts UI based on selected source (Default, XtremeStream, or Local)."""
@@ -1764,10 +3870,7 @@ For more information, visit the project repository or check the README file.
             self.url_label.grid(row=current_row_idx, column=0, sticky="w", padx=5, pady=2)
             self.url_entry.grid(row=current_row_idx, column=1, sticky="ew", padx=5, pady=2)
             current_row_idx += 1
-            self._update_quality_options_grouped(
-                [("Auto (Best available)", "Auto (Best available)")], [], [], [],
-                [("1080", "High Quality - 1080p")], [("720", "Medium Quality - 720p")], [("480", "Low Quality - 480p")]
-            )
+            self._reset_quality_options(DEFAULT_SOURCE)
             self.quality_label.grid(row=current_row_idx, column=0, sticky="w", padx=5, pady=2)
             self.quality_menu.grid(row=current_row_idx, column=1, sticky="ew", padx=5, pady=2)
             self.url_entry.bind("<Return>", self._add_to_queue_on_enter)
@@ -1783,8 +3886,7 @@ For more information, visit the project repository or check the README file.
             current_row_idx += 1
             self.url_label.grid(row=current_row_idx, column=0, sticky="w", padx=5, pady=2)
             self.url_entry.grid(row=current_row_idx, column=1, sticky="ew", padx=5, pady=2)
-            self._update_quality_options_grouped([("Auto (Best available)", "Auto (Best available)")], [], [], [], [],
-                                                 [], [])
+            self._reset_quality_options(XTREAM_SOURCE)
             self.quality_label.grid(row=current_row_idx + 1, column=0, sticky="w", padx=5, pady=2)
             self.quality_menu.grid(row=current_row_idx + 1, column=1, sticky="ew", padx=5, pady=2)
             self.url_entry.bind("<Return>", self._add_to_queue_on_enter)
@@ -1909,6 +4011,7 @@ For more information, visit the project repository or check the README file.
         filename_provided_by_user = bool(filename_for_item_data)
         mp3_conversion = self.mp3_var.get()
         referer = ""
+        format_id = ''
         video_title = 'Fetching Title...'
 
         if source == LOCAL_SOURCE:
@@ -1947,67 +4050,498 @@ For more information, visit the project repository or check the README file.
             else:
                 quality = self.quality_var.get()
                 referer = self.referer_entry.get().strip() if source == XTREAM_SOURCE else ""
+                if source_path == self.probed_url:
+                    format_id = self.probed_format_selectors.get(quality, '')
+
+            # Playlists and channels are expanded into one queue item per video. A video opened from a
+            # playlist is queued on its own unless the user asks for the whole playlist.
+            if source == DEFAULT_SOURCE and self.settings['expand_playlists'] and (
+                    is_playlist_url(source_path) or is_video_in_playlist_url(source_path) and messagebox.askyesno(
+                    "Video in a Playlist", "This link opens a video inside a playlist.\n\n"
+                                           "Queue the whole playlist instead of only this video?")):
+                template_data = {
+                    'quality': quality, 'filename': filename_for_item_data, 'mp3_conversion': mp3_conversion,
+                    'source': source, 'referer': referer, 'filename_provided_by_user': filename_provided_by_user
+                }
+                self._start_playlist_expansion(source_path, template_data)
+                self._reset_input_fields()
+                self.alert_on_completion_for_session = True
+                return
+
+        job_data = {
+            'source_path': source_path, 'quality': quality, 'format_id': format_id,
+            'filename': filename_for_item_data, 'mp3_conversion': mp3_conversion, 'source': source,
+            'referer': referer, 'video_title': video_title, 'filename_provided_by_user': filename_provided_by_user
+        }
+        if self._queue_new_item(job_data, interactive=True):
+            self.alert_on_completion_for_session = True
+        self._reset_input_fields()
 
-        self.download_item_counter += 1
-        item_id = self.download_item_counter
+    def _queue_new_item(self, job_data, interactive):
+        """
+        Queues a new job unless it is a duplicate, see _resolve_duplicate. job_data holds the job fields of a
+        history entry (source_path, quality, filename...); id, status and dates are filled in here.
+        Returns the new item, or None if nothing was queued.
+        """
+        source_path = job_data['source_path']
+        info = get_cached_info_json(source_path, job_data['referer'] or None) \
+            if job_data['source'] != LOCAL_SOURCE else None
+        content_id = build_content_id(info) if info else ''
 
-        item_data = {
-            'id': item_id, 'source_path': source_path, 'quality': quality, 'filename': filename_for_item_data,
-            'mp3_conversion': mp3_conversion, 'source': source, 'referer': referer, 'video_title': video_title,
-            'status': 'queued', 'date_added': time.strftime("%m/%d/%y"),
-            'filename_provided_by_user': filename_provided_by_user,
-            'elapsed_time_seconds': 0
-        }
+        item_data = dict(job_data, id=self.download_item_counter + 1, content_id=content_id, status='queued',
+                         date_added=time.strftime("%m/%d/%y"), elapsed_time_seconds=0)
+        if not self._resolve_duplicate(item_data, interactive):
+            return None
 
+        self.download_item_counter += 1
         new_item = DownloadItem(self, item_data, is_active_item=True)
+        self._register_queued_item(new_item)
         self.queued_downloads.append(new_item)
-        self.download_items_map[item_id] = new_item
+        self.download_items_map[new_item.item_id] = new_item
         self.total_downloads_added += 1
-        self._refresh_display_order()
+        self._add_display_item(new_item)
+        self.update_queue_positions()
         self._set_status(f"Added '{source_path}' to queue.", COLOR_STATUS_READY)
+        self.request_scheduling_pass()
+        return new_item
+
+    def get_job_state(self, item):
+        """An item as the control API reports it."""
+        priority_names = {value: name for name, value in PRIORITY_LEVELS.items()}
+        state = {
+            'id': item.item_id, 'url': item.source_path, 'source': item.source, 'title': item.video_title,
+            'status': item.status, 'active': item.is_active_item,
+            'queue_position': self.get_queue_position_text(item) or None,
+            'priority': priority_names.get(item.priority, item.priority),
+            'progress': round(item.progress_value, 1),
+            'elapsed': item.elapsed_text if item.is_active_item else
+            item._format_seconds_to_dd_hh_mm_ss(item.elapsed_time_seconds),
+            'quality': item.quality, 'mp3': item.mp3_conversion, 'date_added': item.date_added,
+            'date_completed': item.date_completed, 'failure_class': item.failure_class or None, 'file': None
+        }
+        if item.status == 'completed':
+            state['file'] = item.get_output_path()
+        return state
+
+    def get_api_jobs(self, active_only):
+        """Control API: every job, or only the queued and running ones, oldest first."""
+        items = sorted((item for item in self.download_items_map.values() if item.is_active_item or not active_only),
+                       key=lambda item: item.item_id)
+        return 200, {'jobs': [self.get_job_state(item) for item in items]}
+
+    def get_api_job(self, item_id):
+        item = self.download_items_map.get(item_id)
+        if item is None:
+            return 404, {'error': f'No job {item_id}'}
+        return 200, self.get_job_state(item)
+
+    def submit_api_jobs(self, request):
+        """
+        Control API: queues {"url": ...} or {"urls": [...]}. Optional fields are "source", "quality", "format"
+        (an exact yt-dlp format selector), "filename" (single URL only), "mp3", "referer", "priority" and
+        "playlist" (true: a watch?v=...&list=... link queues its whole playlist instead of the one video).
+        Jobs go through the same duplicate checks and playlist expansion as the Add to Queue button.
+        """
+        if not isinstance(request, dict):
+            return 400, {'error': 'Expected a JSON object'}
+        urls = request['urls'] if 'urls' in request else [request.get('url')]
+        if not isinstance(urls, list) or not urls or not all(
+                isinstance(url, str) and url.strip().startswith(("http://", "https://")) for url in urls):
+            return 400, {'error': 'Give "url" or "urls"; URLs must start with http:// or https://'}
+        source = request.get('source', DEFAULT_SOURCE)
+        url_sources = [DEFAULT_SOURCE, XTREAM_SOURCE, TS_STREAM_SOURCE]
+        if source not in url_sources:
+            return 400, {'error': f'"source" must be one of {url_sources}'}
+        quality_choices = [label for group in self._get_quality_presets(source) for _, label in group]
+        quality = request.get('quality') or (self.settings['default_default_quality'] if source == DEFAULT_SOURCE
+                                             else quality_choices[0])
+        if source != TS_STREAM_SOURCE and quality not in quality_choices:
+            return 400, {'error': f'"quality" must be one of {quality_choices}'}
+        priority = request.get('priority', "Normal")
+        if priority not in PRIORITY_LEVELS:
+            return 400, {'error': f'"priority" must be one of {list(PRIORITY_LEVELS)}'}
+        filename = str(request.get('filename') or '').strip()
+        if filename and len(urls) > 1:
+            return 400, {'error': '"filename" can only be given with a single URL'}
+
+        results = []
+        for url in urls:
+            url = url.strip()
+            item_source = TS_STREAM_SOURCE if source == DEFAULT_SOURCE and is_ts_url(url) else source
+            is_ts = item_source == TS_STREAM_SOURCE
+            job_data = {
+                'source_path': url, 'quality': "N/A" if is_ts else quality,
+                'format_id': '' if is_ts else str(request.get('format') or ''), 'filename': filename,
+                'mp3_conversion': bool(request.get('mp3')) and not is_ts, 'source': item_source,
+                'referer': str(request.get('referer') or '').strip() if item_source != DEFAULT_SOURCE else '',
+                'video_title': 'Fetching Title...', 'filename_provided_by_user': bool(filename),
+                'priority': PRIORITY_LEVELS[priority]
+            }
+            if item_source == DEFAULT_SOURCE and self.settings['expand_playlists'] and (
+                    is_playlist_url(url) or request.get('playlist') is True and is_video_in_playlist_url(url)):
+                template_data = {key: job_data[key] for key in ('quality', 'filename', 'mp3_conversion', 'source',
+                                                                'referer', 'filename_provided_by_user')}
+                self._start_playlist_expansion(url, template_data)
+                results.append({'url': url, 'result': 'expanding playlist'})
+                continue
+            item = self._queue_new_item(job_data, interactive=False)
+            if item is None:
+                results.append({'url': url, 'result': 'skipped', 'reason': 'already queued or downloaded'})
+            else:
+                results.append(dict(self.get_job_state(item), result='queued'))
+        queued = any(result['result'] != 'skipped' for result in results)
+        return (201 if queued else 200), {'jobs': results}
+
+    def cancel_api_job(self, item_id):
+        """Control API: aborts a queued, running or retrying job, like its Abort button."""
+        item = self.download_items_map.get(item_id)
+        if item is None:
+            return 404, {'error': f'No job {item_id}'}
+        if not item.is_active_item:
+            return 409, {'error': f'Job {item_id} has already finished ({item.status})'}
+        item.abort_download()
+        return 200, self.get_job_state(item)
+
+    def retry_api_job(self, item_id):
+        """Control API: queues a failed or aborted job again, like its Retry button."""
+        item = self.download_items_map.get(item_id)
+        if item is None:
+            return 404, {'error': f'No job {item_id}'}
+        if item.is_active_item or item.status not in RESUMABLE_STATUSES:
+            return 409, {'error': f'Only failed or aborted jobs can be retried; job {item_id} is {item.status}'}
+        item.retry_download()
+        return 200, self.get_job_state(item)
+
+    def _resolve_duplicate(self, item_data, interactive):
+        """
+        Checks the download archive and the current queue for an identical job.
+        Returns True if the item should be queued; False if it was skipped or relinked.
+        """
+        if item_data['source'] == LOCAL_SOURCE:
+            return True
+        keys = build_archive_keys(item_data['source_path'], item_data.get('content_id'),
+                                  item_data['mp3_conversion'], item_data.get('format_id'), item_data['quality'])
+        queued_item = next((self.queued_archive_keys[key] for key in keys if key in self.queued_archive_keys), None)
+        if queued_item:
+            if interactive:
+                messagebox.showinfo("Already Queued", f"'{queued_item.video_title}' is already in the queue.")
+            return False
+
+        entry = self.download_archive.lookup(keys)
+        if not entry:
+            return True
+        action = self.settings['duplicate_action']
+        if action == "Download again":
+            return True
+        if action == "Skip":
+            if interactive and messagebox.askyesno(
+                    "Already Downloaded", f"'{entry.get('title', item_data['source_path'])}' was already downloaded to:"
+                                          f"\n{entry['file']}\n\nDownload it again anyway?"):
+                return True
+            self._set_status(f"Skipped already downloaded '{entry.get('title', item_data['source_path'])}'.",
+                             COLOR_STATUS_READY)
+            return False
+        self._relink_archived_file(item_data, entry)
+        return False
+
+    def _relink_archived_file(self, item_data, entry):
+        """Adds a completed history entry pointing at an existing output instead of downloading again."""
+        self.download_item_counter += 1
+        relinked_data = dict(item_data, id=self.download_item_counter, filename=entry['filename'],
+                             output_file=entry['file'],
+                             video_title=entry.get('title') or item_data['video_title'], status='completed',
+                             date_completed=time.strftime("%m/%d/%y"), filename_provided_by_user=True)
+        relinked_item = DownloadItem(self, relinked_data, is_active_item=False)
+        self.download_items_map[relinked_data['id']] = relinked_item
+        self._save_downloads_to_local_history()
+        self._add_display_item(relinked_item)
+        self._set_status(f"Linked existing file for '{relinked_data['video_title']}'.", COLOR_STATUS_COMPLETE)
 
+    def _register_queued_item(self, item):
+        """
+        Remembers a queued item's archive keys so the same job cannot be queued twice,
+        and journals the item so it survives a restart.
+        """
+        for key in item.get_archive_keys():
+            self.queued_archive_keys[key] = item
+        self.journal_queued_item(item)
+
+    def reregister_queued_item(self, item):
+        """Called on the Tk thread once a title fetch learned the item's content ID, which adds its ID key."""
+        if item.is_active_item and item.item_id in self.download_items_map:
+            self._register_queued_item(item)
+
+    def _unregister_queued_item(self, item):
+        for key in item.get_archive_keys():
+            if self.queued_archive_keys.get(key) is item:
+                del self.queued_archive_keys[key]
+        self.queue_journal.delete(item.item_id)
+
+    def journal_queued_item(self, item):
+        """Writes the current state of a queued/active item (title, filename, priority...) to the journal."""
+        self.queue_journal.put(self._get_journal_record(item))
+
+    def _get_journal_record(self, item):
+        """
+        Item data plus its place in the queue, so manual reordering survives a restart, and the size
+        estimate and enqueue time that shortest-first ordering ages items by.
+        """
+        return dict(self._get_item_data_for_history(item), priority=item.priority, queue_seq=item.queue_seq,
+                    queue_pinned=item.queue_pinned, estimated_size_mb=item.estimated_size_mb,
+                    queue_enqueue_time=item.queue_enqueue_time)
+
+    def _restore_queue_from_journal(self):
+        """
+        Puts the items that were queued or running when the app last closed (or crashed) back in the queue.
+        Interrupted downloads resume from their kept temp files; playlists are not expanded any further.
+        Items are queued again in their saved order, including manual moves, and the journal is rewritten
+        with the places they got in this session.
+        """
+        restored_items = []
+        # Records from before queue places were journaled have no queue_seq; the stable sort keeps their order
+        saved_order = sorted(self.queue_journal.items.values(),
+                             key=lambda item_data: (-item_data.get('priority', PRIORITY_LEVELS["Normal"]),
+                                                    item_data.get('queue_seq', 0)))
+        for item_data in saved_order:
+            existing = self.download_items_map.get(item_data['id'])
+            if existing and existing.status == 'completed':
+                continue  # Finished right before the journal caught up
+            item_data = dict(item_data, status='queued', date_completed='N/A')
+            item = DownloadItem(self, item_data, is_active_item=True)
+            self.download_items_map[item.item_id] = item
+            self.download_item_counter = max(self.download_item_counter, item.item_id)
+            for key in item.get_archive_keys():
+                self.queued_archive_keys[key] = item
+            self.queued_downloads.append(item, enqueue_time=item_data.get('queue_enqueue_time'))
+            if item_data.get('queue_pinned'):
+                item.queue_pinned = True  # Keeps its place when shortest-first ordering re-sorts the queue
+            restored_items.append(item)
+        self.queue_journal.replace_all([self._get_journal_record(item) for item in restored_items])
+        restored = len(restored_items)
+        if restored:
+            self.total_downloads_added += restored
+            self._refresh_display_order()
+            self._set_status(f"Restored {restored} unfinished tasks from the last session.", COLOR_STATUS_READY)
+            self.request_scheduling_pass()
+
+    def _reset_input_fields(self):
+        """Clears the input form after an item has been queued."""
         self.url_entry.delete(0, END);
         self.filename_entry.delete(0, END);
         self.mp3_var.set(False)
         self.referer_entry.delete(0, END);
         self.local_filepath_label.config(text="No file selected");
         self.selected_local_filepath = None
+        if self.probed_url:
+            self._reset_quality_options(self.source_var.get())
         self.url_entry.focus_set()
-        self.alert_on_completion_for_session = True
+
+    def _start_playlist_expansion(self, playlist_url, template_data):
+        """Registers a playlist/channel URL for lazy expansion and requests its first page."""
+        self.playlist_expansion_counter += 1
+        expansion = {
+            'id': self.playlist_expansion_counter, 'url': playlist_url, 'template': template_data,
+            'next_start': 1, 'exhausted': False, 'fetching': False, 'outstanding': set(), 'added': 0, 'skipped': 0,
+            'total': None  # Entry count, once yt-dlp reports it
+        }
+        self.playlist_expansions[expansion['id']] = expansion
+        self._set_status(f"Expanding playlist '{playlist_url}'...", COLOR_STATUS_PROGRESS)
+        self._fetch_next_playlist_page(expansion)
+
+    def _fetch_next_playlist_page(self, expansion):
+        """Fetches the next page of a playlist in a background thread."""
+        if expansion['fetching'] or expansion['exhausted']:
+            return
+        expansion['fetching'] = True
+        page_size = max(1, int(self.settings['playlist_page_size']))
+        start = expansion['next_start']
+
+        def _fetch():
+            try:
+                entries = fetch_flat_playlist_page(self.yt_dlp_path, expansion['url'], start, page_size,
+                                                   expansion['template']['referer'] or None)
+                error = None
+            except FileNotFoundError:
+                entries, error = [], "yt-dlp.exe not found."
+            except Exception as e:
+                entries, error = [], str(e)
+            self.ui_bus.post_call(lambda: self._on_playlist_page_loaded(expansion, entries, page_size, error))
+
+        threading.Thread(target=_fetch, daemon=True).start()
+
+    def _on_playlist_page_loaded(self, expansion, entries, page_size, error):
+        """Turns one page of flat playlist entries into individual queue items."""
+        expansion['fetching'] = False
+        if expansion['id'] not in self.playlist_expansions:
+            return  # Expansion was cancelled (e.g. queue cleared) while the page was loading
+        expansion['next_start'] += page_size
+        # A short page is not the end: --ignore-errors drops removed/private videos from the middle of a list
+        expansion['total'] = next((entry['playlist_count'] for entry in entries
+                                   if isinstance(entry.get('playlist_count'), int)), expansion['total'])
+        if error or not entries or (expansion['total'] is not None and expansion['next_start'] > expansion['total']):
+            expansion['exhausted'] = True
+        if error:
+            print(f"Error expanding playlist {expansion['url']}: {error}")
+            if expansion['added'] == 0:
+                self._set_status(f"Could not expand playlist: {error}", COLOR_STATUS_FAILED)
+
+        template = expansion['template']
+        new_items = []
+        for entry in entries:
+            entry_url = entry.get('webpage_url') or entry.get('url') or ''
+            if not entry_url.startswith(("http://", "https://")):
+                continue
+            # Channels list their tabs (Videos, Shorts, ...) as nested playlists
+            if entry.get('_type') == 'playlist' or str(entry.get('ie_key', '')).endswith('Tab') or is_playlist_url(
+                    entry_url):
+                if entry_url != expansion['url']:
+                    self._start_playlist_expansion(entry_url, template)
+                continue
+
+            expansion['added'] += 1
+            entry_title = entry.get('title') or 'Fetching Title...'
+            if template['filename_provided_by_user']:
+                entry_filename = f"{template['filename']}_{expansion['added']:04d}"
+            elif entry_title != 'Fetching Title...':
+                entry_filename = sanitize_filename(entry_title) or f"VideoPlayback_{self.download_item_counter + 1}"
+            else:
+                entry_filename = ''
+
+            content_id = build_content_id(entry)
+            item_data = {
+                'id': self.download_item_counter + 1, 'source_path': entry_url, 'quality': template['quality'],
+                'content_id': content_id, 'filename': entry_filename, 'mp3_conversion': template['mp3_conversion'],
+                'source': template['source'], 'referer': template['referer'], 'video_title': entry_title,
+                'status': 'queued', 'date_added': time.strftime("%m/%d/%y"),
+                'filename_provided_by_user': bool(entry_filename), 'elapsed_time_seconds': 0
+            }
+            if not self._resolve_duplicate(item_data, interactive=False):
+                expansion['skipped'] += 1
+                continue
+            self.download_item_counter += 1
+            new_item = DownloadItem(self, item_data, is_active_item=True)
+            new_item.playlist_expansion_id = expansion['id']
+            self._register_queued_item(new_item)
+            expansion['outstanding'].add(new_item.item_id)
+            self.queued_downloads.append(new_item)
+            self.download_items_map[new_item.item_id] = new_item
+            new_items.append(new_item)
+
+        if new_items:
+            self.total_downloads_added += len(new_items)
+            self._add_display_items(new_items)  # One redraw per page, not per entry
+            self.update_queue_positions()
+            self.request_scheduling_pass()
+        state = "all entries loaded" if expansion['exhausted'] else "loading more as the queue drains"
+        skipped = f", {expansion['skipped']} already downloaded" if expansion['skipped'] else ""
+        self._set_status(f"Queued {expansion['added'] - expansion['skipped']} items from playlist{skipped} ({state}).",
+                         COLOR_STATUS_READY)
+        if expansion['exhausted'] and not expansion['outstanding']:
+            self.playlist_expansions.pop(expansion['id'], None)
+        elif len(expansion['outstanding']) <= page_size // 2:
+            self._fetch_next_playlist_page(expansion)  # Page was mostly duplicates or nested tabs
+
+    def _on_playlist_item_dequeued(self, item):
+        """Loads the next playlist page once the queued entries of that playlist run low."""
+        expansion = self.playlist_expansions.get(getattr(item, 'playlist_expansion_id', None))
+        if not expansion:
+            return
+        expansion['outstanding'].discard(item.item_id)
+        if expansion['exhausted']:
+            if not expansion['outstanding'] and not expansion['fetching']:
+                self.playlist_expansions.pop(expansion['id'], None)
+        elif len(expansion['outstanding']) <= max(1, int(self.settings['playlist_page_size'])) // 2:
+            self._fetch_next_playlist_page(expansion)
+
+    def reorder_queued_item(self, item, direction):
+        """Moves a queued item to the top, or one place up or down."""
+        if direction == 'top':
+            self.queued_downloads.move_to_top(item)
+        else:
+            other = self.queued_downloads.move(item, -1 if direction == 'up' else 1)
+            if other is not None:
+                self.journal_queued_item(other)
+        self.journal_queued_item(item)
+        self.update_queue_positions()
+
+    def set_item_priority(self, item, priority):
+        self.queued_downloads.set_priority(item, priority)
+        self.journal_queued_item(item)
+        self.update_queue_positions()
+
+    def remove_from_queue(self, item):
+        """Removes an item that has not started yet from the queue and the list."""
+        self.queued_downloads.remove(item)
+        self.download_items_map.pop(item.item_id, None)
+        self._unregister_queued_item(item)
+        self._on_playlist_item_dequeued(item)
+        self._remove_display_item(item)
+        self.update_queue_positions()
+        self._set_status(f"Removed '{item.video_title}' from queue.", COLOR_STATUS_READY)
 
     def _add_to_queue_on_enter(self, event=None):
         """Handles adding to queue when Enter is pressed in URL entry."""
         if self.source_var.get() != LOCAL_SOURCE: self._add_current_to_queue()
 
     def _on_url_focus_out(self, event=None):
-        """Attempts to pre-fill filename based on URL if not provided by user and source is Default/XtremeStream."""
-        if self.source_var.get() == LOCAL_SOURCE: return
+        """Probes the URL in the background to pre-fill the filename and list its real formats (Default/XtremeStream)."""
+        source = self.source_var.get()
+        if source in (LOCAL_SOURCE, TS_STREAM_SOURCE): return
         url = self.url_entry.get().strip()
-        if url and not self.filename_entry.get().strip():
-            temp_item_data = {
-                'id': -1, 'source_path': url, 'quality': self.quality_var.get(), 'filename': '',
-                'mp3_conversion': self.mp3_var.get(), 'source': self.source_var.get(),
-                'referer': self.referer_entry.get().strip(),
-                'video_title': 'Fetching Title...', 'status': 'temp_fetching', 'date_added': 'N/A',
-                'filename_provided_by_user': False, 'elapsed_time_seconds': 0
-            }
-            temp_item = DownloadItem(self, temp_item_data, is_active_item=True)
-
-            def _update_filename_after_fetch():
-                if not self.filename_entry.get().strip():
-                    if temp_item.is_title_fetched and temp_item.video_title not in ['Unknown Title',
-                                                                                    'Fetching Title...']:
-                        sanitized_title = re.sub(r'[\\/:*?"<>|]', '', temp_item.video_title)
-                        self.filename_entry.delete(0, END)
-                        preview_filename = sanitized_title[:60] if len(sanitized_title) > 60 else sanitized_title
-                        self.filename_entry.insert(0, preview_filename)
-                    else:
-                        self.filename_entry.delete(0, END)
-                        self.filename_entry.insert(0, f"VideoPlayback_Preview")
+        if not url.startswith(("http://", "https://")) or is_ts_url(url) or url == self.probed_url:
+            return
+        if source == DEFAULT_SOURCE and self.settings['expand_playlists'] and is_playlist_url(url):
+            return  # Playlist entries get their own titles when the playlist is expanded
+        referer = self.referer_entry.get().strip() if source == XTREAM_SOURCE else None
+
+        def _probe():
+            try:
+                info = fetch_info_json(self.yt_dlp_path, url, referer or None)
+            except Exception as e:
+                print(f"Error probing formats for URL {url}: {e}")
+                info = None
+            self.ui_bus.post_call(lambda: self._on_url_probed(url, source, info))
+
+        threading.Thread(target=_probe, daemon=True).start()
+
+    def _on_url_probed(self, url, source, info):
+        """Fills the filename preview and the quality menu from a probed info dict."""
+        if self.url_entry.get().strip() != url or self.source_var.get() != source:
+            return  # Input changed while probing; the result no longer applies
+        if not self.filename_entry.get().strip():
+            self.filename_entry.delete(0, END)
+            if info and info.get('title'):
+                self.filename_entry.insert(0, sanitize_filename(info['title'])[:60])
+            else:
+                self.filename_entry.insert(0, "VideoPlayback_Preview")
+        if not info:
+            return
 
-            threading.Thread(
-                target=lambda: (temp_item.fetch_title_async(), self.master.after(500, _update_filename_after_fetch)),
-                daemon=True).start()
+        combined, audio_only, video_only = build_format_choices(info)
+        self.probed_url = url
+        self.probed_format_selectors = dict(combined + audio_only + video_only)
+        presets = self._get_quality_presets(source)
+        self._update_quality_options_grouped(presets[0], combined, audio_only, video_only, *presets[1:])
+        self._set_status(f"Found {len(self.probed_format_selectors)} formats for '{info.get('title', url)}'.",
+                         COLOR_STATUS_READY)
+
+    def _get_quality_presets(self, source):
+        """Returns the built-in quality choices (auto, high, medium, low groups) for a source."""
+        auto = [("Auto (Best available)", "Auto (Best available)")]
+        if source == DEFAULT_SOURCE:
+            return (auto, [("1080", "High Quality - 1080p")], [("720", "Medium Quality - 720p")],
+                    [("480", "Low Quality - 480p")])
+        return auto, [], [], []
+
+    def _reset_quality_options(self, source):
+        """Drops probed formats from the quality menu and goes back to the built-in choices."""
+        was_probed_choice = self.quality_var.get() in self.probed_format_selectors
+        self.probed_url = None
+        self.probed_format_selectors = {}
+        presets = self._get_quality_presets(source)
+        self._update_quality_options_grouped(presets[0], [], [], [], *presets[1:])
+        if was_probed_choice:
+            self.quality_var.set(self.settings['default_default_quality'])
 
     def _update_quality_options_grouped(self, auto, combined_video_audio, combined_audio_only, video_only,
                                         high_quality_video, medium_quality_video, low_quality_video):
@@ -2015,23 +4549,27 @@ For more information, visit the project repository or check the README file.
         menu = self.quality_menu["menu"];
         menu.delete(0, "end")
 
+        labels = []
+
         def add_command(value):
             menu.add_command(label=value, command=tk._setit(self.quality_var, value))
+            labels.append(value)
 
         if auto:
             for text, val in auto: add_command(text)
             menu.add_separator()
+        # Probed groups hold (label, format selector) tuples
         if combined_video_audio:
             menu.add_command(label="--- Combined Video + Audio ---", state="disabled")
-            for res, text in combined_video_audio: add_command(f"{text} - {res}p")
+            for text, selector in combined_video_audio: add_command(text)
             menu.add_separator()
         if combined_audio_only:
-            menu.add_command(label="--- Combined Audio Only ---", state="disabled")
-            for res, text in combined_audio_only: add_command(f"{text} - {res}p")
+            menu.add_command(label="--- Audio Only ---", state="disabled")
+            for text, selector in combined_audio_only: add_command(text)
             menu.add_separator()
         if video_only:
-            menu.add_command(label="--- Video Only ---", state="disabled")
-            for res, text in video_only: add_command(f"{text}")
+            menu.add_command(label="--- Video Only (+ best audio) ---", state="disabled")
+            for text, selector in video_only: add_command(text)
             menu.add_separator()
         if high_quality_video:
             menu.add_command(label="--- High Quality Video ---", state="disabled")
@@ -2046,32 +4584,84 @@ For more information, visit the project repository or check the README file.
             for res, text in low_quality_video: add_command(f"{text}")
 
         # Ensure the selected value is still in the list of options, otherwise reset to default
-        if self.quality_var.get() not in [item[0] for item in
-                                          auto + combined_video_audio + combined_audio_only + video_only + high_quality_video + medium_quality_video + low_quality_video]:
+        if self.quality_var.get() not in labels:
             if auto:
                 self.quality_var.set(auto[0][0])
             else:
                 self.quality_var.set("Auto (Best available)")
 
-    def _process_queue_loop(self):
-        """Manages the download queue, starting new downloads as slots become free."""
-        active_count = len(self.active_downloads)
-        # Use max_concurrent_downloads from settings
-        max_concurrent = self.settings['max_concurrent_downloads']
+    def request_scheduling_pass(self):
+        """
+        Asks for a scheduling pass on the Tk thread as soon as possible. Safe to call from worker threads;
+        requests made before the pass runs are coalesced into one.
+        """
+        with self.scheduling_lock:
+            if self.scheduling_pass_pending:
+                return
+            self.scheduling_pass_pending = True
+        if threading.current_thread() is threading.main_thread():
+            self.master.after(0, self._run_scheduling_pass)
+        else:
+            self.ui_bus.post_call(self._run_scheduling_pass)
+
+    def _scheduler_safety_net(self):
+        """Low-frequency pass in case an event was missed; scheduling is otherwise event driven."""
+        self.request_scheduling_pass()
+        self.master.after(SCHEDULER_SAFETY_NET_MS, self._scheduler_safety_net)
+
+    def _run_scheduling_pass(self):
+        """Starts queued items until every free download slot is taken, or reports that all tasks finished."""
+        with self.scheduling_lock:
+            self.scheduling_pass_pending = False
+
+        started = 0
+        self.queued_downloads.promote_ready()
+        with self.scheduling_lock:
+            network_items = list(self.pool_members['network'])
+        host_counts = {}
+        for item in network_items:
+            host_counts[item.host] = host_counts.get(item.host, 0) + 1
+        soonest_wait = []
+
+        def host_allowed(host):
+            # Sites at their limit are skipped, so slots go to items of other sites instead
+            if not host:
+                return True
+            max_concurrent, min_interval = self._get_host_limits(host)
+            if host_counts.get(host, 0) >= max_concurrent:
+                return False  # The next finishing download of this host requests a new pass
+            wait = self.host_last_start.get(host, 0) + min_interval - time.time()
+            if wait > 0:
+                soonest_wait.append(wait)
+                return False
+            return True
 
-        next_item_to_start = None
-        for i, item in enumerate(self.queued_downloads):
-            if item.ready_for_download:
-                next_item_to_start = self.queued_downloads.pop(i);
+        while True:
+            # A waiting conversion must not hold up downloads behind it, so full pools are skipped
+            fair_share = self.settings['scheduling_policy'] == "Fair share by site"
+            next_item_to_start = self.queued_downloads.pop_next(
+                self._pool_has_room, host_allowed, (lambda host: host_counts.get(host, 0)) if fair_share else None)
+            if not next_item_to_start:
                 break
-        if next_item_to_start and active_count < max_concurrent:  # Use max_concurrent
+            if next_item_to_start.host:
+                host_counts[next_item_to_start.host] = host_counts.get(next_item_to_start.host, 0) + 1
+                self.host_last_start[next_item_to_start.host] = time.time()
+            self._allocate_fragment_workers(next_item_to_start)
             self.active_downloads.append(next_item_to_start)
+            self._set_item_pool(next_item_to_start, self._get_start_pool(next_item_to_start))
+            self._on_playlist_item_dequeued(next_item_to_start)
             self._set_status(f"Starting {next_item_to_start.source} for {next_item_to_start.video_title}...",
                              COLOR_STATUS_PROGRESS)
             next_item_to_start.start_download()
+            started += 1
+        if soonest_wait and not self.host_wait_timer_id:
+            self.host_wait_timer_id = self.master.after(int(min(soonest_wait) * 1000) + 10, self._on_host_wait_over)
+        if started:
             self.is_queue_processing_active = True
             self.all_downloads_completed.clear()
-        elif not self.active_downloads and not self.queued_downloads and self.is_queue_processing_active:
+            self.update_queue_positions()  # Everyone behind the started items moved up
+        elif not self.active_downloads and not self.queued_downloads and not self.pending_retries \
+                and self.is_queue_processing_active:
             self.is_queue_processing_active = False
             self.all_downloads_completed.set()
             if self.alert_on_completion_for_session and self.total_downloads_added > 0:
@@ -2080,11 +4670,73 @@ For more information, visit the project repository or check the README file.
                 self.completed_downloads_count = 0;
                 self.total_downloads_added = 0
             self._set_status("All tasks finished. Ready.", COLOR_STATUS_COMPLETE)
-        self.master.after(1000, self._process_queue_loop)
+
+    def _on_host_wait_over(self):
+        self.host_wait_timer_id = None
+        self.request_scheduling_pass()
+
+    def _get_host_limits(self, host):
+        return lookup_host_limits(self.settings, host)
+
+    def _get_pool_limit(self, pool):
+        """Slots of a resource pool: network downloads, CPU encodes or disk-heavy merges."""
+        setting = {'network': 'max_concurrent_downloads', 'cpu': 'max_cpu_jobs', 'disk': 'max_merge_jobs'}[pool]
+        return max(1, int(self.settings[setting]))
+
+    def _pool_has_room(self, pool):
+        with self.scheduling_lock:
+            return len(self.pool_members[pool]) < self._get_pool_limit(pool)
+
+    def _get_start_pool(self, item):
+        """Pool an item needs a slot in before it can start; later phases move it (see move_item_to_pool)."""
+        return 'cpu' if item.is_local_conversion else 'network'
+
+    def _set_item_pool(self, item, pool):
+        """Moves an item into the given pool, or out of all pools for None."""
+        with self.scheduling_lock:
+            for members in self.pool_members.values():
+                members.discard(item)
+            if pool:
+                self.pool_members[pool].add(item)
+            item.resource_pool = pool
+
+    def move_item_to_pool(self, item, pool):
+        """
+        Called from worker threads when a running item changes phase. The running process can't wait for
+        a slot, so the new pool may briefly be over its limit; it then just takes no new items until it drains.
+        """
+        if item.resource_pool == pool or item not in self.active_downloads:
+            return
+        self._set_item_pool(item, pool)
+        self.request_scheduling_pass()  # The old pool has a free slot now
+
+    def _allocate_fragment_workers(self, item):
+        """
+        Shares the global fragment budget out to an item that is about to start.
+        A lone download gets up to the per-item maximum, many downloads each get fewer.
+        """
+        if item.is_local_conversion or item.is_ts_stream:
+            item.fragment_concurrency = 1
+            return
+        per_item = max(1, int(self.settings['fragments_per_item']))
+        budget = max(1, int(self.settings['fragment_budget']))
+        with self.scheduling_lock:
+            network_items = list(self.pool_members['network'])
+        fragment_users = [d for d in network_items if not d.is_local_conversion and not d.is_ts_stream]
+        waiting = self.queued_downloads.ready_count()  # Includes a few local/TS items; only an estimate
+        # Expect every free slot to be filled soon so early starters don't take the whole budget
+        expected_concurrent = min(int(self.settings['max_concurrent_downloads']),
+                                  len(fragment_users) + 1 + waiting)
+        fair_share = budget // max(1, expected_concurrent)
+        remaining = budget - sum(d.fragment_concurrency for d in fragment_users)
+        item.fragment_concurrency = max(1, min(per_item, fair_share, remaining))
 
     def download_finished(self, item, final_status):
         """Called by a DownloadItem when its process completes (success/fail/abort)."""
+        if final_status == "failed" and self._schedule_automatic_retry(item):
+            return
         if item in self.active_downloads: self.active_downloads.remove(item)
+        self._set_item_pool(item, None)
         item.status = final_status
         item.date_completed = time.strftime("%m/%d/%y")
         if item.start_time:
@@ -2092,38 +4744,111 @@ For more information, visit the project repository or check the README file.
         else:
             item.elapsed_time_seconds = 0
         item.is_active_item = False
+        self._unregister_queued_item(item)
+        if final_status == "completed":
+            item.output_file = item.get_output_path()  # Stays valid if the output folder setting changes later
         self._save_downloads_to_local_history()
         if final_status == "completed":
             self.completed_downloads_count += 1
+            if not item.is_local_conversion:
+                self.download_archive.record(item.get_archive_keys(), {
+                    'file': item.output_file, 'filename': item.filename, 'title': item.video_title,
+                    'date': time.strftime("%m/%d/%y")})
             self._set_status(f"Task for '{item.video_title}' completed!", COLOR_STATUS_COMPLETE)
         elif final_status == "aborted":
             self._set_status(f"Task for '{item.video_title}' aborted.", COLOR_STATUS_ABORTED)
         else:
             self._set_status(f"Task for '{item.video_title}' failed.", COLOR_STATUS_FAILED)
-        self._refresh_display_order()
+            if item.last_error_message:
+                error_msg, item.last_error_message = item.last_error_message, ''
+                self.master.after(0, lambda: messagebox.showerror("TS Download Error", error_msg))
+        self.update_display_item(item)
+        self.update_queue_positions()
+        self.request_scheduling_pass()  # Refill the freed slot right away
+
+    def _schedule_automatic_retry(self, item):
+        """
+        Classifies a failed item and, if its failure class allows another attempt, schedules it after a backoff.
+        Returns False when the failure is final. Depending on the class the item keeps its download slot
+        while waiting, or leaves it to other items and rejoins the queue afterwards.
+        """
+        item.failure_class = classify_failure(item.last_return_code, item.output_tail)
+        policy = RETRY_POLICIES[item.failure_class]
+        attempt = item.retry_attempts.get(item.failure_class, 0)
+        print(f"Failure of {item.source_path} classified as '{item.failure_class}' (attempt {attempt + 1}).")
+        if not self.settings['auto_retry'] or item.discard_temp_on_finish or attempt >= policy['max_attempts']:
+            return False
+        if item.failure_class == 'ffmpeg' and not item.can_retry_with_recode():
+            return False  # The same command would fail the same way
+        item.retry_attempts[item.failure_class] = attempt + 1
+        if item.failure_class == 'ffmpeg':
+            item.force_recode = True  # Stream copy failed, transcode on the next attempt
+        delay = compute_retry_delay(item.failure_class, attempt)
+        if not policy['hold_slot']:
+            if item in self.active_downloads: self.active_downloads.remove(item)
+            self._set_item_pool(item, None)
+            self.pending_retries.add(item)
+            self.request_scheduling_pass()
+        item.update_status(f"retry {attempt + 1}/{policy['max_attempts']} in {int(delay)}s ({item.failure_class})",
+                           COLOR_STATUS_READY)
+        item.last_error_message = ''
+        item.retry_timer_id = self.master.after(int(delay * 1000), lambda: self._run_automatic_retry(item))
+        item.set_abort_enabled(True)
+        self._set_status(f"'{item.video_title}' failed ({item.failure_class}), retrying in {int(delay)}s.",
+                         COLOR_STATUS_READY)
+        return True
+
+    def _run_automatic_retry(self, item):
+        """Starts the next attempt of an item whose backoff has elapsed."""
+        item.retry_timer_id = None
+        if item in self.pending_retries:
+            # Slot was released, so wait for a free one like any other queued item
+            self.pending_retries.discard(item)
+            item.update_status("queued", COLOR_STATUS_READY)
+            item.ready_for_download = True
+            self.queued_downloads.append(item)
+            self.update_display_item(item)
+            self.update_queue_positions()
+            self.request_scheduling_pass()
+        elif item in self.active_downloads:
+            # Still holds its slot and fragment share, but a failed merge may have left it in the disk pool
+            self._set_item_pool(item, self._get_start_pool(item))
+            item.start_download()
+
+    def cancel_automatic_retry(self, item):
+        """Aborts an item that is waiting for an automatic retry."""
+        if item.retry_timer_id:
+            self.master.after_cancel(item.retry_timer_id)
+            item.retry_timer_id = None
+        self.pending_retries.discard(item)
+        item.update_status("aborted", COLOR_STATUS_ABORTED)
+        self.download_finished(item, "aborted")
 
     def _remove_item_from_list_and_disk(self, item_obj, delete_file_from_disk):
         """
         Removes a download item from the application's list and optionally deletes its associated file.
         """
         if item_obj.is_active_item:
+            item_obj.discard_temp_on_finish = True  # Nothing left to resume once the item is gone
             item_obj.abort_download()  # Abort if active, which will then call download_finished and remove it.
             # The item will be removed from download_items_map and history saved by download_finished
         else:
             # If not active, remove directly from map and save history
             if item_obj.item_id in self.download_items_map:
                 self.download_items_map.pop(item_obj.item_id)
+                item_obj.discard_temp_dir()
+                item_obj.delete_log_files()
                 self._save_downloads_to_local_history()
-                self._refresh_display_order()
+                self._remove_display_item(item_obj)
+                self.update_queue_positions()
                 self._set_status(f"Removed '{item_obj.video_title}' from list.", COLOR_STATUS_READY)
 
         if delete_file_from_disk:
-            expected_ext = ".mp4" if item_obj.is_local_conversion else (".mp3" if item_obj.mp3_conversion else ".mp4")
-            downloads_dir = os.path.join(os.getcwd(), self.settings['output_directory'])
-            full_filepath = os.path.join(downloads_dir, item_obj.filename + expected_ext)
+            full_filepath = item_obj.get_output_path()
             if os.path.exists(full_filepath):
                 try:
                     os.remove(full_filepath)
+                    self.download_archive.forget(item_obj.get_archive_keys())
                     self._set_status(f"Removed '{item_obj.video_title}' and deleted file.", COLOR_STATUS_COMPLETE)
                 except Exception as e:
                     messagebox.showerror("File Deletion Error", f"Could not delete file '{item_obj.filename}': {e}")
@@ -2134,8 +4859,13 @@ For more information, visit the project repository or check the README file.
     def _clear_queue(self):
         """Clears all items from the active and queued downloads."""
         for item in self.active_downloads[:]: item.abort_download()
+        for item in list(self.pending_retries): item.abort_download()
+        self.playlist_expansions.clear()  # Stop loading further playlist pages
+        self.queued_archive_keys.clear()
+        self.queue_journal.clear()
         self.queued_downloads.clear();
         self.active_downloads.clear()
+        for pool in RESOURCE_POOLS: self.pool_members[pool].clear()
         ids_to_remove = [item.item_id for item in self.download_items_map.values() if item.is_active_item]
         for item_id in ids_to_remove: self.download_items_map.pop(item_id, None)
         self._refresh_display_order();
@@ -2147,68 +4877,121 @@ For more information, visit the project repository or check the README file.
         if messagebox.askyesno("Clear History",
                                "Are you sure you want to clear all task history? This will not delete the actual converted/downloaded files."):
             ids_to_remove = [item.item_id for item in self.download_items_map.values() if not item.is_active_item]
-            for item_id in ids_to_remove: self.download_items_map.pop(item_id, None)
+            for item_id in ids_to_remove:
+                removed_item = self.download_items_map.pop(item_id)
+                removed_item.discard_temp_dir()
+                removed_item.delete_log_files()
             self._save_downloads_to_local_history();
             self._refresh_display_order();
             self._set_status("Task history cleared.", COLOR_STATUS_READY)
 
-    def _refresh_display_order(self):
-        """Destroys and recreates all download item frames to ensure correct order and visibility (active vs. history)."""
-        self.downloads_canvas.update_idletasks();
-        self.downloads_frame_inner.update_idletasks()
-        for widget in self.downloads_frame_inner.winfo_children(): widget.destroy()
-
-        header_frame = tk.Frame(self.downloads_frame_inner, bg="#e0e0e0");
-        header_frame.pack(fill="x", padx=5, pady=(0, 2))
-        columns = [("Name", 0), ("Status", 1), ("Date Added", 2), ("Date Completed", 3), ("Time / ETA", 4),
-                   ("Action", 5)]
-        header_frame.columnconfigure(0, weight=4);
-        header_frame.columnconfigure(1, weight=2);
-        header_frame.columnconfigure(2, weight=1)
-        header_frame.columnconfigure(3, weight=1);
-        header_frame.columnconfigure(4, weight=1);
-        header_frame.columnconfigure(5, weight=1)
-        header_frame.columnconfigure(6, weight=1)  # Added for new 'Remove' column
-
-        for col_name, col_idx in columns:
-            lbl = tk.Label(header_frame, text=col_name, font=BOLD_FONT, bg="#e0e0e0", borderwidth=1, relief="ridge")
-            lbl.grid(row=0, column=col_idx, sticky="ew", padx=1, pady=0);
-            lbl.bind("<Button-1>", lambda e, idx=col_idx: self._on_header_click(idx))
+    def _display_sort_key(self, item):
+        """Key of an item under the current sort column."""
+        sort_col = getattr(self, '_current_sort_col', 2)
+        if sort_col == 0:
+            return (item.video_title or item.filename or "").lower()
+        elif sort_col == 1:
+            return item.status.lower()
+        elif sort_col == 2:
+            try:
+                return time.mktime(time.strptime(item.date_added, "%m/%d/%y"))
+            except Exception:
+                return 0
+        elif sort_col == 3:
+            try:
+                return time.mktime(time.strptime(item.date_completed, "%m/%d/%y"))
+            except Exception:
+                return 0
+        elif sort_col == 4:
+            return item.elapsed_time_seconds
+        else:
+            return 0
+
+    def _find_display_index(self, key):
+        """Binary search for where a key goes in the list; equal keys go after the ones already there."""
+        reverse = getattr(self, '_current_sort_reverse', True)
+        low, high = 0, len(self.display_items)
+        while low < high:
+            mid = (low + high) // 2
+            mid_key = self.display_items[mid].display_key
+            if (key > mid_key) if reverse else (key < mid_key):
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def _add_display_item(self, item):
+        """Files one new item into the sorted list without touching the other rows."""
+        self._add_display_items([item])
+
+    def _add_display_items(self, items):
+        """Files new items into the sorted list, then rebinds the rows in view once."""
+        for item in items:
+            item.display_key = self._display_sort_key(item)
+            self.display_items.insert(self._find_display_index(item.display_key), item)
+        self._render_visible_rows()
+
+    def _remove_display_item(self, item):
+        if item.display_key is None:
+            return
+        index = self._find_display_index(item.display_key) - 1
+        while index >= 0 and self.display_items[index] is not item and \
+                self.display_items[index].display_key == item.display_key:
+            index -= 1
+        if index < 0 or self.display_items[index] is not item:
+            index = self.display_items.index(item)
+        del self.display_items[index]
+        item.display_key = None
+        if item.row is not None:
+            item.row.show(None, 0)
+        self._render_visible_rows()
+
+    def update_display_item(self, item):
+        """
+        Redraws one item after its state changed. Only its own row is touched, unless the change moves
+        the item under the current sort order; then it is re-filed and the rows in view are rebound.
+        """
+        self._publish_job_updates([item])
+        if item.display_key is None or self.download_items_map.get(item.item_id) is not item:
+            return
+        key = self._display_sort_key(item)
+        if key != item.display_key:
+            self._remove_display_item(item)
+            self._add_display_item(item)
+        else:
+            item.refresh_row()
+
+    def get_queue_position_text(self, item):
+        """e.g. "Queued #3 (High)"; '' if the item is not queued. The queue caches its order between changes."""
+        position = self.queued_downloads.position(item)
+        if position is None:
+            return ''
+        if item.priority == PRIORITY_LEVELS["Normal"]:
+            return f"Queued #{position}"
+        priority_names = {value: name for name, value in PRIORITY_LEVELS.items()}
+        return f"Queued #{position} ({priority_names.get(item.priority, item.priority)})"
+
+    def update_queue_positions(self):
+        """Renumbers the "Queued #n" labels of the rows in view after the queue order changed."""
+        for row in self.row_pool:
+            if row.item is not None and row.item.status == "queued":
+                row.render()
 
-        sort_col = getattr(self, '_current_sort_col', 2);
+    def _refresh_display_order(self):
+        """
+        Re-sorts every item (active vs. history included) and redraws the rows that are in view.
+        Single changes go through _add_display_item, _remove_display_item and update_display_item instead.
+        """
         sort_reverse = getattr(self, '_current_sort_reverse', True)
+        for item_obj in self.display_items:
+            item_obj.display_key = None
         all_display_items = list(self.download_items_map.values())
-
-        def sort_key(item):
-            if sort_col == 0:
-                return (item.video_title or item.filename or "").lower()
-            elif sort_col == 1:
-                return item.status.lower()
-            elif sort_col == 2:
-                try:
-                    return time.mktime(time.strptime(item.date_added, "%m/%d/%y"))
-                except Exception:
-                    return 0
-            elif sort_col == 3:
-                try:
-                    return time.mktime(time.strptime(item.date_completed, "%m/%d/%y"))
-                except Exception:
-                    return 0
-            elif sort_col == 4:
-                return item.elapsed_time_seconds
-            else:
-                return 0
-
-        all_display_items.sort(key=sort_key, reverse=sort_reverse)
-
         for item_obj in all_display_items:
-            item_obj.parent_frame = self.downloads_frame_inner;
-            item_obj._build_frame_widgets()
-            item_obj.frame.pack(fill="x", padx=5, pady=3);
-            item_obj._update_title_label()
-            item_obj.update_status(item_obj.status, item_obj._get_status_color(item_obj.status))
-        self.downloads_frame_inner.update_idletasks();
-        self.downloads_canvas.configure(scrollregion=self.downloads_canvas.bbox("all"))
+            item_obj.display_key = self._display_sort_key(item_obj)
+        all_display_items.sort(key=lambda item_obj: item_obj.display_key, reverse=sort_reverse)
+        self.display_items = all_display_items
+        self.update_queue_positions()
+        self._render_visible_rows()
 
     def _on_header_click(self, col_idx):
         """Handles sorting when a header is clicked."""
@@ -2225,6 +5008,8 @@ For more information, visit the project repository or check the README file.
         """Prepares a dictionary of item data for saving to history."""
         return {
             'id': item_obj.item_id, 'source_path': item_obj.source_path, 'quality': item_obj.quality,
+            'format_id': item_obj.format_id, 'container_route': item_obj.container_route,
+            'content_id': item_obj.content_id, 'output_file': item_obj.output_file,
             'filename': item_obj.filename, 'mp3_conversion': item_obj.mp3_conversion, 'source': item_obj.source,
             'referer': item_obj.referer, 'video_title': item_obj.video_title, 'status': item_obj.status,
             'date_added': item_obj.date_added, 'date_completed': item_obj.date_completed,
@@ -2287,31 +5072,352 @@ For more information, visit the project repository or check the README file.
             self.download_item_counter = 0
 
     def _cleanup_temp_directories_on_launch(self):
-        """Cleans up any lingering temporary download directories from previous sessions upon application launch."""
+        """
+        Garbage collects temporary download directories from previous sessions upon application launch.
+        Partial downloads of failed/aborted items are kept so a retry can resume them, unless they are
+        older than 'temp_max_age_days' or, oldest first, push the total over 'temp_max_size_mb'.
+        """
         # Use output_directory from settings to find the temp folder
         downloads_base_path = os.path.join(os.getcwd(), self.settings['output_directory'])
         full_temp_dir_path = os.path.join(downloads_base_path, TEMP_SUBDIR)
 
-        if os.path.exists(full_temp_dir_path):
-            print(f"Checking for lingering temporary directories in: {full_temp_dir_path}")
-            for entry in os.listdir(full_temp_dir_path):
-                entry_path = os.path.join(full_temp_dir_path, entry)
-                if os.path.isdir(entry_path):
-                    try:
-                        print(f"Deleting lingering temporary directory: {entry_path}");
-                        shutil.rmtree(entry_path)
-                    except Exception as e:
-                        print(f"Error deleting lingering temporary directory {entry_path}: {e}")
-        else:
+        if not os.path.exists(full_temp_dir_path):
             print(f"Temporary directory not found: {full_temp_dir_path}. No cleanup needed.")
+            return
+
+        print(f"Checking for lingering temporary directories in: {full_temp_dir_path}")
+        resumable_ids = {str(item.item_id) for item in self.download_items_map.values()
+                         if item.status in RESUMABLE_STATUSES or item.is_active_item}
+        max_age_seconds = float(self.settings['temp_max_age_days']) * 86400
+        max_total_bytes = float(self.settings['temp_max_size_mb']) * 1024 * 1024
+        kept = []
+        for entry in os.listdir(full_temp_dir_path):
+            entry_path = os.path.join(full_temp_dir_path, entry)
+            if not os.path.isdir(entry_path) or entry == LOG_SUBDIR:
+                continue
+            size, last_modified = 0, os.path.getmtime(entry_path)
+            for root, _, files in os.walk(entry_path):
+                for name in files:
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    size += stat.st_size
+                    last_modified = max(last_modified, stat.st_mtime)
+            if entry in resumable_ids and time.time() - last_modified <= max_age_seconds:
+                kept.append((last_modified, size, entry_path))
+            else:
+                self._delete_temp_directory(entry_path)
+
+        total_size = sum(size for _, size, _ in kept)
+        for last_modified, size, entry_path in sorted(kept):  # Oldest first
+            if total_size <= max_total_bytes:
+                break
+            self._delete_temp_directory(entry_path)
+            total_size -= size
+        print(f"Kept {len(kept)} resumable temporary directories ({format_bytes(max(0, total_size))}).")
+
+    def _cleanup_item_logs_on_launch(self):
+        """Deletes the log files of items that are no longer in the list."""
+        log_dir = get_item_log_dir(self.settings['output_directory'])
+        if not os.path.isdir(log_dir):
+            return
+        known_ids = {str(item_id) for item_id in self.download_items_map}
+        for name in os.listdir(log_dir):
+            if name.split('.', 1)[0] not in known_ids:
+                try:
+                    os.remove(os.path.join(log_dir, name))
+                except OSError as e:
+                    print(f"Error deleting log file {name}: {e}")
+
+    def _delete_temp_directory(self, entry_path):
+        try:
+            print(f"Deleting lingering temporary directory: {entry_path}");
+            shutil.rmtree(entry_path)
+        except Exception as e:
+            print(f"Error deleting lingering temporary directory {entry_path}: {e}")
+
+
+def read_url_list(path):
+    """URLs of a text file, one per line. Blank lines and lines starting with '#' are skipped."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+class HeadlessRunner:
+    """
+    Runs downloads without Tk, for batch machines and containers. It provides the parts of the app
+    interface that DownloadItem uses, so items, command building and the TS path are the same as in
+    the GUI, plus a small scheduler with slots, per-site limits and automatic retries.
+    Every event is printed to stdout as one JSON object per line.
+    """
+
+    def __init__(self, settings, yt_dlp_path, out, mp3_conversion=False, quality=None, force=False):
+        self.settings = settings
+        self.yt_dlp_path = yt_dlp_path
+        self.out = out
+        self.mp3_conversion = mp3_conversion
+        self.quality = quality or settings['default_default_quality']
+        self.force = force  # Download again even if the archive has the output
+        self.engine = None
+        self.temp_subdir = HEADLESS_TEMP_SUBDIR  # Apart from the GUI's, whose launch cleanup removes unknown items
+        self.ui_bus = UIUpdateBus()
+        self.queued_downloads = ReadyQueue(settings['scheduling_policy'])
+        self.active_downloads = []
+        self.download_items_map = {}  # Queued, running and retrying items
+        self.retry_due = []  # (due time, item, keeps its slot) of failed items waiting to be retried
+        self.host_last_start = {}
+        self.download_archive = DownloadArchive(ARCHIVE_FILE)
+        self.next_item_id = int(time.time()) * 1000  # Not reusing the temp dirs and logs of earlier runs
+        self.counts = {'completed': 0, 'failed': 0, 'aborted': 0, 'skipped': 0}
+
+    def emit(self, event, **fields):
+        self.out.write(json.dumps(dict(event=event, time=round(time.time(), 3), **fields)) + "\n")
+        self.out.flush()
+
+    def add_url(self, url):
+        """Queues a URL unless the archive already has its output."""
+        if not self.force and self.download_archive.lookup(
+                build_archive_keys(url, '', self.mp3_conversion, '', self.quality)):
+            self.counts['skipped'] += 1
+            self.emit('skipped', url=url, reason='already downloaded')
+            return
+        self.next_item_id += 1
+        item_data = {
+            'id': self.next_item_id, 'source_path': url, 'quality': self.quality, 'filename': '',
+            'mp3_conversion': self.mp3_conversion, 'source': DEFAULT_SOURCE, 'referer': '',
+            'status': 'queued', 'date_added': time.strftime("%m/%d/%y"), 'filename_provided_by_user': False,
+            'elapsed_time_seconds': 0
+        }
+        item = DownloadItem(self, item_data, is_active_item=True)  # Fetches the title in the background
+        self.download_items_map[item.item_id] = item
+        self.queued_downloads.append(item)
+        self.emit('queued', id=item.item_id, url=url)
+
+    def run(self, input_files=(), watch_dir=None):
+        """Downloads everything in input_files; with watch_dir, keeps running and picks up new URL lists."""
+        for path in input_files:
+            for url in read_url_list(path):
+                self.add_url(url)
+        next_scan = 0
+        try:
+            while True:
+                if watch_dir and time.time() >= next_scan:
+                    self._scan_watch_dir(watch_dir)
+                    next_scan = time.time() + HEADLESS_WATCH_INTERVAL
+                self._drain_updates()
+                self._run_scheduling_pass()
+                if not watch_dir and not self.download_items_map:
+                    break
+                time.sleep(PROGRESS_UI_INTERVAL)
+        except KeyboardInterrupt:
+            for item in list(self.active_downloads):
+                item.abort_download()
+            self.emit('stopped', running=len(self.active_downloads), queued=len(self.queued_downloads))
+            return 130
+        self.emit('done', **self.counts)
+        return 1 if self.counts['failed'] else 0
+
+    def _scan_watch_dir(self, watch_dir):
+        """Queues the URLs of each *.txt file in watch_dir, then moves the file to the processed folder."""
+        processed_dir = os.path.join(watch_dir, HEADLESS_PROCESSED_SUBDIR)
+        try:
+            names = sorted(name for name in os.listdir(watch_dir) if name.lower().endswith('.txt'))
+        except OSError as e:
+            print(f"Error reading watch folder {watch_dir}: {e}")
+            return
+        for name in names:
+            path = os.path.join(watch_dir, name)
+            if time.time() - os.path.getmtime(path) < HEADLESS_WATCH_INTERVAL:
+                continue  # May still be being written
+            try:
+                urls = read_url_list(path)
+                os.makedirs(processed_dir, exist_ok=True)
+                os.replace(path, os.path.join(processed_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{name}"))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error reading URL list {path}: {e}")
+                continue
+            self.emit('input', file=name, urls=len(urls))
+            for url in urls:
+                self.add_url(url)
+
+    def _drain_updates(self):
+        """Runs posted callbacks (finished downloads) and prints the latest state of each changed item."""
+        dirty_items, log_chunks, callbacks = self.ui_bus.drain()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error applying update: {e}")
+        for item in dirty_items:
+            if item.is_active_item:
+                self.emit('progress', id=item.item_id, status=item.status, percent=round(item.progress_value, 1),
+                          elapsed=item.elapsed_text)
+
+    def _run_scheduling_pass(self):
+        now = time.time()
+        for due in [due for due in self.retry_due if due[0] <= now]:
+            self.retry_due.remove(due)
+            _, item, keeps_slot = due
+            if keeps_slot:
+                item.start_download()
+            else:
+                item.ready_for_download = True
+                item.status = 'queued'
+                self.queued_downloads.append(item)
+
+        self.queued_downloads.promote_ready()
+        host_counts = {}
+        for item in self.active_downloads:
+            host_counts[item.host] = host_counts.get(item.host, 0) + 1
+
+        def host_allowed(host):
+            if not host:
+                return True
+            max_concurrent, min_interval = lookup_host_limits(self.settings, host)
+            return host_counts.get(host, 0) < max_concurrent and \
+                now - self.host_last_start.get(host, 0) >= min_interval
+
+        max_concurrent_downloads = max(1, int(self.settings['max_concurrent_downloads']))
+        fair_share = self.settings['scheduling_policy'] == "Fair share by site"
+        while len(self.active_downloads) < max_concurrent_downloads:
+            item = self.queued_downloads.pop_next(None, host_allowed,
+                                                  (lambda host: host_counts.get(host, 0)) if fair_share else None)
+            if not item:
+                break
+            if item.host:
+                host_counts[item.host] = host_counts.get(item.host, 0) + 1
+                self.host_last_start[item.host] = now
+            item.fragment_concurrency = max(1, min(int(self.settings['fragments_per_item']),
+                                                   int(self.settings['fragment_budget']) // max_concurrent_downloads))
+            self.active_downloads.append(item)
+            self.emit('started', id=item.item_id, url=item.source_path, title=item.video_title)
+            item.start_download()
+
+    # The parts of the app interface that DownloadItem uses
+    def is_log_window_open(self):
+        return False
+
+    def update_display_item(self, item):
+        pass
+
+    def request_scheduling_pass(self):
+        pass  # The main loop runs a pass every tick
+
+    def journal_queued_item(self, item):
+        pass
+
+    def reregister_queued_item(self, item):
+        pass  # Duplicates are checked against the archive only, before an item is created
+
+    def move_item_to_pool(self, item, pool):
+        pass  # One pool: max_concurrent_downloads counts every phase
+
+    def show_warning(self, title, message):
+        self.emit('warning', title=title, message=message)
+
+    def remove_from_queue(self, item):
+        self.queued_downloads.remove(item)
+        self.download_items_map.pop(item.item_id, None)
+
+    def download_finished(self, item, final_status):
+        if final_status == "failed" and self._schedule_retry(item):
+            return
+        if item in self.active_downloads:
+            self.active_downloads.remove(item)
+        self.download_items_map.pop(item.item_id, None)
+        item.is_active_item = False
+        item.status = final_status
+        self.counts[final_status] = self.counts.get(final_status, 0) + 1
+        output_file = os.path.join(os.getcwd(), self.settings['output_directory'],
+                                   item.filename + item.expected_final_ext)
+        if final_status == "completed":
+            self.download_archive.record(item.get_archive_keys(), {
+                'file': output_file, 'filename': item.filename, 'title': item.video_title,
+                'date': time.strftime("%m/%d/%y")})
+        self.emit('finished', id=item.item_id, url=item.source_path, status=final_status,
+                  file=output_file if final_status == "completed" else None,
+                  failure_class=item.failure_class or None, log=item.get_log_path(),
+                  elapsed=int(time.time() - item.start_time) if item.start_time else 0)
+
+    def _schedule_retry(self, item):
+        """Same failure classes and backoff as the GUI's automatic retries."""
+        item.failure_class = classify_failure(item.last_return_code, item.output_tail)
+        policy = RETRY_POLICIES[item.failure_class]
+        attempt = item.retry_attempts.get(item.failure_class, 0)
+        if not self.settings['auto_retry'] or attempt >= policy['max_attempts']:
+            return False
+        if item.failure_class == 'ffmpeg' and not item.can_retry_with_recode():
+            return False
+        item.retry_attempts[item.failure_class] = attempt + 1
+        if item.failure_class == 'ffmpeg':
+            item.force_recode = True  # Stream copy failed, transcode on the next attempt
+        delay = compute_retry_delay(item.failure_class, attempt)
+        if not policy['hold_slot'] and item in self.active_downloads:
+            self.active_downloads.remove(item)
+        self.retry_due.append((time.time() + delay, item, policy['hold_slot']))
+        self.emit('retrying', id=item.item_id, failure_class=item.failure_class, attempt=attempt + 1,
+                  delay=round(delay, 1))
+        return True
+
+
+def run_headless(args):
+    """Entry point of --headless. Progress goes to stdout as JSON lines; other messages go to stderr."""
+    settings, error = read_settings_file(args.config)
+    if error is not None:
+        print(f"Error loading settings from {args.config}: {error}", file=sys.stderr)
+        return 2
+    if args.max_concurrent:
+        settings['max_concurrent_downloads'] = args.max_concurrent
+    if args.output:
+        settings['output_directory'] = args.output
+    if not args.input and not args.watch:
+        print("Nothing to do: give --input and/or --watch.", file=sys.stderr)
+        return 2
+    os.makedirs(os.path.join(os.getcwd(), settings['output_directory']), exist_ok=True)
+    out = sys.stdout
+    sys.stdout = sys.stderr  # Diagnostic print()s must not mix with the JSON lines
+
+    def stop_on_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop_on_sigterm)  # Containers stop with SIGTERM; abort running downloads cleanly
+    runner = HeadlessRunner(settings, get_yt_dlp_path(), out, mp3_conversion=args.mp3, quality=args.quality,
+                            force=args.force)
+    try:
+        return runner.run(args.input or [], args.watch)
+    except OSError as e:
+        print(f"Error: {e}")
+        return 2
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Universal Video Downloader & Converter")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window, printing progress as JSON lines")
+    parser.add_argument("--input", action="append", metavar="FILE",
+                        help="text file with one URL per line (can be given more than once)")
+    parser.add_argument("--watch", metavar="DIR",
+                        help="keep running and download the URLs of every .txt file put into DIR")
+    parser.add_argument("--config", default=CONFIG_FILE, help=f"settings file (default: {CONFIG_FILE})")
+    parser.add_argument("--output", metavar="DIR", help="output folder, overriding the settings file")
+    parser.add_argument("--max-concurrent", type=int, metavar="N", help="downloads running at the same time")
+    parser.add_argument("--mp3", action="store_true", help="convert downloads to MP3")
+    parser.add_argument("--quality", help="quality option as in the window, e.g. 'High Quality - 1080p'")
+    parser.add_argument("--force", action="store_true", help="download again even if already downloaded")
+    return parser.parse_args(argv)
 
 
 # Ensure main() is defined AFTER the class YTDLPGUIApp
 def main():
+    args = parse_arguments()
+    if args.headless:
+        sys.exit(run_headless(args))
     root = tk.Tk()
     app = YTDLPGUIApp(root)
     root.mainloop()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # The engine process of a PyInstaller build starts through here
     main()